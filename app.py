@@ -1,43 +1,67 @@
 from flask import Flask, request, jsonify
+import atexit
 import numpy as np
-import joblib
-from tensorflow.keras.models import load_model
-from sklearn.preprocessing import StandardScaler
+import os
+import threading
+import time
 from flask_cors import CORS
+from bundle import BundleError, load_bundle
+from model import InsuranceFraudModel
+from app.services.audit_log import AuditLog
 
 app = Flask(__name__)
 CORS(app)
-# Load the trained model and scaler
-model = load_model('insurance_fraud_model.h5')
-scaler = joblib.load('scaler.pkl')
+# Load the current model bundle, falling back to the legacy model directory
+try:
+    model = load_bundle()
+except BundleError:
+    model = InsuranceFraudModel(
+        'models/fraud_model.npz' if os.path.exists('models/fraud_model.npz') else 'models/fraud_model.keras'
+    )
+model.warm_up()
+n_features = model.pipeline.n_features
+audit_log = AuditLog(os.getenv('AUDIT_DIR', 'audit'), model.pipeline)
+audit_log.start()
+atexit.register(audit_log.stop)
+
+# One preallocated feature row per request thread
+_buffers = threading.local()
+
+def _feature_row() -> np.ndarray:
+    if not hasattr(_buffers, 'row'):
+        _buffers.row = np.empty((1, n_features), dtype=np.float32)
+    return _buffers.row
 
 @app.route('/predict', methods=['POST'])
 def predict():
+    started = time.perf_counter()
     try:
-        # Get the features from the request
+        # Get the claim (or pre-encoded features) from the request
         data = request.get_json()
+        row = _feature_row()
 
-        # Convert the features to a NumPy array
-        features = np.array(data['features']).reshape(1, -1)
-
-        # Ensure the features match the expected number of columns (39)
-        if features.shape[1] != 39:
-            return jsonify({"error": f"Expected 39 features, but got {features.shape[1]} features."}), 400
-        
-        # Scale the features using the loaded scaler
-        scaled_features = scaler.transform(features)
+        if 'features' in data:
+            # Pre-encoded features in training column order
+            features = np.asarray(data['features'], dtype=np.float32).reshape(1, -1)
+            if features.shape[1] != n_features:
+                return jsonify({"error": f"Expected {n_features} features, but got {features.shape[1]} features."}), 400
+            row[:] = features
+            model.pipeline.apply_scaling(row)
+        else:
+            # Raw claim fields: encoded, date-split and scaled straight into the row
+            model.pipeline.transform_one(data.get('claim', data), scale=True, out=row[0])
 
         # Make prediction
-        prediction = model.predict(scaled_features)
-
-        # Convert the result from float32 to standard Python float for serialization
-        prediction_value = float(prediction[0])  # Extract the first value from the prediction
+        prediction_value = float(model.predict_proba_scaled(row)[0])
 
         # Return the result
         response = {
             "fraud_probability": prediction_value,
-            "result": "Fraud" if prediction_value > 0.5 else "Legitimate"
+            "result": "Fraud" if prediction_value >= model.thresholds['fraud'] else "Legitimate"
         }
+        claim = {'features': data['features']} if 'features' in data else data.get('claim', data)
+        audit_log.record([claim], [prediction_value], model.thresholds, model.version,
+                         (time.perf_counter() - started) * 1000, endpoint='flask_predict')
         return jsonify(response)
 
     except Exception as e:
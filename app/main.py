@@ -1,24 +1,201 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel, Field, validator, root_validator
 from datetime import datetime
-import pandas as pd
+import asyncio
+import json
 import numpy as np
 import logging
+import os
+import queue
+import threading
+import time
 from typing import Dict, List, Optional, Any
-from model import InsuranceFraudModel
+from app.services.batcher import MicroBatcher
+from app.services.model_registry import ModelRegistry, warm_up
+from app.services.analytics_store import AnalyticsStore
+from app.services.metrics import BATCH_SIZE, METRICS, REQUEST_SECONDS, STAGE_SECONDS, stage
+from app.services.profiler import SlowRequestProfiler
+from app.services.score_cache import ScoreCache, SharedCacheBackend
+from app.services.job_queue import JobRunner, JobStore, job_summary, stage_input
+from app.services.audit_log import AuditLog
+from app.services.claim_index import INDEX_PATH, ClaimIndex
+from batch_score import score_chunk
+from drift import DriftMonitor
+from explain import FeatureExplainer
+from risk_rules import RULES_PATH, RiskRuleEngine
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Insurance Fraud Detection API")
 
+# Legacy single-directory model, used when no versioned bundle has been published.
+# Prefer the TensorFlow-free NumPy export when it is present.
+MODEL_PATH = os.getenv('MODEL_PATH') or (
+    'models/fraud_model.npz' if os.path.exists('models/fraud_model.npz') else 'models/fraud_model.keras'
+)
+
+registry = ModelRegistry(os.getenv('MODEL_BUNDLE_ROOT', 'models/bundles'), fallback_model_path=MODEL_PATH)
 try:
-    model = InsuranceFraudModel('models/fraud_model.keras')
+    registry.load_initial()
 except Exception as e:
     logger.error(f"Model loading failed: {e}")
     raise
 
+# Risk factor rules, re-read whenever the file changes
+risk_rules = RiskRuleEngine(os.getenv('RISK_RULES_PATH', RULES_PATH))
+
+# Scores of recently seen claims; SCORE_CACHE_SIZE=0 disables it
+SCORE_CACHE_URL = os.getenv('SCORE_CACHE_URL')
+score_cache = ScoreCache(
+    max_entries=int(os.getenv('SCORE_CACHE_SIZE', '10000')),
+    ttl_seconds=float(os.getenv('SCORE_CACHE_TTL_SECONDS', '300')),
+    shared=SharedCacheBackend.from_url(SCORE_CACHE_URL) if SCORE_CACHE_URL else None,
+)
+registry.on_activate(lambda fraud_model: score_cache.invalidate())
+
+# Live traffic compared against the active model's training reference, off the request path.
+# Scored batches wait in a bounded queue; when the drift thread falls behind they are dropped and counted.
+drift_queue: queue.Queue = queue.Queue(maxsize=int(os.getenv('DRIFT_QUEUE_SIZE', '256')))
+drift_dropped_batches = 0
+drift_thread: Optional[threading.Thread] = None
+drift_monitor: Optional[DriftMonitor] = None
+
+def reset_drift_monitor(fraud_model) -> None:
+    global drift_monitor
+    reference = fraud_model.drift_reference
+    drift_monitor = DriftMonitor(fraud_model.pipeline, reference) if reference is not None else None
+
+reset_drift_monitor(registry.active)
+registry.on_activate(reset_drift_monitor)
+
+def observe_drift() -> None:
+    while True:
+        entry = drift_queue.get()
+        if entry is None:
+            return
+        monitor, X, scores, records = entry
+        try:
+            monitor.observe(X, scores, records)
+        except Exception as e:
+            logger.error(f"Drift observation failed: {e}")
+
+# Near-duplicate lookup across historical and scored claims; loaded (or built) at startup
+CLAIM_INDEX_PATH = os.getenv('CLAIM_INDEX_PATH', INDEX_PATH)
+claim_index: Optional[ClaimIndex] = None
+
+def load_claim_index() -> None:
+    global claim_index
+    claim_index = ClaimIndex.load_or_build('insurance_claims.csv', CLAIM_INDEX_PATH)
+
+def score_claims(records: List[Dict[str, Any]], sent: Optional[List[Dict[str, Any]]] = None) -> List[Any]:
+    # ``sent`` holds only the fields each client supplied; defaults must not become index keys
+    global drift_dropped_batches
+    # Encode and score with one model reference so a hot swap never mixes versions
+    fraud_model = registry.active
+    BATCH_SIZE.observe(len(records))
+    with stage('predict', 'encode'):
+        X = fraud_model.pipeline.transform(records)
+    with stage('predict', 'cache'):
+        keys = score_cache.keys_for(X, fraud_model.version)
+        scores = score_cache.lookup(keys)
+        missing = np.flatnonzero(np.isnan(scores))
+    if len(missing):
+        with stage('predict', 'model'):
+            scores[missing] = fraud_model.predict_proba_scaled(fraud_model.pipeline.apply_scaling(X[missing]))
+        score_cache.store([keys[i] for i in missing], scores[missing])
+    with stage('predict', 'risk_factors'):
+        risk_factors = risk_rules.evaluate(records, scores, fraud_model.thresholds)
+    index = claim_index
+    if index is not None:
+        with stage('predict', 'claim_index'):
+            related = index.check_and_add(sent if sent is not None else records)
+    else:
+        related = [None] * len(records)
+    registry.score_shadows(records, scores)
+    monitor = drift_monitor
+    if monitor is not None:
+        try:
+            drift_queue.put_nowait((monitor, X, scores, records))
+        except queue.Full:
+            drift_dropped_batches += 1
+    return [(float(score), fraud_model, factors, matches)
+            for score, factors, matches in zip(scores, risk_factors, related)]
+
+def score_requests(items: List[Any]) -> List[Any]:
+    records, sent = zip(*items)
+    return score_claims(list(records), list(sent))
+
+batcher = MicroBatcher(
+    score_requests,
+    max_batch_size=int(os.getenv('PREDICT_MAX_BATCH_SIZE', '64')),
+    max_wait_ms=float(os.getenv('PREDICT_MAX_WAIT_MS', '2.0')),
+    collate=list,
+)
+
+# Opt-in per-claim attributions (/api/predict?explain=true), batched like scoring
+EXPLAIN_TOP_K = int(os.getenv('EXPLAIN_TOP_K', '5'))
+explainer: Optional[FeatureExplainer] = None
+
+def reset_explainer(fraud_model) -> None:
+    global explainer
+    explainer = FeatureExplainer.for_model(
+        fraud_model,
+        steps=int(os.getenv('EXPLAIN_STEPS', '8')),
+        budget_ms=float(os.getenv('EXPLAIN_BUDGET_MS', '10')),
+    )
+
+reset_explainer(registry.active)
+registry.on_activate(reset_explainer)
+
+def explain_claims(records: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    active_explainer = explainer
+    if active_explainer is None:
+        # A hot swap to a model that cannot be explained landed after the request was accepted
+        return [[] for _ in records]
+    with stage('predict', 'explain'):
+        X = active_explainer.pipeline.transform(records, scale=True)
+        return active_explainer.explain(X, records, EXPLAIN_TOP_K)
+
+explain_batcher = MicroBatcher(
+    explain_claims,
+    max_batch_size=int(os.getenv('PREDICT_MAX_BATCH_SIZE', '64')),
+    max_wait_ms=float(os.getenv('PREDICT_MAX_WAIT_MS', '2.0')),
+    collate=list,
+    name='explain',
+)
+analytics = AnalyticsStore('insurance_claims.csv')
+BATCH_CHUNK_SIZE = int(os.getenv('PREDICT_BATCH_CHUNK_SIZE', '1000'))
+
+# Asynchronous scoring jobs; JOB_WORKERS=0 only queues them (for a dedicated worker process)
+job_store = JobStore(os.getenv('JOBS_DIR', 'jobs'))
+job_runner = JobRunner(
+    job_store,
+    lambda: registry.active,
+    risk_rules,
+    workers=int(os.getenv('JOB_WORKERS', '1')),
+    nice=int(os.getenv('JOB_NICE', '10')),
+)
+JOB_CHUNK_SIZE = int(os.getenv('JOB_CHUNK_SIZE', '5000'))
+
+# Every scoring decision, written as Parquet segments off the request path
+audit_log = AuditLog(
+    os.getenv('AUDIT_DIR', 'audit'),
+    registry.active.pipeline,
+    flush_rows=int(os.getenv('AUDIT_FLUSH_ROWS', '10000')),
+    flush_seconds=float(os.getenv('AUDIT_FLUSH_SECONDS', '60')),
+)
+
+# Opt-in: dump folded stacks for requests slower than PROFILE_SLOW_REQUEST_MS
+PROFILE_SLOW_REQUEST_MS = float(os.getenv('PROFILE_SLOW_REQUEST_MS', '0'))
+profiler = SlowRequestProfiler(
+    PROFILE_SLOW_REQUEST_MS,
+    output_dir=os.getenv('PROFILE_DIR', 'profiles'),
+    interval_ms=float(os.getenv('PROFILE_INTERVAL_MS', '5')),
+) if PROFILE_SLOW_REQUEST_MS > 0 else None
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:5173"],
@@ -27,6 +204,31 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Set once this process has run warm-up inference; scoring routes answer 503 until then
+ready = asyncio.Event()
+
+@app.middleware("http")
+async def time_requests(request: Request, call_next):
+    request.state.started = time.perf_counter()
+    status = 500
+    try:
+        if not ready.is_set() and request.url.path.startswith('/api/predict'):
+            response = JSONResponse({"detail": "Warming up"}, status_code=503, headers={"Retry-After": "1"})
+        else:
+            response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        finished = time.perf_counter()
+        # Label by route template so path parameters don't explode cardinality
+        route = getattr(request.scope.get('route'), 'path', 'unmatched')
+        REQUEST_SECONDS.observe(finished - request.state.started,
+                                method=request.method, route=route, status=str(status))
+        if profiler is not None:
+            asyncio.get_running_loop().run_in_executor(
+                None, profiler.request_finished, f"{request.method} {route}", request.state.started, finished
+            )
+
 class ClaimRequest(BaseModel):
     # Policy Information
     policy_bind_date: str = Field(default_factory=lambda: datetime.now().strftime("%Y-%m-%d"))
@@ -94,24 +296,6 @@ class ClaimRequest(BaseModel):
             raise ValueError("Hour must be between 0 and 23")
         return v
 
-    def to_dataframe(self) -> pd.DataFrame:
-        data = self.dict(by_alias=True)
-        
-        # Add dummy columns
-        data['policy_number'] = 'DUMMY'
-        data['_c39'] = 0
-        
-        # Create DataFrame
-        df = pd.DataFrame([data])
-        
-        # Ensure column names match training data
-        df = df.rename(columns={
-            'capital_gains': 'capital-gains',
-            'capital_loss': 'capital-loss'
-        })
-        
-        return df
-
     class Config:
         allow_population_by_field_name = True
         schema_extra = {
@@ -126,54 +310,85 @@ class ClaimRequest(BaseModel):
             }
         }
 
-def get_risk_factors(claim_df: pd.DataFrame, fraud_probability: float) -> List[Dict]:
-    risk_factors = []
-    
-    if claim_df['total_claim_amount'].iloc[0] > 50000:
-        risk_factors.append({
-            "factor": "High Claim Amount",
-            "severity": "High",
-            "description": "Total claim amount is unusually high"
-        })
-    
-    if claim_df['bodily_injuries'].iloc[0] > 2:
-        risk_factors.append({
-            "factor": "Multiple Injuries",
-            "severity": "Medium",
-            "description": "Multiple people reported injured"
-        })
-    
-    if claim_df['police_report_available'].iloc[0] == 'NO':
-        risk_factors.append({
-            "factor": "No Police Report",
-            "severity": "Medium",
-            "description": "No police report filed"
-        })
-    
-    if fraud_probability > 0.7:
-        risk_factors.append({
-            "factor": "High Risk Score",
-            "severity": "High",
-            "description": "ML model indicates high fraud probability"
-        })
-    
-    return risk_factors
+@app.on_event("startup")
+async def start_batcher():
+    await batcher.start()
+    await explain_batcher.start()
+    global drift_thread
+    drift_thread = threading.Thread(target=observe_drift, name='drift', daemon=True)
+    drift_thread.start()
+    await asyncio.get_running_loop().run_in_executor(None, analytics.refresh_if_stale)
+    try:
+        await asyncio.get_running_loop().run_in_executor(None, load_claim_index)
+    except Exception as e:
+        logger.error(f"Claim index unavailable: {e}")
+    watch_interval = float(os.getenv('MODEL_WATCH_INTERVAL', '0'))
+    if watch_interval > 0:
+        registry.start_watcher(watch_interval)
+    if profiler is not None:
+        profiler.start()
+    job_runner.start()
+    audit_log.start()
+    asyncio.get_running_loop().create_task(_warm_up())
+
+async def _warm_up():
+    # Forked workers inherit a warmed-up model but not its BLAS threads or touched pages
+    try:
+        await asyncio.get_running_loop().run_in_executor(
+            None, warm_up, registry.active, (1, batcher.max_batch_size)
+        )
+        ready.set()
+        logger.info(f"Worker {os.getpid()} ready")
+    except Exception as e:
+        logger.error(f"Warm-up failed: {e}")
+
+@app.on_event("shutdown")
+async def stop_batcher():
+    await batcher.stop()
+    await explain_batcher.stop()
+    registry.stop()
+    if drift_thread is not None:
+        await asyncio.get_running_loop().run_in_executor(None, drift_queue.put, None)
+        await asyncio.get_running_loop().run_in_executor(None, drift_thread.join)
+    await asyncio.get_running_loop().run_in_executor(None, job_runner.stop)
+    await asyncio.get_running_loop().run_in_executor(None, audit_log.stop)
+    if claim_index is not None:
+        await asyncio.get_running_loop().run_in_executor(None, claim_index.save, CLAIM_INDEX_PATH)
+    if profiler is not None:
+        profiler.stop()
 
 @app.post("/api/predict")
-async def predict_fraud(claim: ClaimRequest):
+async def predict_fraud(claim: ClaimRequest, request: Request, explain: bool = False):
+    # Body parsing and pydantic validation ran between the middleware and here
+    STAGE_SECONDS.observe(time.perf_counter() - request.state.started, endpoint='predict', stage='validate')
+    if explain and explainer is None:
+        raise HTTPException(status_code=400, detail="The active model does not support explanations")
     try:
-        claim_df = claim.to_dataframe()
-        logger.debug(f"Input features: {claim_df.columns.tolist()}")
-        
-        prediction = model.predict(claim_df)
-        fraud_probability = float(prediction[0])
+        # Validated claim goes straight to the pipeline's record encoder; no DataFrame is built
+        record = claim.dict(by_alias=True)
+        sent = claim.dict(by_alias=True, exclude_unset=True)
+        if explain:
+            (fraud_probability, scoring_model, risk_factors, related_claims), explanation = await asyncio.gather(
+                batcher.submit((record, sent)), explain_batcher.submit(record)
+            )
+        else:
+            fraud_probability, scoring_model, risk_factors, related_claims = await batcher.submit((record, sent))
+        is_fraudulent = bool(fraud_probability >= scoring_model.thresholds['fraud'])
+        with stage('predict', 'analytics'):
+            analytics.record([record], [is_fraudulent])
+        audit_log.record([record], [fraud_probability], scoring_model.thresholds, scoring_model.version,
+                         (time.perf_counter() - request.state.started) * 1000)
         
         response = {
             "fraud_probability": fraud_probability,
-            "is_fraudulent": bool(fraud_probability > 0.5),
-            "risk_factors": get_risk_factors(claim_df, fraud_probability),
+            "is_fraudulent": is_fraudulent,
+            "risk_factors": risk_factors,
+            "related_claims": related_claims,
+            "model_version": scoring_model.version,
             "timestamp": datetime.now().isoformat()
         }
+        if explain:
+            response["explanation"] = explanation
         
         return response
         
@@ -181,23 +396,215 @@ async def predict_fraud(claim: ClaimRequest):
         logger.error(f"Prediction error: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+def parse_claims_body(body: bytes) -> List[Dict[str, Any]]:
+    text = body.decode('utf-8').strip()
+    if not text:
+        return []
+    if text.startswith('['):
+        records = json.loads(text)
+    else:
+        records = [json.loads(line) for line in text.splitlines() if line.strip()]
+    if not all(isinstance(record, dict) for record in records):
+        raise ValueError("Each claim must be a JSON object")
+    return records
+
+@app.post("/api/predict/batch")
+async def predict_batch(request: Request):
+    try:
+        records = parse_claims_body(await request.body())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid claims payload: {e}")
+
+    async def stream_results():
+        loop = asyncio.get_running_loop()
+        fraud_model = registry.active
+        for start in range(0, len(records), BATCH_CHUNK_SIZE):
+            chunk = records[start:start + BATCH_CHUNK_SIZE]
+            try:
+                chunk_started = time.perf_counter()
+                with stage('predict_batch', 'score_chunk'):
+                    result = await loop.run_in_executor(None, score_chunk, fraud_model, chunk, start, risk_rules)
+            except Exception as e:
+                logger.error(f"Batch prediction error: {str(e)}", exc_info=True)
+                yield json.dumps({"row": start, "error": str(e)}) + "\n"
+                return
+            with stage('predict_batch', 'analytics'):
+                analytics.record(chunk, result['is_fraudulent'].tolist())
+            audit_log.record(chunk, result['fraud_probability'].tolist(), fraud_model.thresholds, fraud_model.version,
+                             (time.perf_counter() - chunk_started) * 1000 / len(chunk), endpoint='predict_batch')
+            yield result.to_json(orient='records', lines=True).rstrip("\n") + "\n"
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+@app.post("/api/jobs", status_code=202)
+async def create_job(request: Request, chunk_size: Optional[int] = None):
+    """Queue a portfolio for background scoring: a JSON array, JSON Lines, or CSV (Content-Type: text/csv)."""
+    chunk_size = chunk_size or JOB_CHUNK_SIZE
+    if chunk_size < 1:
+        raise HTTPException(status_code=400, detail="chunk_size must be positive")
+    fmt = 'csv' if 'csv' in request.headers.get('content-type', '') else 'json'
+    loop = asyncio.get_running_loop()
+    job_id, job_dir = await loop.run_in_executor(None, job_store.new_job_dir)
+    try:
+        # File I/O runs in the executor so a slow disk never stalls the event loop
+        f = await loop.run_in_executor(None, open, os.path.join(job_dir, 'upload'), 'wb')
+        try:
+            async for part in request.stream():
+                await loop.run_in_executor(None, f.write, part)
+        finally:
+            await loop.run_in_executor(None, f.close)
+        try:
+            input_path, rows = await loop.run_in_executor(None, stage_input, f.name, fmt)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid claims payload: {e}")
+        if rows == 0:
+            raise HTTPException(status_code=400, detail="No claims in payload")
+        job = await loop.run_in_executor(None, job_store.create, job_id, input_path, rows, chunk_size)
+    except BaseException:
+        await asyncio.shield(loop.run_in_executor(None, job_store.discard_job_dir, job_id))
+        raise
+    job_runner.notify()
+    return job_summary(job)
+
+@app.get("/api/jobs")
+async def list_jobs(limit: int = 100):
+    jobs = await asyncio.get_running_loop().run_in_executor(None, job_store.list, limit)
+    return [job_summary(job) for job in jobs]
+
+async def _get_job(job_id: str) -> Dict[str, Any]:
+    job = await asyncio.get_running_loop().run_in_executor(None, job_store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    return job
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    return job_summary(await _get_job(job_id))
+
+@app.delete("/api/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    await _get_job(job_id)
+    job = await asyncio.get_running_loop().run_in_executor(None, job_store.cancel, job_id)
+    return job_summary(job)
+
+@app.get("/api/jobs/{job_id}/results")
+async def get_job_results(job_id: str, partial: bool = False):
+    job = await _get_job(job_id)
+    if job['status'] != 'completed' and not partial:
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}; pass partial=true for rows scored so far")
+    return StreamingResponse(
+        job_store.read_results(job),
+        media_type="application/x-ndjson",
+        headers={"X-Job-Status": job['status'], "X-Rows-Done": str(job['rows_done'])},
+    )
+
+@app.get("/api/health/live")
+async def liveness():
+    return {"status": "ok", "pid": os.getpid()}
+
+@app.get("/api/health/ready")
+async def readiness():
+    body = {
+        "ready": ready.is_set(),
+        "pid": os.getpid(),
+        "model_version": registry.active.version if registry.active is not None else None,
+    }
+    return JSONResponse(body, status_code=200 if ready.is_set() else 503)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    return PlainTextResponse(METRICS.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/api/metrics/batching")
+async def get_batching_metrics():
+    return batcher.metrics.snapshot()
+
+@app.get("/api/metrics/cache")
+async def get_cache_metrics():
+    return score_cache.stats()
+
+@app.get("/api/monitoring/drift")
+async def get_drift():
+    monitor = drift_monitor
+    if monitor is None:
+        return {"model_version": registry.active.version, "status": "no_reference"}
+    report = await asyncio.get_running_loop().run_in_executor(None, monitor.report)
+    return {"model_version": registry.active.version, "status": "ok", **report,
+            "queued_batches": drift_queue.qsize(), "dropped_batches": drift_dropped_batches}
+
+@app.post("/api/monitoring/drift/reset")
+async def reset_drift():
+    if drift_monitor is None:
+        raise HTTPException(status_code=404, detail="The active model has no drift reference")
+    drift_monitor.reset()
+    return {"model_version": registry.active.version, "observed": 0}
+
+AUDIT_QUERY_PARAMS = {'min_score', 'max_score', 'since', 'until', 'columns', 'limit'}
+
+@app.get("/api/audit")
+async def query_audit(request: Request, min_score: Optional[float] = None, max_score: Optional[float] = None,
+                      since: Optional[datetime] = None, until: Optional[datetime] = None,
+                      columns: Optional[str] = None, limit: int = 1000):
+    """Scored claims matching the filters; any other query parameter must equal the claim field."""
+    where = {key: value for key, value in request.query_params.items() if key not in AUDIT_QUERY_PARAMS}
+    try:
+        return await asyncio.get_running_loop().run_in_executor(
+            None, lambda: audit_log.query(min_score, max_score, since, until, where,
+                                          columns.split(',') if columns else None, limit)
+        )
+    except (KeyError, TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid audit query: {e}")
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+@app.get("/api/audit/stats")
+async def get_audit_stats():
+    return audit_log.stats()
+
+@app.get("/api/claim-index")
+async def get_claim_index():
+    if claim_index is None:
+        raise HTTPException(status_code=503, detail="The claim index is not loaded")
+    return claim_index.stats()
+
+@app.get("/api/risk-rules")
+async def get_risk_rules():
+    return {"path": risk_rules.path, "rules": risk_rules.rules}
+
+@app.get("/api/models")
+async def get_models():
+    return registry.status()
+
+@app.post("/api/models/reload")
+async def reload_model(version: Optional[str] = None, shadow: bool = False):
+    if not registry.load_async(version, shadow=shadow):
+        raise HTTPException(status_code=409, detail="A model load is already in progress")
+    return {"loading": version or "CURRENT", "shadow": shadow}
+
+@app.delete("/api/models/shadows/{version}")
+async def remove_shadow(version: str):
+    registry.unload_shadow(version)
+    return registry.status()
+
 @app.get("/api/analytics")
 async def get_analytics():
     try:
-        data = pd.read_csv('insurance_claims.csv')
-        
-        return {
-            "total_claims": len(data),
-            "fraudulent_claims": len(data[data['fraud_reported'] == 'Y']),
-            "avg_claim_amount": float(data['total_claim_amount'].mean()),
-            "fraud_by_make": data[data['fraud_reported'] == 'Y']['auto_make'].value_counts().to_dict(),
-            "fraud_by_type": data[data['fraud_reported'] == 'Y']['incident_type'].value_counts().to_dict()
-        }
+        return analytics.summary()
         
     except Exception as e:
         logger.error(f"Analytics error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/analytics/{dimension}")
+async def get_analytics_breakdown(dimension: str):
+    try:
+        return analytics.breakdown(dimension)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown analytics dimension: {dimension}")
+    except Exception as e:
+        logger.error(f"Analytics error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,154 @@
+# app/services/analytics_store.py
+import os
+import threading
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from dataset import load_claims, resolve_dataset_path
+from app.services.metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+# Dimension name -> source column; 'incident_month' is derived from incident_date
+DIMENSIONS: Dict[str, str] = {
+    'auto_make': 'auto_make',
+    'incident_type': 'incident_type',
+    'policy_state': 'policy_state',
+    'incident_state': 'incident_state',
+    'incident_severity': 'incident_severity',
+    'incident_month': 'incident_date',
+}
+LOAD_COLUMNS = sorted(set(DIMENSIONS.values()) | {'fraud_reported', 'total_claim_amount'})
+
+
+def _group_key(dimension: str, value: Any) -> str:
+    key = 'nan' if value is None else str(value)
+    return key[:7] if dimension == 'incident_month' else key
+
+
+class AnalyticsStore:
+    """Claims aggregates precomputed once and maintained incrementally.
+
+    The dataset is loaded a single time (projected columns, categorical
+    dtypes) and reduced to per-dimension ``[claims, fraudulent, amount]``
+    counters of labeled claims. Newly scored claims only have a prediction,
+    not a label, so they go into separate ``[scored, predicted_fraudulent]``
+    counters in O(1). The source file's mtime is checked on read so edits to
+    it trigger a reload of the labeled counters; the scored counters are kept.
+    A current columnar copy of the dataset (see ``dataset.py``) is preferred.
+    """
+
+    def __init__(self, data_path: str = 'insurance_claims.csv'):
+        self.data_path = data_path
+        self._lock = threading.Lock()
+        self._mtime: Optional[float] = None
+        self._totals = [0, 0, 0.0]
+        self._groups: Dict[str, Dict[str, List[float]]] = {}
+        self._scored = [0, 0]
+        self._scored_groups: Dict[str, Dict[str, List[int]]] = {}
+        self._summary: Optional[Dict[str, Any]] = None
+
+    def load(self) -> None:
+        try:
+            source = resolve_dataset_path(self.data_path)
+            mtime = os.path.getmtime(source)
+            data = self._read(source)
+            fraud = data['fraud_reported'] == 'Y'
+            amount = data['total_claim_amount'].astype(float)
+            frame = pd.DataFrame({'fraud': fraud.astype(int), 'amount': amount})
+
+            groups: Dict[str, Dict[str, List[float]]] = {}
+            for dimension, column in DIMENSIONS.items():
+                keys = data[column].astype(str)
+                if dimension == 'incident_month':
+                    keys = keys.str.slice(0, 7)
+                aggregated = frame.groupby(keys.astype('category'), observed=True).agg(
+                    claims=('fraud', 'size'), fraudulent=('fraud', 'sum'), amount=('amount', 'sum')
+                )
+                groups[dimension] = {
+                    str(key): [int(row.claims), int(row.fraudulent), float(row.amount)]
+                    for key, row in aggregated.iterrows()
+                }
+
+            with self._lock:
+                self._totals = [len(data), int(fraud.sum()), float(amount.sum())]
+                self._groups = groups
+                self._mtime = mtime
+                self._summary = None
+            logger.info(f"Analytics store loaded {len(data)} claims from {self.data_path}")
+        except Exception as e:
+            logger.error(f"Error loading analytics store: {e}")
+            raise
+
+    def _read(self, path: str) -> pd.DataFrame:
+        dtypes = {column: 'category' for column in DIMENSIONS.values()}
+        dtypes['fraud_reported'] = 'category'
+        return load_claims(path, LOAD_COLUMNS, dtype=dtypes)
+
+    def refresh_if_stale(self) -> None:
+        try:
+            mtime = os.path.getmtime(resolve_dataset_path(self.data_path))
+        except OSError:
+            return
+        if mtime != self._mtime:
+            self.load()
+
+    def record(self, claims: Iterable[Dict[str, Any]], fraud_flags: Iterable[bool]) -> None:
+        """Count newly scored claims and their predictions, apart from the labeled aggregates."""
+        with self._lock:
+            for claim, is_fraud in zip(claims, fraud_flags):
+                flag = int(bool(is_fraud))
+                self._scored[0] += 1
+                self._scored[1] += flag
+                for dimension, column in DIMENSIONS.items():
+                    key = _group_key(dimension, claim.get(column))
+                    counters = self._scored_groups.setdefault(dimension, {}).setdefault(key, [0, 0])
+                    counters[0] += 1
+                    counters[1] += flag
+
+    def summary(self) -> Dict[str, Any]:
+        self.refresh_if_stale()
+        summary = self._summary
+        record_cache('analytics_summary', summary is not None)
+        if summary is None:
+            with self._lock:
+                claims, fraudulent, amount = self._totals
+                summary = {
+                    "total_claims": claims,
+                    "fraudulent_claims": fraudulent,
+                    "avg_claim_amount": amount / claims if claims else 0.0,
+                    "fraud_by_make": self._fraud_counts('auto_make'),
+                    "fraud_by_type": self._fraud_counts('incident_type'),
+                }
+                self._summary = summary
+        # The cached part only changes with the file; scoring counters are read live
+        with self._lock:
+            scored_claims, predicted = self._scored
+        return {**summary, "scored_claims": scored_claims, "predicted_fraudulent": predicted}
+
+    def breakdown(self, dimension: str) -> Dict[str, Dict[str, Any]]:
+        if dimension not in DIMENSIONS:
+            raise KeyError(dimension)
+        self.refresh_if_stale()
+        with self._lock:
+            labeled = self._groups.get(dimension, {})
+            scored = self._scored_groups.get(dimension, {})
+            result = {}
+            for key in sorted(set(labeled) | set(scored)):
+                claims, fraudulent, amount = labeled.get(key, (0, 0, 0.0))
+                scored_claims, predicted = scored.get(key, (0, 0))
+                result[key] = {
+                    "claims": claims,
+                    "fraudulent_claims": fraudulent,
+                    "fraud_rate": fraudulent / claims if claims else 0.0,
+                    "avg_claim_amount": amount / claims if claims else 0.0,
+                    "scored_claims": scored_claims,
+                    "predicted_fraudulent": predicted,
+                }
+            return result
+
+    def _fraud_counts(self, dimension: str) -> Dict[str, int]:
+        counts = {key: int(c[1]) for key, c in self._groups.get(dimension, {}).items() if c[1] > 0}
+        return dict(sorted(counts.items(), key=lambda item: item[1], reverse=True))
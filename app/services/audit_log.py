@@ -0,0 +1,264 @@
+# app/services/audit_log.py
+import os
+import queue
+import threading
+import time
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from preprocessing import DATE_COLUMNS, DATE_PARTS
+
+logger = logging.getLogger(__name__)
+
+AUDIT_DIR = 'audit'
+ID_COLUMN = 'policy_number'
+DECISION_COLUMNS = ('scored_at', 'fraud_probability', 'is_fraudulent', 'model_version', 'latency_ms', 'endpoint')
+
+
+def audit_schema(pipeline: Any) -> Any:
+    """The one schema every audit segment is written with and every query reads with.
+
+    Claim fields come from the pipeline's columns, with encoded date parts
+    folded back into their date column: categories and dates are strings,
+    everything else float64. Pre-encoded feature rows (the Flask
+    ``features`` payload) go in their own list column, followed by the
+    decision fields.
+    """
+    import pyarrow as pa
+
+    date_parts = {f'{col}_{part}': col for col in DATE_COLUMNS for part in DATE_PARTS}
+    fields = {ID_COLUMN: pa.string()}
+    for col in pipeline.columns:
+        if col in date_parts:
+            fields[date_parts[col]] = pa.string()
+        else:
+            fields[col] = pa.string() if col in pipeline.vocabularies else pa.float64()
+    fields.update({
+        'features': pa.list_(pa.float32()),
+        'scored_at': pa.timestamp('us'),
+        'fraud_probability': pa.float64(),
+        'is_fraudulent': pa.bool_(),
+        'model_version': pa.string(),
+        'latency_ms': pa.float64(),
+        'endpoint': pa.string(),
+    })
+    return pa.schema(list(fields.items()))
+
+
+def _to_string(value: Any) -> Optional[str]:
+    return None if value is None or value != value else str(value)
+
+
+def _to_float(value: Any) -> Optional[float]:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if number == number else None
+
+
+def _to_features(value: Any) -> Optional[List[float]]:
+    try:
+        return [float(v) for v in value] if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _local_naive(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone().replace(tzinfo=None)
+
+
+class AuditLog:
+    """Append-only trail of every scoring decision, stored as compressed Parquet segments.
+
+    ``record`` only puts a tuple on a bounded queue, so the request path never
+    waits on I/O; when the queue is full the entry is dropped and counted. A
+    background thread buffers rows and rolls them over into a zstd-compressed
+    segment every ``flush_rows`` rows or ``flush_seconds`` seconds. Segments
+    are hive-partitioned by day (``date=YYYY-MM-DD/``) and named by process,
+    so several workers can share ``root``. Queries prune whole days by
+    partition and row groups by their min/max statistics.
+
+    Rows are coerced to ``audit_schema(pipeline)``: unknown fields are
+    dropped and values that don't fit a column's type are stored as null, so
+    every segment has the same columns and types whatever the client sent.
+    """
+
+    def __init__(self, root: str = AUDIT_DIR, pipeline: Any = None, flush_rows: int = 10000,
+                 flush_seconds: float = 60.0, max_queue: int = 100000):
+        self.root = root
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._recorded = 0
+        self._dropped = 0
+        self._written = 0
+        self._segments = 0
+        try:
+            import pyarrow  # noqa: F401
+
+            self.enabled = True
+        except ImportError:
+            logger.warning("pyarrow is not installed; the audit log is disabled")
+            self.enabled = False
+        self.schema = audit_schema(pipeline) if self.enabled else None
+        self._converters: Dict[str, Callable[[Any], Any]] = {}
+        if self.schema is not None:
+            import pyarrow as pa
+
+            for field in self.schema:
+                if field.name in DECISION_COLUMNS:
+                    continue
+                if pa.types.is_string(field.type):
+                    self._converters[field.name] = _to_string
+                elif pa.types.is_floating(field.type):
+                    self._converters[field.name] = _to_float
+                elif pa.types.is_list(field.type):
+                    self._converters[field.name] = _to_features
+
+    def start(self) -> None:
+        if not self.enabled or (self._thread is not None and self._thread.is_alive()):
+            return
+        os.makedirs(self.root, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name='audit-log', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Write out everything still buffered and stop the writer thread."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def record(self, records: Sequence[Dict[str, Any]], scores: Sequence[float], thresholds: Dict[str, float],
+               model_version: str, latency_ms: float, endpoint: str = 'predict') -> None:
+        if not self.enabled:
+            return
+        try:
+            self._queue.put_nowait((datetime.now(), records, scores, thresholds['fraud'],
+                                    model_version, latency_ms, endpoint))
+            accepted = True
+        except queue.Full:
+            accepted = False
+        # Called from many request threads at once
+        with self._lock:
+            if accepted:
+                self._recorded += len(records)
+            else:
+                self._dropped += len(records)
+
+    def _run(self) -> None:
+        rows: List[Dict[str, Any]] = []
+        deadline = time.monotonic() + self.flush_seconds
+        while True:
+            try:
+                entry = self._queue.get(timeout=max(deadline - time.monotonic(), 0.0))
+            except queue.Empty:
+                entry = ()
+            if entry is None:
+                self._flush(rows)
+                return
+            if entry:
+                scored_at, records, scores, threshold, model_version, latency_ms, endpoint = entry
+                for record, score in zip(records, scores):
+                    row = {name: convert(record.get(name)) for name, convert in self._converters.items()}
+                    row.update(scored_at=scored_at, fraud_probability=float(score),
+                               is_fraudulent=bool(score >= threshold), model_version=model_version,
+                               latency_ms=float(latency_ms), endpoint=endpoint)
+                    rows.append(row)
+            if len(rows) >= self.flush_rows or time.monotonic() >= deadline:
+                self._flush(rows)
+                rows = []
+                deadline = time.monotonic() + self.flush_seconds
+
+    def _flush(self, rows: List[Dict[str, Any]]) -> None:
+        if not rows:
+            return
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        try:
+            by_day: Dict[str, List[Dict[str, Any]]] = {}
+            for row in rows:
+                by_day.setdefault(row['scored_at'].date().isoformat(), []).append(row)
+            for day, day_rows in by_day.items():
+                table = pa.Table.from_pylist(day_rows, schema=self.schema)
+                # Sorted segments give row groups tight, non-overlapping score ranges
+                table = table.sort_by([('fraud_probability', 'descending')])
+                directory = os.path.join(self.root, f'date={day}')
+                os.makedirs(directory, exist_ok=True)
+                name = f'segment-{time.time_ns()}-{os.getpid()}.parquet'
+                tmp_path = os.path.join(directory, f'.{name}.tmp')
+                pq.write_table(table, tmp_path, compression='zstd', row_group_size=8192)
+                os.replace(tmp_path, os.path.join(directory, name))
+                with self._lock:
+                    self._segments += 1
+                    self._written += len(day_rows)
+        except Exception as e:
+            logger.error(f"Failed to write {len(rows)} audit rows: {e}")
+
+    def query(self, min_score: Optional[float] = None, max_score: Optional[float] = None,
+              since: Optional[datetime] = None, until: Optional[datetime] = None,
+              where: Optional[Dict[str, Any]] = None, columns: Optional[List[str]] = None,
+              limit: int = 1000) -> List[Dict[str, Any]]:
+        """Up to ``limit`` audit rows matching every condition.
+
+        ``where`` maps column names to the value they must equal; values are
+        cast to the column's type, so query-string values work as is. Raises
+        ``KeyError`` for an unknown column. Rows still buffered in memory are
+        not visible until their segment is written.
+        """
+        if not self.enabled:
+            raise RuntimeError("The audit log is disabled (pyarrow is not installed)")
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        if not os.path.isdir(self.root):
+            return []
+        # scored_at is naive local time; compare aware bounds in the same terms
+        since, until = _local_naive(since), _local_naive(until)
+        dataset = ds.dataset(
+            self.root, format='parquet', schema=self.schema.append(pa.field('date', pa.string())),
+            partitioning=ds.partitioning(pa.schema([('date', pa.string())]), flavor='hive'),
+        )
+        conditions = []
+        if min_score is not None:
+            conditions.append(ds.field('fraud_probability') >= min_score)
+        if max_score is not None:
+            conditions.append(ds.field('fraud_probability') <= max_score)
+        if since is not None:
+            conditions.append(ds.field('date') >= since.date().isoformat())
+            conditions.append(ds.field('scored_at') >= pa.scalar(since, type=pa.timestamp('us')))
+        if until is not None:
+            conditions.append(ds.field('date') <= until.date().isoformat())
+            conditions.append(ds.field('scored_at') < pa.scalar(until, type=pa.timestamp('us')))
+        for name, value in (where or {}).items():
+            if self.schema.get_field_index(name) < 0:
+                raise KeyError(name)
+            try:
+                conditions.append(ds.field(name) == pa.scalar(value).cast(self.schema.field(name).type))
+            except pa.ArrowException as e:
+                raise ValueError(f"Cannot compare {name} with {value!r}: {e}")
+
+        expression = None
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+        scanner = dataset.scanner(columns=columns, filter=expression)
+        return scanner.head(limit).to_pylist()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "root": self.root,
+            "recorded": self._recorded,
+            "dropped": self._dropped,
+            "written": self._written,
+            "segments": self._segments,
+            "queued": self._queue.qsize(),
+        }
@@ -0,0 +1,191 @@
+# app/services/batcher.py
+import asyncio
+import time
+import logging
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.metrics import STAGE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class BatchMetrics:
+    """Rolling batch size and queue delay statistics for the batcher."""
+
+    def __init__(self, window: int = 1024):
+        self.batches = 0
+        self.items = 0
+        self.max_batch_size = 0
+        self.batch_sizes: Deque[int] = deque(maxlen=window)
+        self.queue_delays_ms: Deque[float] = deque(maxlen=window)
+        self.forward_ms: Deque[float] = deque(maxlen=window)
+
+    def record(self, batch_size: int, queue_delays_ms: List[float], forward_ms: float) -> None:
+        self.batches += 1
+        self.items += batch_size
+        self.max_batch_size = max(self.max_batch_size, batch_size)
+        self.batch_sizes.append(batch_size)
+        self.queue_delays_ms.extend(queue_delays_ms)
+        self.forward_ms.append(forward_ms)
+
+    def snapshot(self) -> Dict[str, Any]:
+        def percentiles(values: Deque[float]) -> Dict[str, float]:
+            if not values:
+                return {"p50": 0.0, "p99": 0.0, "max": 0.0}
+            arr = np.fromiter(values, dtype=np.float64)
+            return {
+                "p50": float(np.percentile(arr, 50)),
+                "p99": float(np.percentile(arr, 99)),
+                "max": float(arr.max()),
+            }
+
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": self.items / self.batches if self.batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "recent_batch_size": percentiles(self.batch_sizes),
+            "queue_delay_ms": percentiles(self.queue_delays_ms),
+            "forward_ms": percentiles(self.forward_ms),
+        }
+
+
+class MicroBatcher:
+    """Coalesces concurrent scoring requests into one vectorized forward pass.
+
+    Each request submits one item (by default a preprocessed feature row).
+    A background task flushes the queue when ``max_batch_size`` items are
+    waiting or the oldest has waited ``max_wait_ms``, combines them with
+    ``collate`` (``np.stack`` by default), runs ``predict_fn`` on the batch in a
+    worker thread so the event loop keeps accepting requests, and resolves
+    every caller's future with its own element of the result.
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[np.ndarray], np.ndarray],
+        max_batch_size: int = 64,
+        max_wait_ms: float = 2.0,
+        collate: Callable[[List[Any]], Any] = np.stack,
+        name: str = 'predict',
+    ):
+        self.predict_fn = predict_fn
+        self.name = name
+        self.collate = collate
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.metrics = BatchMetrics()
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._worker is not None and self._loop is loop and not self._worker.done():
+            return
+        if self._worker is not None and self._loop is loop:
+            # The worker died: whatever it left queued would otherwise wait forever
+            worker = self._worker
+            error = None if worker.cancelled() else worker.exception()
+            self._fail_pending(error or RuntimeError(f"Micro-batcher {self.name} stopped"))
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._worker = loop.create_task(self._run())
+        logger.info(f"Micro-batcher started (max_batch_size={self.max_batch_size}, "
+                    f"max_wait_ms={self.max_wait * 1000:.1f})")
+
+    async def stop(self) -> None:
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+        self._fail_pending(RuntimeError(f"Micro-batcher {self.name} stopped"))
+        logger.info("Micro-batcher stopped")
+
+    def _fail_pending(self, error: BaseException) -> None:
+        failed = 0
+        while self._queue is not None and not self._queue.empty():
+            _, future, _ = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(error)
+                failed += 1
+        if failed:
+            logger.error(f"Micro-batcher {self.name} failed {failed} pending requests: {error!r}")
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one item and wait for its prediction."""
+        # Started lazily so it always runs on the loop that serves the request
+        if self._worker is None or self._loop is not asyncio.get_running_loop() or self._worker.done():
+            await self.start()
+        future = self._loop.create_future()
+        await self._queue.put((item, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self, batch: List[Tuple[Any, asyncio.Future, float]]) -> None:
+        # Fills ``batch`` in place so items taken off the queue are never lost if the worker dies
+        batch.append(await self._queue.get())
+        deadline = batch[0][2] + self.max_wait
+        while len(batch) < self.max_batch_size:
+            # Drain whatever is already queued before sleeping on the deadline
+            while len(batch) < self.max_batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            remaining = deadline - time.perf_counter()
+            if len(batch) >= self.max_batch_size or remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+
+    async def _run(self) -> None:
+        batch: List[Tuple[Any, asyncio.Future, float]] = []
+        try:
+            await self._serve(batch)
+        except BaseException as e:
+            # Resolve the batch in flight; start() fails whatever is still queued
+            for _, future, _ in batch:
+                if future.done():
+                    continue
+                if isinstance(e, asyncio.CancelledError):
+                    future.cancel()
+                else:
+                    future.set_exception(e)
+            raise
+
+    async def _serve(self, batch: List[Tuple[Any, asyncio.Future, float]]) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch.clear()
+            await self._collect(batch)
+            batch[:] = [item for item in batch if not item[1].cancelled()]
+            if not batch:
+                continue
+
+            flushed_at = time.perf_counter()
+            try:
+                X = self.collate([item[0] for item in batch])
+                results = await loop.run_in_executor(None, self.predict_fn, X)
+                if len(results) != len(batch):
+                    raise ValueError(f"{self.name} returned {len(results)} results for {len(batch)} items")
+            except Exception as e:
+                logger.error(f"Batched prediction failed: {e}")
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            done_at = time.perf_counter()
+            queue_delays = [flushed_at - enqueued for _, _, enqueued in batch]
+            self.metrics.record(len(batch), [delay * 1000 for delay in queue_delays], (done_at - flushed_at) * 1000)
+            for delay in queue_delays:
+                STAGE_SECONDS.observe(delay, endpoint=self.name, stage='queue_wait')
+            for (_, future, _), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
@@ -0,0 +1,376 @@
+# app/services/claim_index.py
+import fcntl
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+import time
+import logging
+import uuid
+import zlib
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from dataset import load_claims, resolve_dataset_path
+from preprocessing import split_date
+
+logger = logging.getLogger(__name__)
+
+INDEX_PATH = 'models/claim_index.pkl'
+INDEX_FORMAT_VERSION = 2
+VEHICLE_FIELDS = ('insured_zip', 'auto_make', 'auto_model', 'auto_year')
+PLACE_FIELDS = ('incident_state', 'incident_city')
+TEXT_FIELD = 'incident_location'
+ID_FIELD = 'policy_number'
+LOAD_COLUMNS = [ID_FIELD, 'incident_date', TEXT_FIELD, *VEHICLE_FIELDS, *PLACE_FIELDS]
+# Mersenne prime 2**31 - 1: a * x + b stays below 2**63 for 31-bit shingle hashes
+_PRIME = (1 << 31) - 1
+
+
+def _normalize(value: Any) -> str:
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip().lower()
+
+
+def _fingerprint(record: Dict[str, Any]) -> str:
+    return hashlib.blake2b(json.dumps(record, sort_keys=True, default=str).encode(), digest_size=16).hexdigest()
+
+
+class MinHasher:
+    """MinHash signatures over character shingles, vectorized over all permutations.
+
+    Shingles are hashed with CRC32, so signatures are stable across processes
+    and can be persisted.
+    """
+
+    def __init__(self, num_perm: int = 32, shingle_size: int = 3, seed: int = 7):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.a = rng.integers(1, _PRIME, num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, _PRIME, num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        text = ' '.join(text.lower().split())
+        k = self.shingle_size
+        shingles = {text[i:i + k] for i in range(max(len(text) - k + 1, 1))}
+        x = np.fromiter((zlib.crc32(s.encode()) & _PRIME for s in shingles), dtype=np.uint64, count=len(shingles))
+        return ((np.outer(self.a, x) + self.b[:, None]) % _PRIME).min(axis=1).astype(np.uint32)
+
+
+class ClaimIndex:
+    """Incrementally updated near-duplicate index over historical and scored claims.
+
+    Three kinds of blocking keys point at claim ids, so a lookup only
+    inspects a handful of candidates instead of every claim:
+
+    - the vehicle key ``insured_zip``/``auto_make``/``auto_model``/``auto_year``;
+    - LSH bands of the MinHash signature of ``incident_location``, verified
+      against ``similarity`` (estimated Jaccard over character shingles);
+    - ``incident_state``/``incident_city`` plus the incident day, probed for
+      every day within ``date_window_days``.
+
+    Vehicle and location matches are returned with the days between the two
+    incidents; the place/day key only counts clustered incidents. The index
+    is pickled with the source file's mtime and rebuilt when the file
+    changes; claims added at serving time survive the rebuild.
+
+    Memory is bounded: scored claims live in a ring of ``max_scored`` slots
+    (the oldest is evicted from every key it was filed under), and each key
+    keeps only its newest ``max_candidates`` claims. A scored claim identical
+    to one already indexed (a retry) is neither added again nor matched
+    against its earlier copy.
+    """
+
+    def __init__(self, num_perm: int = 32, bands: int = 8, similarity: float = 0.5,
+                 date_window_days: int = 3, max_candidates: int = 256, max_scored: int = 100000):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.hasher = MinHasher(num_perm)
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+        self.similarity = similarity
+        self.date_window_days = date_window_days
+        self.max_candidates = max_candidates
+        self.max_scored = max_scored
+        self.source_path: Optional[str] = None
+        self.source_mtime: Optional[float] = None
+        self._ids: List[str] = []
+        self._days: List[Optional[int]] = []
+        # Historical claims occupy [0, _n_base); scored claims reuse the slots after it
+        self._n_base = 0
+        self._scored: List[Dict[str, Any]] = []
+        self._scored_total = 0
+        self._slot_keys: Dict[int, Tuple[Any, ...]] = {}
+        self._fingerprints: Dict[str, int] = {}
+        self._signatures: List[Optional[np.ndarray]] = []
+        self._vehicles: Dict[Tuple[str, ...], List[int]] = {}
+        self._places: Dict[Tuple[Any, ...], List[int]] = {}
+        self._bands: List[Dict[bytes, List[int]]] = [{} for _ in range(bands)]
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _keys(self, record: Dict[str, Any]) -> Tuple[Optional[Tuple[str, ...]], Optional[Tuple[Any, ...]],
+                                                     Optional[int], Optional[np.ndarray]]:
+        values = [record.get(field) for field in VEHICLE_FIELDS]
+        # NaN != NaN, so missing dataset values count as absent too
+        vehicle = tuple(_normalize(v) for v in values) if all(v is not None and v == v for v in values) else None
+        split = split_date(record.get('incident_date'))
+        day = None
+        if split is not None:
+            try:
+                day = date(*split).toordinal()
+            except ValueError:
+                pass
+        places = [record.get(field) for field in PLACE_FIELDS]
+        place = None
+        if day is not None and all(v is not None and v == v for v in places):
+            place = tuple(_normalize(v) for v in places)
+        text = record.get(TEXT_FIELD)
+        signature = self.hasher.signature(text) if isinstance(text, str) and text.strip() else None
+        return vehicle, place, day, signature
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        r = self.rows_per_band
+        return [signature[i * r:(i + 1) * r].tobytes() for i in range(self.bands)]
+
+    def add(self, record: Dict[str, Any], claim_id: Optional[str] = None, scored: bool = True) -> int:
+        with self._lock:
+            return self._add(record, claim_id, scored)
+
+    def _file(self, mapping: Dict[Any, List[int]], key: Any, idx: int) -> None:
+        ids = mapping.setdefault(key, [])
+        ids.append(idx)
+        if len(ids) > self.max_candidates:
+            del ids[0]
+
+    def _unfile(self, mapping: Dict[Any, List[int]], key: Any, idx: int) -> None:
+        ids = mapping.get(key)
+        if ids is not None and idx in ids:
+            ids.remove(idx)
+            if not ids:
+                del mapping[key]
+
+    def _add(self, record: Dict[str, Any], claim_id: Optional[str], scored: bool,
+             fingerprint: Optional[str] = None, at: Optional[float] = None) -> int:
+        vehicle, place, day, signature = self._keys(record)
+        band_keys = self._band_keys(signature) if signature is not None else []
+        place_key = place + (day,) if place is not None else None
+        if not scored:
+            idx = len(self._ids)
+            self._n_base = idx + 1
+            self._ids.append(str(claim_id))
+            self._days.append(day)
+            self._signatures.append(signature)
+        else:
+            claim_id = claim_id or str(record.get(ID_FIELD) or f'scored-{uuid.uuid4().hex[:12]}')
+            slot = self._scored_total % self.max_scored
+            idx = self._n_base + slot
+            self._scored_total += 1
+            if idx < len(self._ids):
+                self._evict(idx)
+                self._ids[idx], self._days[idx], self._signatures[idx] = claim_id, day, signature
+            else:
+                self._ids.append(claim_id)
+                self._days.append(day)
+                self._signatures.append(signature)
+            fingerprint = fingerprint or _fingerprint(record)
+            self._slot_keys[idx] = (vehicle, place_key, band_keys, fingerprint)
+            self._fingerprints[fingerprint] = idx
+            # Kept so a rebuild from a changed source file can re-add them
+            entry = {**{field: record.get(field) for field in LOAD_COLUMNS},
+                     '_id': claim_id, '_at': at or time.time(), '_fingerprint': fingerprint}
+            if slot < len(self._scored):
+                self._scored[slot] = entry
+            else:
+                self._scored.append(entry)
+        if vehicle is not None:
+            self._file(self._vehicles, vehicle, idx)
+        if place_key is not None:
+            self._file(self._places, place_key, idx)
+        for band, key in zip(self._bands, band_keys):
+            self._file(band, key, idx)
+        return idx
+
+    def _evict(self, idx: int) -> None:
+        vehicle, place_key, band_keys, fingerprint = self._slot_keys.pop(idx)
+        if vehicle is not None:
+            self._unfile(self._vehicles, vehicle, idx)
+        if place_key is not None:
+            self._unfile(self._places, place_key, idx)
+        for band, key in zip(self._bands, band_keys):
+            self._unfile(band, key, idx)
+        if self._fingerprints.get(fingerprint) == idx:
+            del self._fingerprints[fingerprint]
+
+    def query(self, record: Dict[str, Any], limit: int = 5) -> Dict[str, Any]:
+        """Indexed claims sharing the vehicle or a similar location, and the local incident count."""
+        with self._lock:
+            return self._query(self._keys(record), limit)
+
+    def _query(self, keys: Tuple[Any, ...], limit: int, exclude: Optional[int] = None) -> Dict[str, Any]:
+        vehicle, place, day, signature = keys
+        matches: Dict[int, Dict[str, Any]] = {}
+        if vehicle is not None:
+            for idx in self._vehicles.get(vehicle, ()):
+                if idx != exclude:
+                    matches[idx] = {'reasons': ['same_vehicle']}
+        if signature is not None:
+            seen = {exclude}
+            for band, key in zip(self._bands, self._band_keys(signature)):
+                for idx in band.get(key, ()):
+                    if idx in seen:
+                        continue
+                    seen.add(idx)
+                    similarity = float(np.mean(self._signatures[idx] == signature))
+                    if similarity >= self.similarity:
+                        match = matches.setdefault(idx, {'reasons': []})
+                        match['reasons'].append('similar_location')
+                        match['location_similarity'] = similarity
+
+        nearby = 0
+        if place is not None:
+            for offset in range(-self.date_window_days, self.date_window_days + 1):
+                ids = self._places.get(place + (day + offset,), ())
+                nearby += len(ids) - (exclude in ids)
+
+        ranked = sorted(matches.items(), key=lambda item: (-len(item[1]['reasons']), -item[0]))[:limit]
+        duplicates = []
+        for idx, match in ranked:
+            other_day = self._days[idx]
+            duplicates.append({
+                'claim_id': self._ids[idx],
+                **match,
+                'days_apart': abs(day - other_day) if day is not None and other_day is not None else None,
+            })
+        return {'duplicates': duplicates, 'nearby_incidents': nearby}
+
+    def check_and_add(self, records: List[Dict[str, Any]], limit: int = 5) -> List[Dict[str, Any]]:
+        """Look up each claim against everything indexed before it, then index it.
+
+        Pass only the fields the client actually sent: a key is built only
+        when all of its fields are present, so server-side defaults never
+        make unrelated claims look alike.
+        """
+        results = []
+        with self._lock:
+            for record in records:
+                fingerprint = _fingerprint(record)
+                retry_of = self._fingerprints.get(fingerprint)
+                results.append(self._query(self._keys(record), limit, exclude=retry_of))
+                if retry_of is None:
+                    self._add(record, None, scored=True, fingerprint=fingerprint)
+        return results
+
+    def scored_claims(self) -> List[Dict[str, Any]]:
+        """The scored claims kept for rebuilds and merges, oldest first."""
+        with self._lock:
+            return sorted(self._scored, key=lambda entry: entry['_at'])
+
+    @classmethod
+    def build(cls, data_path: str, scored: Optional[List[Dict[str, Any]]] = None, **kwargs: Any) -> 'ClaimIndex':
+        index = cls(**kwargs)
+        source = resolve_dataset_path(data_path)
+        index.source_path = data_path
+        index.source_mtime = os.path.getmtime(source)
+        data = load_claims(data_path, LOAD_COLUMNS)
+        data['incident_date'] = data['incident_date'].astype(str)
+        for record in data.to_dict('records'):
+            index._add(record, str(record[ID_FIELD]), scored=False)
+        for record in scored or []:
+            index._add(record, record['_id'], scored=True, fingerprint=record['_fingerprint'], at=record['_at'])
+        logger.info(f"Claim index built over {len(data)} claims from {data_path} "
+                    f"plus {len(scored or [])} scored claims")
+        return index
+
+    def save(self, path: str = INDEX_PATH) -> None:
+        """Persist the index, first merging in scored claims other processes saved.
+
+        Workers forked by ``serve.py`` each hold their own copy and all save
+        at shutdown. An exclusive lock on ``<path>.lock`` serializes the
+        read-merge-write, and the file is replaced atomically from a unique
+        temporary file, so no worker's scored claims are lost.
+        """
+        directory = os.path.dirname(path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        with open(path + '.lock', 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                merged = self._merge_saved(path)
+                with self._lock:
+                    state = pickle.dumps((INDEX_FORMAT_VERSION, self), protocol=pickle.HIGHEST_PROTOCOL)
+                fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.claim_index-')
+                try:
+                    with os.fdopen(fd, 'wb') as f:
+                        f.write(state)
+                    os.replace(tmp_path, path)
+                except BaseException:
+                    os.unlink(tmp_path)
+                    raise
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+        logger.info(f"Claim index with {len(self)} claims ({merged} merged from {path}) saved")
+
+    def _merge_saved(self, path: str) -> int:
+        if not os.path.exists(path):
+            return 0
+        try:
+            with open(path, 'rb') as f:
+                version, saved = pickle.load(f)
+        except Exception as e:
+            logger.error(f"Cannot merge unreadable claim index {path}: {e}")
+            return 0
+        if version != INDEX_FORMAT_VERSION:
+            return 0
+        with self._lock:
+            known = {entry['_fingerprint'] for entry in self._scored}
+            missing = [entry for entry in saved.scored_claims() if entry['_fingerprint'] not in known]
+            for entry in missing:
+                self._add(entry, entry['_id'], scored=True, fingerprint=entry['_fingerprint'], at=entry['_at'])
+        return len(missing)
+
+    @classmethod
+    def load_or_build(cls, data_path: str, path: str = INDEX_PATH, **kwargs: Any) -> 'ClaimIndex':
+        """Load the persisted index, rebuilding it if it is missing or its source file changed."""
+        scored: List[Dict[str, Any]] = []
+        if os.path.exists(path):
+            try:
+                with open(path, 'rb') as f:
+                    version, index = pickle.load(f)
+                if version == INDEX_FORMAT_VERSION:
+                    current = os.path.getmtime(resolve_dataset_path(data_path))
+                    if index.source_path == data_path and index.source_mtime == current:
+                        logger.info(f"Claim index with {len(index)} claims loaded from {path}")
+                        return index
+                    scored = index.scored_claims()
+            except Exception as e:
+                logger.error(f"Error loading claim index {path}; rebuilding: {e}")
+        index = cls.build(data_path, scored, **kwargs)
+        index.save(path)
+        return index
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'claims': len(self._ids),
+            'scored_claims': len(self._scored),
+            'max_scored': self.max_scored,
+            'vehicle_keys': len(self._vehicles),
+            'location_buckets': sum(len(band) for band in self._bands),
+            'source_path': self.source_path,
+        }
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state.pop('_lock', None)
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
@@ -0,0 +1,360 @@
+# app/services/job_queue.py
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import logging
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from batch_score import read_chunks, score_chunk
+from model import InsuranceFraudModel
+from risk_rules import RiskRuleEngine
+
+logger = logging.getLogger(__name__)
+
+JOBS_DIR = 'jobs'
+
+
+def stage_input(raw_path: str, fmt: str) -> Tuple[str, int]:
+    """Turn an uploaded body into a chunk-readable input file and count its claims.
+
+    CSV is kept as is. A JSON array is rewritten as JSON Lines; JSON Lines is
+    only counted, and a malformed line fails the job when its chunk is read.
+    """
+    job_dir = os.path.dirname(raw_path)
+    if fmt == 'csv':
+        path = os.path.join(job_dir, 'input.csv')
+        os.replace(raw_path, path)
+        with open(path, 'rb') as f:
+            rows = max(sum(1 for line in f if line.strip()) - 1, 0)
+        return path, rows
+
+    path = os.path.join(job_dir, 'input.jsonl')
+    with open(raw_path, 'rb') as f:
+        head = f.read(4096).lstrip()
+    if head.startswith(b'['):
+        with open(raw_path, 'rb') as f:
+            records = json.load(f)
+        if not all(isinstance(record, dict) for record in records):
+            raise ValueError("Each claim must be a JSON object")
+        with open(path, 'w') as f:
+            for record in records:
+                f.write(json.dumps(record) + '\n')
+        os.remove(raw_path)
+        return path, len(records)
+    os.replace(raw_path, path)
+    with open(path, 'rb') as f:
+        rows = sum(1 for line in f if line.strip())
+    return path, rows
+
+
+class JobStore:
+    """SQLite-backed queue and progress log of asynchronous scoring jobs.
+
+    Workers claim a job by taking a lease, which they renew at every chunk
+    checkpoint. A job whose lease expires (its worker crashed or was killed)
+    is claimed again and resumes after the last checkpointed chunk. The
+    database may be shared by several server processes.
+    """
+
+    def __init__(self, root: str = JOBS_DIR):
+        self.root = root
+        self.path = os.path.join(root, 'jobs.db')
+        os.makedirs(root, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    input_path TEXT NOT NULL,
+                    results_path TEXT NOT NULL,
+                    chunk_size INTEGER NOT NULL,
+                    rows_total INTEGER NOT NULL,
+                    rows_done INTEGER NOT NULL DEFAULT 0,
+                    chunks_done INTEGER NOT NULL DEFAULT 0,
+                    results_bytes INTEGER NOT NULL DEFAULT 0,
+                    seconds REAL NOT NULL DEFAULT 0,
+                    model_version TEXT,
+                    cancel_requested INTEGER NOT NULL DEFAULT 0,
+                    worker TEXT,
+                    heartbeat_at REAL,
+                    error TEXT,
+                    created_at TEXT NOT NULL,
+                    started_at TEXT,
+                    finished_at TEXT
+                )"""
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # Autocommit; multi-statement updates open their own transaction. A
+        # Connection's own context manager never closes it, so close it here.
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def job_dir(self, job_id: str) -> str:
+        return os.path.join(self.root, job_id)
+
+    def new_job_dir(self) -> Tuple[str, str]:
+        job_id = uuid.uuid4().hex
+        path = self.job_dir(job_id)
+        os.makedirs(path)
+        return job_id, path
+
+    def discard_job_dir(self, job_id: str) -> None:
+        """Remove the directory of an upload that never became a job."""
+        shutil.rmtree(self.job_dir(job_id), ignore_errors=True)
+
+    def create(self, job_id: str, input_path: str, rows: int, chunk_size: int) -> Dict[str, Any]:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, input_path, results_path, chunk_size, rows_total, created_at) "
+                "VALUES (?, 'queued', ?, ?, ?, ?, ?)",
+                (job_id, input_path, os.path.join(self.job_dir(job_id), 'results.jsonl'), chunk_size, rows,
+                 datetime.now().isoformat()),
+            )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def list(self, limit: int = 100) -> List[Dict[str, Any]]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def claim(self, worker: str, lease_seconds: float) -> Optional[Dict[str, Any]]:
+        """Atomically take the oldest queued job, or one whose lease has expired."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE status = 'queued' OR (status = 'running' AND heartbeat_at < ?) "
+                    "ORDER BY created_at LIMIT 1",
+                    (now - lease_seconds,),
+                ).fetchone()
+                if row is not None:
+                    conn.execute(
+                        "UPDATE jobs SET status = 'running', worker = ?, heartbeat_at = ?, "
+                        "started_at = COALESCE(started_at, ?) WHERE id = ?",
+                        (worker, now, datetime.now().isoformat(), row['id']),
+                    )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        if row['status'] == 'running':
+            logger.warning(f"Job {row['id']} lease from {row['worker']} expired; resuming on {worker}")
+        return self.get(row['id'])
+
+    def checkpoint(self, job_id: str, worker: str, **progress: Any) -> Optional[Dict[str, Any]]:
+        """Record progress and renew the lease; None if ``worker`` no longer holds the job."""
+        assignments = ', '.join(f"{key} = ?" for key in progress)
+        with self._connect() as conn:
+            cursor = conn.execute(
+                f"UPDATE jobs SET {assignments}{', ' if progress else ''}heartbeat_at = ? "
+                "WHERE id = ? AND worker = ? AND status = 'running'",
+                (*progress.values(), time.time(), job_id, worker),
+            )
+        return self.get(job_id) if cursor.rowcount else None
+
+    def finish(self, job_id: str, worker: str, status: str, error: Optional[str] = None) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ?, heartbeat_at = NULL "
+                "WHERE id = ? AND worker = ?",
+                (status, error, datetime.now().isoformat(), job_id, worker),
+            )
+
+    def release(self, job_id: str, worker: str) -> None:
+        """Put a running job back in the queue, e.g. on shutdown."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'queued', worker = NULL, heartbeat_at = NULL "
+                "WHERE id = ? AND worker = ? AND status = 'running'",
+                (job_id, worker),
+            )
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Cancel a queued job at once; a running one stops at its next chunk boundary."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'cancelled', finished_at = ? WHERE id = ? AND status = 'queued'",
+                (datetime.now().isoformat(), job_id),
+            )
+            conn.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = 'running'", (job_id,))
+        return self.get(job_id)
+
+    def read_results(self, job: Dict[str, Any], block_size: int = 1 << 20) -> Iterator[bytes]:
+        """Checkpointed result lines; bytes past the last checkpoint are never returned."""
+        remaining = job['results_bytes']
+        if not remaining:
+            return
+        with open(job['results_path'], 'rb') as f:
+            while remaining > 0:
+                block = f.read(min(block_size, remaining))
+                if not block:
+                    return
+                remaining -= len(block)
+                yield block
+
+
+def job_summary(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Public view of a job row with progress and throughput."""
+    rows_total, rows_done, seconds = job['rows_total'], job['rows_done'], job['seconds']
+    rows_per_sec = rows_done / seconds if seconds > 0 else None
+    running = job['status'] == 'running'
+    return {
+        "id": job['id'],
+        "status": job['status'],
+        "rows_total": rows_total,
+        "rows_done": rows_done,
+        "progress": rows_done / rows_total if rows_total else (1.0 if job['status'] == 'completed' else 0.0),
+        "chunk_size": job['chunk_size'],
+        "chunks_done": job['chunks_done'],
+        "rows_per_sec": rows_per_sec,
+        "eta_seconds": (rows_total - rows_done) / rows_per_sec if running and rows_per_sec else None,
+        "model_version": job['model_version'],
+        "cancel_requested": bool(job['cancel_requested']),
+        "error": job['error'],
+        "created_at": job['created_at'],
+        "started_at": job['started_at'],
+        "finished_at": job['finished_at'],
+    }
+
+
+class JobRunner:
+    """Background threads that score queued jobs with the serving model.
+
+    Each job is read in ``chunk_size`` chunks and scored with the same
+    vectorized ``score_chunk`` as batch scoring. After every chunk the result
+    lines are fsynced and the checkpoint (rows, chunks, committed result
+    bytes) is written, so a restart resumes after the last completed chunk.
+    Worker threads are reniced on Linux so they yield the CPU to real-time
+    requests.
+    """
+
+    def __init__(self, store: JobStore, model_provider: Callable[[], InsuranceFraudModel],
+                 rules: Optional[RiskRuleEngine] = None, workers: int = 1, nice: int = 10,
+                 lease_seconds: float = 60.0, poll_interval: float = 1.0):
+        self.store = store
+        self.model_provider = model_provider
+        self.rules = rules
+        self.workers = workers
+        self.nice = nice
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self._threads: List[threading.Thread] = []
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        if self._threads:
+            return
+        self._stop.clear()
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._run, args=(f"{os.getpid()}-{index}",),
+                                      name=f'job-worker-{index}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"Job runner started with {self.workers} workers")
+
+    def stop(self, timeout: float = 30.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def notify(self) -> None:
+        """Wake idle workers after a job is queued."""
+        self._wake.set()
+
+    def _run(self, worker: str) -> None:
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), self.nice)
+        except (AttributeError, OSError):
+            pass
+        while not self._stop.is_set():
+            try:
+                job = self.store.claim(worker, self.lease_seconds)
+            except sqlite3.Error as e:
+                logger.error(f"Could not claim a job: {e}")
+                job = None
+            if job is None:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+                continue
+            self._process(job, worker)
+
+    def _process(self, job: Dict[str, Any], worker: str) -> None:
+        job_id = job['id']
+        try:
+            # One model for the whole job, so every row is scored by the same version
+            fraud_model = self.model_provider()
+            if job['chunks_done'] and job['model_version'] != fraud_model.version:
+                logger.warning(f"Job {job_id} was checkpointed with model {job['model_version']}; "
+                               f"rescoring from the start with {fraud_model.version}")
+                job = self.store.checkpoint(job_id, worker, rows_done=0, chunks_done=0, results_bytes=0,
+                                            seconds=0.0)
+                if job is None:
+                    return
+            job = self.store.checkpoint(job_id, worker, model_version=fraud_model.version)
+            if job is None:
+                return
+            logger.info(f"Job {job_id}: scoring {job['rows_total']} rows from chunk {job['chunks_done']}")
+
+            with open(job['results_path'], 'a+b') as out:
+                # Drop anything written after the last checkpoint
+                out.truncate(job['results_bytes'])
+                out.seek(job['results_bytes'])
+                rows_done, seconds = job['rows_done'], job['seconds']
+                for index, chunk in enumerate(read_chunks(job['input_path'], job['chunk_size'])):
+                    if index < job['chunks_done']:
+                        continue
+                    if self._stop.is_set():
+                        self.store.release(job_id, worker)
+                        logger.info(f"Job {job_id} released at chunk {index} for shutdown")
+                        return
+                    if job['cancel_requested']:
+                        self.store.finish(job_id, worker, 'cancelled')
+                        logger.info(f"Job {job_id} cancelled at chunk {index}")
+                        return
+                    started = time.perf_counter()
+                    result = score_chunk(fraud_model, chunk, rows_done, self.rules)
+                    out.write(result.to_json(orient='records', lines=True).rstrip('\n').encode() + b'\n')
+                    out.flush()
+                    os.fsync(out.fileno())
+                    rows_done += len(result)
+                    seconds += time.perf_counter() - started
+                    job = self.store.checkpoint(job_id, worker, rows_done=rows_done, chunks_done=index + 1,
+                                                results_bytes=out.tell(), seconds=seconds)
+                    if job is None:
+                        logger.warning(f"Job {job_id}: lease lost to another worker; stopping")
+                        return
+            # The upload's row count is an estimate for CSV; report what was scored
+            self.store.checkpoint(job_id, worker, rows_total=rows_done)
+            self.store.finish(job_id, worker, 'completed')
+            logger.info(f"Job {job_id} completed: {rows_done} rows in {seconds:.1f}s")
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {e}", exc_info=True)
+            try:
+                self.store.finish(job_id, worker, 'failed', error=str(e))
+            except sqlite3.Error as db_error:
+                # The lease expires and another worker reclaims the job
+                logger.error(f"Could not mark job {job_id} failed: {db_error}")
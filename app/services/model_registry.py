@@ -0,0 +1,200 @@
+# app/services/model_registry.py
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from bundle import BUNDLE_ROOT, BundleError, current_version, list_versions, load_bundle
+from model import InsuranceFraudModel
+from app.services.metrics import ACTIVE_MODEL, MODEL_LOAD_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+def warm_up(fraud_model: InsuranceFraudModel, batch_sizes: Sequence[int] = (1,)) -> None:
+    """Run synthetic inference so the first real request doesn't pay lazy init costs."""
+    with MODEL_LOAD_SECONDS.time(phase='warm_up'):
+        fraud_model.warm_up(tuple(batch_sizes))
+
+
+def _timed_load(load, *args) -> InsuranceFraudModel:
+    started = time.perf_counter()
+    fraud_model = load(*args)
+    MODEL_LOAD_SECONDS.observe(time.perf_counter() - started, phase='load')
+    return fraud_model
+
+
+class ShadowStats:
+    """Running agreement between a shadow model and the active model."""
+
+    def __init__(self):
+        self.scored = 0
+        self.abs_diff_sum = 0.0
+        self.max_abs_diff = 0.0
+        self.label_disagreements = 0
+
+    def update(self, active: np.ndarray, shadow: np.ndarray, threshold: float) -> None:
+        diff = np.abs(active - shadow)
+        self.scored += len(diff)
+        self.abs_diff_sum += float(diff.sum())
+        self.max_abs_diff = max(self.max_abs_diff, float(diff.max(initial=0.0)))
+        self.label_disagreements += int(((active >= threshold) != (shadow >= threshold)).sum())
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "scored": self.scored,
+            "mean_abs_diff": self.abs_diff_sum / self.scored if self.scored else 0.0,
+            "max_abs_diff": self.max_abs_diff,
+            "label_disagreement_rate": self.label_disagreements / self.scored if self.scored else 0.0,
+        }
+
+
+class ModelRegistry:
+    """Resident model versions with lazy background loading and atomic swaps.
+
+    ``active`` is a single attribute read, so requests always see either the
+    old or the new model, never a half-loaded one. New versions are loaded,
+    verified and warmed up in a background thread before the swap. Extra
+    versions can stay resident as shadows that score the same claims off the
+    request path.
+    """
+
+    def __init__(self, bundle_root: str = BUNDLE_ROOT, fallback_model_path: Optional[str] = None):
+        self.bundle_root = bundle_root
+        self.fallback_model_path = fallback_model_path
+        self.active: Optional[InsuranceFraudModel] = None
+        self._models: Dict[str, InsuranceFraudModel] = {}
+        self._shadows: Dict[str, ShadowStats] = {}
+        self._lock = threading.Lock()
+        self._loading: Optional[threading.Thread] = None
+        self._last_error: Optional[str] = None
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._shadow_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='shadow-scoring')
+        self._on_activate: List[Callable[[InsuranceFraudModel], None]] = []
+
+    def load_initial(self) -> InsuranceFraudModel:
+        """Synchronously load ``CURRENT`` (or the legacy model directory) at startup."""
+        if current_version(self.bundle_root) is not None:
+            fraud_model = _timed_load(load_bundle, None, self.bundle_root)
+        elif self.fallback_model_path:
+            fraud_model = _timed_load(InsuranceFraudModel, self.fallback_model_path)
+            # Content-derived, so the shared score cache never serves another model's scores
+            fraud_model.version = fraud_model.version.replace('unversioned', 'legacy', 1)
+        else:
+            raise BundleError(f"No model bundle under {self.bundle_root} and no fallback model")
+        warm_up(fraud_model)
+        self._install(fraud_model, activate=True)
+        return fraud_model
+
+    def _install(self, fraud_model: InsuranceFraudModel, activate: bool) -> None:
+        with self._lock:
+            self._models[fraud_model.version] = fraud_model
+            if activate:
+                previous = self.active
+                self.active = fraud_model
+                self._shadows.pop(fraud_model.version, None)
+                # Drop the replaced version unless it is still needed as a shadow
+                if previous is not None and previous.version not in self._shadows and previous is not fraud_model:
+                    self._models.pop(previous.version, None)
+                ACTIVE_MODEL.clear()
+                ACTIVE_MODEL.set(1, version=fraud_model.version)
+            else:
+                self._shadows.setdefault(fraud_model.version, ShadowStats())
+        logger.info(f"Model {fraud_model.version} {'activated' if activate else 'loaded as shadow'}")
+        if activate:
+            for callback in self._on_activate:
+                try:
+                    callback(fraud_model)
+                except Exception as e:
+                    logger.error(f"Activation hook failed for model {fraud_model.version}: {e}")
+
+    def on_activate(self, callback: Callable[[InsuranceFraudModel], None]) -> None:
+        """Call ``callback(model)`` after every model becomes active."""
+        self._on_activate.append(callback)
+
+    def load_async(self, version: Optional[str] = None, shadow: bool = False) -> bool:
+        """Start loading ``version`` (default: ``CURRENT``) in the background.
+
+        Returns False if another load is already in progress.
+        """
+        with self._lock:
+            if self._loading is not None and self._loading.is_alive():
+                return False
+            self._loading = threading.Thread(
+                target=self._load, args=(version, shadow), name='model-loader', daemon=True
+            )
+            self._loading.start()
+        return True
+
+    def _load(self, version: Optional[str], shadow: bool) -> None:
+        try:
+            version = version or current_version(self.bundle_root)
+            if version is None:
+                raise BundleError(f"No current bundle under {self.bundle_root}")
+            if self._models.get(version) is not None:
+                fraud_model = self._models[version]
+            else:
+                fraud_model = _timed_load(load_bundle, version, self.bundle_root)
+                warm_up(fraud_model)
+            self._install(fraud_model, activate=not shadow)
+            self._last_error = None
+        except Exception as e:
+            self._last_error = str(e)
+            logger.error(f"Background model load failed: {e}")
+
+    def unload_shadow(self, version: str) -> None:
+        with self._lock:
+            self._shadows.pop(version, None)
+            if self.active is None or self.active.version != version:
+                self._models.pop(version, None)
+
+    def score_shadows(self, records: List[Dict[str, Any]], active_scores: np.ndarray) -> None:
+        """Score ``records`` with every shadow model on a background thread."""
+        if not self._shadows:
+            return
+        self._shadow_executor.submit(self._score_shadows, records, np.asarray(active_scores))
+
+    def _score_shadows(self, records: List[Dict[str, Any]], active_scores: np.ndarray) -> None:
+        threshold = self.active.thresholds['fraud']
+        for version, stats in list(self._shadows.items()):
+            fraud_model = self._models.get(version)
+            if fraud_model is None:
+                continue
+            try:
+                stats.update(active_scores, fraud_model.predict_proba(records), threshold)
+            except Exception as e:
+                logger.error(f"Shadow scoring with {version} failed: {e}")
+
+    def start_watcher(self, interval: float) -> None:
+        """Poll the ``CURRENT`` pointer and hot-swap when it changes."""
+        if self._watcher is not None:
+            return
+
+        def watch():
+            while not self._stop.wait(interval):
+                version = current_version(self.bundle_root)
+                if version is not None and self.active is not None and version != self.active.version:
+                    logger.info(f"CURRENT changed to {version}; reloading")
+                    self._load(version, shadow=False)
+
+        self._watcher = threading.Thread(target=watch, name='model-watcher', daemon=True)
+        self._watcher.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._shadow_executor.shutdown(wait=False)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "active": self.active.version if self.active is not None else None,
+            "current": current_version(self.bundle_root),
+            "available": list_versions(self.bundle_root),
+            "resident": sorted(self._models),
+            "shadows": {version: stats.snapshot() for version, stats in self._shadows.items()},
+            "loading": self._loading is not None and self._loading.is_alive(),
+            "last_error": self._last_error,
+        }
@@ -0,0 +1,89 @@
+# app/services/profiler.py
+import os
+import re
+import sys
+import threading
+import time
+import logging
+from collections import Counter, deque
+from datetime import datetime
+from typing import Deque, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _fold(frame, thread_name: str) -> str:
+    """Render a frame chain as a root-first ``a;b;c`` stack, as flamegraph.pl expects."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    names.append(thread_name)
+    return ';'.join(reversed(names))
+
+
+class SlowRequestProfiler:
+    """Opt-in sampling profiler that keeps stacks only for slow requests.
+
+    A background thread samples every thread's stack each ``interval_ms`` into
+    a bounded ring buffer. When a request finishes slower than
+    ``threshold_ms``, the samples taken during it are aggregated into folded
+    stacks (one ``stack count`` line each) and written to ``output_dir``,
+    ready for ``flamegraph.pl`` or speedscope. Samples cover the whole
+    process, so concurrent requests appear in each other's profiles.
+    """
+
+    def __init__(self, threshold_ms: float, output_dir: str = 'profiles', interval_ms: float = 5.0,
+                 history_seconds: float = 60.0):
+        self.threshold = threshold_ms / 1000.0
+        self.output_dir = output_dir
+        self.interval = interval_ms / 1000.0
+        self._samples: Deque[Tuple[float, List[str]]] = deque(maxlen=max(1, int(history_seconds / self.interval)))
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample_loop, name='slow-request-profiler', daemon=True)
+        self._thread.start()
+        logger.info(f"Sampling profiler enabled for requests slower than {self.threshold * 1000:.0f}ms")
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread = None
+
+    def _sample_loop(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            stacks = [
+                _fold(frame, names.get(thread_id, str(thread_id)))
+                for thread_id, frame in sys._current_frames().items()
+                if thread_id != own_id
+            ]
+            self._samples.append((time.perf_counter(), stacks))
+
+    def request_finished(self, label: str, started: float, finished: float) -> Optional[str]:
+        """Dump folded stacks for the request if it was slow; returns the file written."""
+        if finished - started < self.threshold:
+            return None
+        counts: Counter = Counter()
+        for sampled_at, stacks in list(self._samples):
+            if started <= sampled_at <= finished:
+                counts.update(stacks)
+        if not counts:
+            return None
+        elapsed_ms = (finished - started) * 1000
+        slug = re.sub(r'[^A-Za-z0-9]+', '_', label).strip('_')
+        path = os.path.join(
+            self.output_dir, f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{slug}-{elapsed_ms:.0f}ms.folded"
+        )
+        with open(path, 'w') as f:
+            for stack, count in counts.most_common():
+                f.write(f"{stack} {count}\n")
+        logger.info(f"Slow request {label} took {elapsed_ms:.1f}ms; stacks written to {path}")
+        return path
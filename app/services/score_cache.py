@@ -0,0 +1,210 @@
+# app/services/score_cache.py
+import fnmatch
+import hashlib
+import threading
+import time
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+
+class InProcessKVStore:
+    """In-process stand-in for a Redis server.
+
+    Implements only the client calls ``SharedCacheBackend`` makes (``mget``,
+    ``set`` with ``px``, ``delete``, ``scan_iter``) with the same semantics,
+    so the shared path can be exercised without a server.
+    """
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[bytes, Optional[float]]] = {}
+        self._lock = threading.Lock()
+
+    def _live(self, name: str, now: float) -> Optional[bytes]:
+        entry = self._data.get(name)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= now:
+            del self._data[name]
+            return None
+        return value
+
+    def mget(self, names: Sequence[str]) -> List[Optional[bytes]]:
+        now = time.monotonic()
+        with self._lock:
+            return [self._live(name, now) for name in names]
+
+    def set(self, name: str, value: Any, px: Optional[int] = None) -> bool:
+        expires_at = time.monotonic() + px / 1000.0 if px else None
+        with self._lock:
+            self._data[name] = (str(value).encode(), expires_at)
+        return True
+
+    def delete(self, *names: str) -> int:
+        with self._lock:
+            return sum(self._data.pop(name, None) is not None for name in names)
+
+    def scan_iter(self, match: str = '*') -> List[str]:
+        with self._lock:
+            return [name for name in self._data if fnmatch.fnmatchcase(name, match)]
+
+
+class SharedCacheBackend:
+    """Score cache shared between workers through a Redis-compatible client.
+
+    Entries expire server-side after the TTL; bound memory with the server's
+    ``maxmemory`` and an ``allkeys-lru`` eviction policy.
+    """
+
+    def __init__(self, client: Any, prefix: str = 'fraud-score:'):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str) -> 'SharedCacheBackend':
+        if url == 'memory://':
+            return cls(InProcessKVStore())
+        import redis
+
+        return cls(redis.Redis.from_url(url))
+
+    def get_many(self, keys: Sequence[str]) -> List[Optional[float]]:
+        values = self.client.mget([self.prefix + key for key in keys])
+        return [float(value) if value is not None else None for value in values]
+
+    def set_many(self, items: Dict[str, float], ttl_seconds: float) -> None:
+        px = int(ttl_seconds * 1000) if ttl_seconds > 0 else None
+        for key, score in items.items():
+            self.client.set(self.prefix + key, repr(float(score)), px=px)
+
+    def clear(self) -> None:
+        names = list(self.client.scan_iter(match=self.prefix + '*'))
+        if names:
+            self.client.delete(*names)
+
+
+class ScoreCache:
+    """Bounded LRU + TTL cache of fraud scores keyed on the encoded claim.
+
+    The key is a hash of the canonical (encoded, unscaled) feature vector and
+    the model version, so claims that differ only in formatting, field order
+    or unknown categories share an entry, and a new model version never
+    reuses an old score. An optional shared backend is consulted on local
+    misses and filled on every model evaluation.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 300.0,
+                 shared: Optional[SharedCacheBackend] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self.shared = shared
+        self._entries: 'OrderedDict[str, Tuple[float, float]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    @staticmethod
+    def keys_for(X: np.ndarray, version: str) -> List[str]:
+        # + 0.0 folds -0.0 into 0.0 so equal vectors hash equally
+        rows = np.ascontiguousarray(X, dtype=np.float32) + np.float32(0.0)
+        prefix = version.encode() + b'\0'
+        return [hashlib.blake2b(prefix + row.tobytes(), digest_size=16).hexdigest() for row in rows]
+
+    def lookup(self, keys: Sequence[str]) -> np.ndarray:
+        """Cached scores for ``keys``, NaN where there is no live entry."""
+        scores = np.full(len(keys), np.nan)
+        if not self.enabled:
+            return scores
+        now = time.monotonic()
+        missing: List[int] = []
+        with self._lock:
+            for i, key in enumerate(keys):
+                entry = self._entries.get(key)
+                if entry is not None and entry[1] > now:
+                    self._entries.move_to_end(key)
+                    scores[i] = entry[0]
+                else:
+                    if entry is not None:
+                        del self._entries[key]
+                    missing.append(i)
+
+        if missing and self.shared is not None:
+            try:
+                found = self.shared.get_many([keys[i] for i in missing])
+            except Exception as e:
+                logger.warning(f"Shared score cache lookup failed: {e}")
+                found = [None] * len(missing)
+            shared_hits = {keys[i]: score for i, score in zip(missing, found) if score is not None}
+            for i, score in zip(missing, found):
+                if score is not None:
+                    scores[i] = score
+            if shared_hits:
+                self._put(shared_hits)
+                self.shared_hits += len(shared_hits)
+            missing = [i for i, score in zip(missing, found) if score is None]
+
+        hits = len(keys) - len(missing)
+        self.hits += hits
+        self.misses += len(missing)
+        if hits:
+            CACHE_REQUESTS.inc(hits, cache='score', result='hit')
+        if missing:
+            CACHE_REQUESTS.inc(len(missing), cache='score', result='miss')
+        return scores
+
+    def store(self, keys: Sequence[str], scores: Sequence[float]) -> None:
+        if not self.enabled:
+            return
+        items = {key: float(score) for key, score in zip(keys, scores)}
+        self._put(items)
+        if self.shared is not None:
+            try:
+                self.shared.set_many(items, self.ttl)
+            except Exception as e:
+                logger.warning(f"Shared score cache update failed: {e}")
+
+    def _put(self, items: Dict[str, float]) -> None:
+        expires_at = time.monotonic() + self.ttl if self.ttl > 0 else float('inf')
+        with self._lock:
+            for key, score in items.items():
+                self._entries[key] = (score, expires_at)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self) -> None:
+        """Drop every local entry; shared entries are already scoped by model version."""
+        with self._lock:
+            self._entries.clear()
+        self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "shared": type(self.shared.client).__name__ if self.shared is not None else None,
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,160 @@
+import argparse
+import logging
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from model import InsuranceFraudModel
+from risk_rules import RULES_PATH, RiskRuleEngine
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_PATH = 'models/fraud_model.keras'
+JSONL_SUFFIXES = ('.jsonl', '.ndjson', '.json')
+
+_worker_model: Optional[InsuranceFraudModel] = None
+_worker_rules: Optional[RiskRuleEngine] = None
+
+
+def read_chunks(path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Yield fixed-size DataFrame chunks from a CSV or JSON Lines claims file."""
+    if path.lower().endswith(JSONL_SUFFIXES):
+        reader = pd.read_json(path, lines=True, chunksize=chunk_size, convert_dates=False)
+    else:
+        reader = pd.read_csv(path, chunksize=chunk_size)
+    with reader:
+        for chunk in reader:
+            yield chunk
+
+
+def score_chunk(model: InsuranceFraudModel, chunk: Union[pd.DataFrame, List[Dict[str, Any]]],
+                offset: int = 0, rules: Optional[RiskRuleEngine] = None) -> pd.DataFrame:
+    """Score a chunk of claims with one vectorized preprocess and forward pass.
+
+    With ``rules``, the names of each claim's triggered risk factors are added
+    as a ``risk_factors`` column, evaluated over the whole chunk at once.
+    """
+    X_scaled = model.pipeline.transform(chunk, scale=True)
+    probabilities = model.predict_proba_scaled(X_scaled)
+
+    if isinstance(chunk, pd.DataFrame):
+        policy_numbers = chunk['policy_number'].tolist() if 'policy_number' in chunk.columns else None
+    else:
+        policy_numbers = [record.get('policy_number') for record in chunk]
+
+    result = pd.DataFrame({
+        'row': np.arange(offset, offset + len(probabilities)),
+        'fraud_probability': probabilities.astype(float),
+        'is_fraudulent': probabilities >= model.thresholds['fraud'],
+    })
+    if policy_numbers is not None:
+        result.insert(1, 'policy_number', policy_numbers)
+    if rules is not None:
+        factors = rules.evaluate(chunk, probabilities, model.thresholds)
+        result['risk_factors'] = [[factor['factor'] for factor in claim_factors] for claim_factors in factors]
+    return result
+
+
+def _init_worker(model_path: str, rules_path: Optional[str]) -> None:
+    global _worker_model, _worker_rules
+    _worker_model = InsuranceFraudModel(model_path)
+    _worker_rules = RiskRuleEngine(rules_path) if rules_path else None
+
+
+def _score_in_worker(chunk: pd.DataFrame, offset: int) -> pd.DataFrame:
+    return score_chunk(_worker_model, chunk, offset, _worker_rules)
+
+
+def _write_chunk(result: pd.DataFrame, output_path: str, first: bool) -> None:
+    mode = 'w' if first else 'a'
+    if output_path.lower().endswith(JSONL_SUFFIXES):
+        with open(output_path, mode) as f:
+            f.write(result.to_json(orient='records', lines=True).rstrip('\n') + '\n')
+    else:
+        if 'risk_factors' in result.columns:
+            result = result.assign(risk_factors=result['risk_factors'].str.join('; '))
+        result.to_csv(output_path, mode=mode, header=first, index=False)
+
+
+def score_file(input_path: str, output_path: str, model_path: str = DEFAULT_MODEL_PATH,
+               chunk_size: int = 10000, workers: int = 1,
+               rules_path: Optional[str] = RULES_PATH) -> Dict[str, float]:
+    """Stream ``input_path`` through the model chunk by chunk and append results to ``output_path``.
+
+    At most ``2 * workers`` chunks are in flight, so memory stays bounded by the
+    chunk size regardless of the file size.
+    """
+    start = time.perf_counter()
+    rows = 0
+    chunks = 0
+
+    def report(result: pd.DataFrame) -> None:
+        nonlocal rows, chunks
+        _write_chunk(result, output_path, first=chunks == 0)
+        rows += len(result)
+        chunks += 1
+        elapsed = time.perf_counter() - start
+        logger.info(f"Scored {rows} rows in {elapsed:.1f}s ({rows / elapsed:.0f} rows/sec)")
+
+    try:
+        offset = 0
+        if workers <= 1:
+            model = InsuranceFraudModel(model_path)
+            rules = RiskRuleEngine(rules_path) if rules_path else None
+            for chunk in read_chunks(input_path, chunk_size):
+                report(score_chunk(model, chunk, offset, rules))
+                offset += len(chunk)
+        else:
+            # TensorFlow is not fork-safe once initialised, so workers are spawned
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                     initializer=_init_worker, initargs=(model_path, rules_path)) as pool:
+                pending = deque()
+                for chunk in read_chunks(input_path, chunk_size):
+                    pending.append(pool.submit(_score_in_worker, chunk, offset))
+                    offset += len(chunk)
+                    # Results are written in input order; cap the in-flight window
+                    if len(pending) >= 2 * workers:
+                        report(pending.popleft().result())
+                while pending:
+                    report(pending.popleft().result())
+    except Exception as e:
+        logger.error(f"Batch scoring failed: {e}")
+        raise
+
+    elapsed = time.perf_counter() - start
+    stats = {
+        'rows': rows,
+        'chunks': chunks,
+        'seconds': elapsed,
+        'rows_per_sec': rows / elapsed if elapsed > 0 else 0.0,
+    }
+    logger.info(f"Batch scoring completed: {rows} rows in {elapsed:.2f}s ({stats['rows_per_sec']:.0f} rows/sec)")
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Score a CSV/JSONL claims extract in fixed-size chunks.")
+    parser.add_argument('input', help="Claims file in the insurance_claims.csv column layout (.csv or .jsonl)")
+    parser.add_argument('output', help="Output file (.csv or .jsonl)")
+    parser.add_argument('--model', default=DEFAULT_MODEL_PATH, help="Path to the trained Keras model")
+    parser.add_argument('--chunk-size', type=int, default=10000, help="Rows per scoring chunk")
+    parser.add_argument('--workers', type=int, default=1, help="Scoring processes (default: 1, in-process)")
+    parser.add_argument('--rules', default=RULES_PATH, help="Risk factor rules file")
+    parser.add_argument('--no-rules', action='store_true', help="Skip risk factor evaluation")
+    args = parser.parse_args(argv)
+
+    if args.workers > os.cpu_count():
+        logger.warning(f"--workers={args.workers} exceeds the {os.cpu_count()} available CPUs")
+    score_file(args.input, args.output, args.model, args.chunk_size, args.workers,
+               None if args.no_rules else args.rules)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Benchmark suite for the training and serving paths; run ``python -m benchmarks.run``."""
@@ -0,0 +1,135 @@
+"""Side-by-side comparison of the model backends: train time, throughput, memory and AUC.
+
+Every backend is trained on the same data and stratified split, in its own
+interpreter (so peak RSS is per backend) and in a scratch working directory
+(so training callbacks never touch ``models/``).
+
+    python -m benchmarks.backends --data benchmarks/data/claims_100000.csv
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+from benchmarks.common import result
+
+SUITE = 'backends'
+BATCH_SIZES = (1, 64, 4096)
+
+
+def _throughput(predict: Any, X: np.ndarray, batch_size: int, min_seconds: float = 0.5) -> float:
+    batch = np.resize(X, (batch_size, X.shape[1])).astype(np.float32)
+    predict(batch)
+    calls, started = 0, time.perf_counter()
+    while True:
+        predict(batch)
+        calls += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds:
+            return calls * batch_size / elapsed
+
+
+def measure(backend: str, data_path: str, epochs: int) -> Dict[str, Any]:
+    """Train ``backend`` in this process and measure it; run via ``--measure``."""
+    from sklearn.metrics import roc_auc_score
+
+    from dataset import load_claims
+    from model import InsuranceFraudModel
+
+    data = load_claims(data_path)
+    fraud_model = InsuranceFraudModel(backend=backend)
+    started = time.perf_counter()
+    fitted = fraud_model.fit(data, epochs=epochs)
+    train_s = time.perf_counter() - started
+    X_val, y_val = fitted['X_val'], fitted['y_val']
+
+    model_dir = tempfile.mkdtemp(prefix=f'backend-{backend}-')
+    fraud_model.backend.save(fraud_model.model, model_dir)
+    serving_file = os.path.join(model_dir, fraud_model.backend.model_files[0])
+    engines = {'native': fraud_model.model.predict_on_batch}
+    if backend == 'keras':
+        # Deployments serve the NumPy export, not TensorFlow
+        engines['numpy'] = fraud_model.backend.load(serving_file).predict_on_batch
+    return {
+        'train_s': train_s,
+        'auc': float(roc_auc_score(y_val, fraud_model.predict_proba_scaled(X_val))),
+        'artifact_mb': os.path.getsize(serving_file) / 2 ** 20,
+        'rows_per_s': {
+            engine: {str(size): _throughput(predict, X_val, size) for size in BATCH_SIZES}
+            for engine, predict in engines.items()
+        },
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'rows': len(data),
+    }
+
+
+def _measure_in_subprocess(backend: str, data_path: str, epochs: int) -> Dict[str, Any]:
+    repo = os.getcwd()
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [repo, os.getenv('PYTHONPATH')])))
+    with tempfile.TemporaryDirectory(prefix='backend-bench-') as workdir:
+        completed = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.backends', '--measure', backend,
+             '--data', os.path.abspath(data_path), '--epochs', str(epochs)],
+            capture_output=True, text=True, env=env, cwd=workdir,
+        )
+    if completed.returncode != 0:
+        raise RuntimeError(f"{backend} benchmark failed:\n{completed.stderr[-2000:]}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def run(data_path: str = 'insurance_claims.csv', quick: bool = False,
+        backends: Sequence[str] = ('keras', 'hist_gbt'), epochs: int = 50) -> List[Dict[str, Any]]:
+    results = []
+    for backend in backends:
+        stats = _measure_in_subprocess(backend, data_path, 5 if quick else epochs)
+        results.append(result(SUITE, backend, 'train_s', stats['train_s'], 's', rows=stats['rows']))
+        results.append(result(SUITE, backend, 'auc', stats['auc'], 'auc', 'higher', rows=stats['rows']))
+        results.append(result(SUITE, backend, 'artifact_mb', stats['artifact_mb'], 'MB'))
+        results.append(result(SUITE, backend, 'peak_rss_mb', stats['peak_rss_mb'], 'MB'))
+        for engine, by_size in stats['rows_per_s'].items():
+            for size, value in by_size.items():
+                results.append(result(SUITE, backend, 'rows_per_s', value, 'rows/s', 'higher',
+                                      engine=engine, batch_size=int(size)))
+    return results
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--data', default='insurance_claims.csv')
+    parser.add_argument('--backends', default='keras,hist_gbt')
+    parser.add_argument('--epochs', type=int, default=50, help="Keras epochs (early stopping still applies)")
+    parser.add_argument('--measure', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.measure:
+        print(json.dumps(measure(args.measure, args.data, args.epochs)))
+        return
+
+    results = run(args.data, backends=args.backends.split(','), epochs=args.epochs)
+    by_backend: Dict[str, Dict[str, float]] = {}
+    for record in results:
+        params = record['params']
+        column = record['metric'] if record['metric'] != 'rows_per_s' else \
+            f"{params['engine']}@{params['batch_size']}"
+        by_backend.setdefault(record['name'], {})[column] = record['value']
+    columns = ['train_s', 'auc', 'artifact_mb', 'peak_rss_mb'] + sorted(
+        {column for row in by_backend.values() for column in row if '@' in column},
+        key=lambda column: (column.split('@')[0], int(column.split('@')[1])),
+    )
+    print(f"{'backend':<10} " + ' '.join(f"{column:>14}" for column in columns))
+    for backend, row in by_backend.items():
+        print(f"{backend:<10} " + ' '.join(
+            f"{row[column]:>14.3f}" if column in row else f"{'-':>14}" for column in columns
+        ))
+    print("rows/s columns are <engine>@<batch size>; 'numpy' is the Keras model's serving export")
+
+
+if __name__ == "__main__":
+    main()
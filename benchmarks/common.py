@@ -0,0 +1,145 @@
+"""Timing helpers, result records and baseline comparison shared by the benchmarks."""
+import json
+import os
+import platform
+import subprocess
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+RESULTS_DIR = 'benchmarks/results'
+BASELINE_PATH = 'benchmarks/baseline.json'
+RESULTS_FORMAT_VERSION = 1
+
+
+def result(suite: str, name: str, metric: str, value: float, unit: str, better: str = 'lower',
+           budget: Optional[float] = None, **params: Any) -> Dict[str, Any]:
+    """One measurement; ``better`` is 'lower' for latencies and 'higher' for throughputs.
+
+    ``budget`` is an absolute limit checked on every run, independent of the baseline.
+    """
+    record = {
+        'suite': suite, 'name': name, 'metric': metric, 'value': float(value),
+        'unit': unit, 'better': better, 'params': params,
+    }
+    if budget is not None:
+        record['budget'] = float(budget)
+    return record
+
+
+def over_budget(record: Dict[str, Any]) -> bool:
+    budget = record.get('budget')
+    if budget is None:
+        return False
+    return record['value'] > budget if record['better'] == 'lower' else record['value'] < budget
+
+
+def result_key(record: Dict[str, Any]) -> Tuple[str, str, str, str]:
+    return (record['suite'], record['name'], record['metric'], json.dumps(record['params'], sort_keys=True))
+
+
+def time_call(fn: Callable[[], Any], repeats: int = 3, warmup: int = 1) -> float:
+    """Best-of-``repeats`` wall time of ``fn()`` in seconds."""
+    for _ in range(warmup):
+        fn()
+    best = float('inf')
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def latency_samples(fn: Callable[[int], Any], calls: int, warmup: int = 20) -> np.ndarray:
+    """Per-call latencies of ``fn(i)`` in milliseconds."""
+    for i in range(warmup):
+        fn(i)
+    timings = np.empty(calls)
+    for i in range(calls):
+        started = time.perf_counter()
+        fn(i)
+        timings[i] = time.perf_counter() - started
+    return timings * 1000
+
+
+def latency_results(suite: str, name: str, timings_ms: Iterable[float], **params: Any) -> List[Dict[str, Any]]:
+    arr = np.asarray(list(timings_ms), dtype=np.float64)
+    return [
+        result(suite, name, f'p{q}_ms', np.percentile(arr, q), 'ms', **params)
+        for q in (50, 95, 99)
+    ]
+
+
+def environment() -> Dict[str, Any]:
+    import pandas as pd
+
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'git_commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+    }
+
+
+def write_results(results: List[Dict[str, Any]], path: Optional[str] = None) -> str:
+    path = path or os.path.join(RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    document = {
+        'format_version': RESULTS_FORMAT_VERSION,
+        'created_at': datetime.now().isoformat(),
+        'environment': environment(),
+        'results': results,
+    }
+    with open(path, 'w') as f:
+        json.dump(document, f, indent=2)
+    return path
+
+
+def load_results(path: str) -> List[Dict[str, Any]]:
+    with open(path) as f:
+        return json.load(f)['results']
+
+
+def compare(current: List[Dict[str, Any]], baseline: List[Dict[str, Any]],
+            tolerance: float = 0.10) -> List[Dict[str, Any]]:
+    """Match results against the baseline and flag changes worse than ``tolerance``."""
+    reference = {result_key(record): record for record in baseline}
+    rows = []
+    for record in current:
+        base = reference.get(result_key(record))
+        if base is None or base['value'] == 0:
+            continue
+        change = (record['value'] - base['value']) / abs(base['value'])
+        worse = change if record['better'] == 'lower' else -change
+        rows.append({
+            'key': result_key(record),
+            'baseline': base['value'],
+            'current': record['value'],
+            'unit': record['unit'],
+            'change': change,
+            'regression': worse > tolerance,
+        })
+    return rows
+
+
+def load_serving_model() -> Any:
+    """The model the API would serve: the current bundle, else the legacy model directory."""
+    from bundle import BundleError, load_bundle
+    from model import InsuranceFraudModel
+
+    try:
+        return load_bundle()
+    except BundleError:
+        return InsuranceFraudModel(
+            'models/fraud_model.npz' if os.path.exists('models/fraud_model.npz') else 'models/fraud_model.keras'
+        )
@@ -0,0 +1,88 @@
+"""Scale ``insurance_claims.csv`` up to millions of synthetic claims.
+
+Rows are bootstrapped from the source file, so low-cardinality categoricals
+keep their vocabularies and frequencies and each claim keeps its label and
+feature correlations. Numeric fields are jittered, dates are shifted, and
+identifier-like columns (policy number, zip, street address) are regenerated
+so their cardinality grows with the row count as it would in production::
+
+    python -m benchmarks.generate_claims --rows 1000000 --output benchmarks/data/claims_1m.csv --arrow
+"""
+import argparse
+import logging
+import os
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from preprocessing import DATE_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+CLAIM_PARTS = ['injury_claim', 'property_claim', 'vehicle_claim']
+INTEGER_JITTER = {'months_as_customer': 6, 'age': 2, 'incident_hour_of_the_day': 1}
+
+
+def generate_chunk(source: pd.DataFrame, rng: np.random.Generator, start: int, rows: int) -> pd.DataFrame:
+    chunk = source.iloc[rng.integers(0, len(source), rows)].reset_index(drop=True)
+
+    for col, spread in INTEGER_JITTER.items():
+        low, high = source[col].min(), source[col].max()
+        chunk[col] = np.clip(chunk[col] + rng.integers(-spread, spread + 1, rows), low, high)
+    chunk['policy_annual_premium'] = (chunk['policy_annual_premium'] * rng.lognormal(0.0, 0.05, rows)).round(2)
+
+    # Scale the claim components together so the total stays their sum
+    factor = rng.lognormal(0.0, 0.1, rows)
+    for col in CLAIM_PARTS:
+        chunk[col] = (chunk[col] * factor).round(-1).astype(np.int64)
+    chunk['total_claim_amount'] = chunk[CLAIM_PARTS].sum(axis=1)
+
+    for col in DATE_COLUMNS:
+        shift = pd.to_timedelta(rng.integers(-15, 16, rows), unit='D')
+        chunk[col] = (pd.to_datetime(chunk[col]) + shift).dt.strftime('%Y-%m-%d')
+
+    chunk['policy_number'] = np.arange(start, start + rows) + 100000
+    chunk['insured_zip'] = rng.integers(source['insured_zip'].min(), source['insured_zip'].max() + 1, rows)
+    streets = source['incident_location'].str.split(' ', n=1).str[1].unique()
+    chunk['incident_location'] = (
+        pd.Series(rng.integers(1000, 10000, rows)).astype(str) + ' ' + streets[rng.integers(0, len(streets), rows)]
+    )
+    return chunk
+
+
+def generate(source_path: str, output_path: str, rows: int, chunk_size: int = 250000, seed: int = 0,
+             arrow: bool = False) -> str:
+    source = pd.read_csv(source_path)
+    rng = np.random.default_rng(seed)
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    tmp_path = output_path + '.tmp'
+    with open(tmp_path, 'w', newline='') as f:
+        for start in range(0, rows, chunk_size):
+            chunk = generate_chunk(source, rng, start, min(chunk_size, rows - start))
+            chunk.to_csv(f, header=start == 0, index=False)
+            logger.info(f"Generated {start + len(chunk)}/{rows} rows")
+    os.replace(tmp_path, output_path)
+    if arrow:
+        from dataset import convert_csv
+
+        convert_csv(output_path)
+    return output_path
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic claims dataset for benchmarking.")
+    parser.add_argument('--source', default='insurance_claims.csv')
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--output', help="Default: benchmarks/data/claims_<rows>.csv")
+    parser.add_argument('--chunk-size', type=int, default=250000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--arrow', action='store_true', help="Also write the memory-mappable columnar copy")
+    args = parser.parse_args(argv)
+    output = args.output or os.path.join('benchmarks', 'data', f'claims_{args.rows}.csv')
+    generate(args.source, output, args.rows, args.chunk_size, args.seed, args.arrow)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,82 @@
+"""In-process load test of the FastAPI app: throughput and tail latency per concurrency.
+
+Requests go through the full ASGI stack (routing, validation, micro-batching,
+serialization) via ``httpx.ASGITransport``, so no server or network is
+involved and results reflect the service itself.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+from benchmarks.common import latency_results, result
+from dataset import load_claims
+
+logger = logging.getLogger(__name__)
+
+SUITE = 'load'
+
+
+async def _run_level(client: Any, path: str, payloads: List[Dict[str, Any]], concurrency: int,
+                     requests: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors = 0
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index, errors
+        while next_index < requests:
+            payload = payloads[next_index % len(payloads)]
+            next_index += 1
+            started = time.perf_counter()
+            response = await client.post(path, json=payload)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {'latencies_ms': np.asarray(latencies), 'throughput': len(latencies) / elapsed, 'errors': errors}
+
+
+async def _run(payloads: List[Dict[str, Any]], concurrencies: Sequence[int], requests: int,
+               path: str) -> List[Dict[str, Any]]:
+    import httpx
+
+    from app.main import app, ready
+
+    results = []
+    # ASGITransport does not send lifespan events; run startup so the warm-up gate opens
+    await app.router.startup()
+    await ready.wait()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://benchmark') as client:
+        await _run_level(client, path, payloads, 4, 100)
+        for concurrency in concurrencies:
+            level = await _run_level(client, path, payloads, concurrency, requests)
+            results.extend(latency_results(SUITE, path, level['latencies_ms'], concurrency=concurrency))
+            results.append(result(SUITE, path, 'requests_per_s', level['throughput'], 'req/s', 'higher',
+                                  concurrency=concurrency))
+            results.append(result(SUITE, path, 'errors', level['errors'], 'requests', concurrency=concurrency))
+            logger.info(f"{path} concurrency={concurrency}: {level['throughput']:.0f} req/s, "
+                        f"p99 {np.percentile(level['latencies_ms'], 99):.1f}ms")
+    await app.router.shutdown()
+    return results
+
+
+def run(data_path: str = 'insurance_claims.csv', quick: bool = False,
+        concurrencies: Sequence[int] = (1, 8, 32, 128), path: str = '/api/predict') -> List[Dict[str, Any]]:
+    claims = load_claims(data_path).head(1000)
+    # JSON has no NaN; missing fields fall back to the request model's defaults
+    payloads = [
+        {key: value for key, value in record.items() if value is not None}
+        for record in claims.astype(object).where(claims.notna(), None).to_dict('records')
+    ]
+    for payload in payloads:
+        for key, value in payload.items():
+            if hasattr(value, 'isoformat'):
+                payload[key] = value.strftime('%Y-%m-%d')
+    return asyncio.run(_run(payloads, concurrencies, 300 if quick else 2000, path))
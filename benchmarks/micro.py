@@ -0,0 +1,106 @@
+"""Microbenchmarks for preprocessing, prediction, analytics aggregation and the claim index."""
+import logging
+import time
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import latency_results, latency_samples, load_serving_model, result, time_call
+from dataset import load_claims
+
+logger = logging.getLogger(__name__)
+
+SUITE = 'micro'
+
+
+def bench_preprocess(data: pd.DataFrame, repeats: int) -> List[Dict[str, Any]]:
+    from model import InsuranceFraudModel
+    from preprocessing import FeaturePipeline
+
+    rows = len(data)
+    pipeline = FeaturePipeline()
+    sample = data.head(20000)
+    records = sample.astype(object).where(sample.notna(), None).to_dict('records')
+    # The legacy path expects CSV dtypes, not the columnar copy's dictionary-encoded strings
+    legacy = data.astype({col: object for col in data.select_dtypes('category').columns})
+    timings = {
+        'preprocess_data': time_call(lambda: InsuranceFraudModel().preprocess_data(legacy), repeats),
+        'pipeline_fit': time_call(lambda: pipeline.fit(data), repeats),
+        'pipeline_transform_frame': time_call(lambda: pipeline.transform(data, scale=False), repeats),
+    }
+    results = []
+    for name, seconds in timings.items():
+        results.append(result(SUITE, name, 'seconds', seconds, 's', rows=rows))
+        results.append(result(SUITE, name, 'rows_per_s', rows / seconds, 'rows/s', 'higher', rows=rows))
+    seconds = time_call(lambda: pipeline.transform(records), repeats)
+    results.append(result(SUITE, 'pipeline_transform_records', 'rows_per_s', len(records) / seconds, 'rows/s',
+                          'higher', rows=len(records)))
+    return results
+
+
+def bench_predict(data: pd.DataFrame, batch_sizes: Sequence[int], calls: int) -> List[Dict[str, Any]]:
+    fraud_model = load_serving_model()
+    sample = data.head(max(batch_sizes) * 4)
+    records = sample.astype(object).where(sample.notna(), None).to_dict('records')
+    results = []
+    for batch_size in batch_sizes:
+        batches = [records[i:i + batch_size] for i in range(0, len(records) - batch_size + 1, batch_size)] or [records]
+        n_calls = max(10, min(calls, calls * 64 // batch_size))
+        timings = latency_samples(lambda i: fraud_model.predict_proba(batches[i % len(batches)]), n_calls)
+        results.extend(latency_results(SUITE, 'predict_proba', timings, batch_size=batch_size))
+        results.append(result(SUITE, 'predict_proba', 'rows_per_s', batch_size / (np.median(timings) / 1000),
+                              'rows/s', 'higher', batch_size=batch_size))
+
+    frame = data.head(max(batch_sizes))
+    seconds = time_call(lambda: fraud_model.predict(frame), 5)
+    results.append(result(SUITE, 'predict', 'rows_per_s', len(frame) / seconds, 'rows/s', 'higher',
+                          batch_size=len(frame)))
+    return results
+
+
+def bench_analytics(data_path: str, repeats: int) -> List[Dict[str, Any]]:
+    from app.services.analytics_store import AnalyticsStore
+
+    store = AnalyticsStore(data_path)
+    results = [result(SUITE, 'analytics_load', 'seconds', time_call(store.load, repeats, warmup=0), 's')]
+    claim = {'auto_make': 'Honda', 'incident_type': 'Vehicle Theft', 'total_claim_amount': 1000.0}
+
+    def cold_summary():
+        # record() invalidates the cached summary, as a scored claim would
+        store.record([claim], [False])
+        store.summary()
+
+    timings = latency_samples(lambda i: cold_summary(), 200)
+    results.extend(latency_results(SUITE, 'get_analytics_cold', timings))
+    timings = latency_samples(lambda i: store.summary(), 2000)
+    results.extend(latency_results(SUITE, 'get_analytics_cached', timings))
+    timings = latency_samples(lambda i: store.breakdown('auto_make'), 500)
+    results.extend(latency_results(SUITE, 'get_analytics_breakdown', timings))
+    return results
+
+
+def bench_claim_index(data: pd.DataFrame, data_path: str) -> List[Dict[str, Any]]:
+    from app.services.claim_index import ClaimIndex
+
+    started = time.perf_counter()
+    index = ClaimIndex.build(data_path)
+    results = [result(SUITE, 'claim_index_build', 'seconds', time.perf_counter() - started, 's', rows=len(data))]
+    sample = data.head(1000)
+    records = sample.astype(object).where(sample.notna(), None).to_dict('records')
+    for record in records:
+        record['incident_date'] = str(record['incident_date'])[:10]
+    timings = latency_samples(lambda i: index.query(records[i % len(records)]), 2000)
+    results.extend(latency_results(SUITE, 'claim_index_query', timings))
+    return results
+
+
+def run(data_path: str = 'insurance_claims.csv', quick: bool = False) -> List[Dict[str, Any]]:
+    data = load_claims(data_path)
+    logger.info(f"Microbenchmarks on {len(data)} rows from {data_path}")
+    repeats = 1 if quick else 3
+    results = bench_preprocess(data, repeats)
+    results.extend(bench_predict(data, (1, 64, 1024) if quick else (1, 64, 1024, 8192), 200 if quick else 1000))
+    results.extend(bench_analytics(data_path, repeats))
+    results.extend(bench_claim_index(data, data_path))
+    return results
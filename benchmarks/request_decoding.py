@@ -0,0 +1,72 @@
+"""Per-request latency of single-claim decoding: DataFrame path vs. record fast path.
+
+Run from the repository root:
+
+    python -m benchmarks.request_decoding --requests 3000
+"""
+import argparse
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import latency_results, latency_samples
+from dataset import load_claims
+
+SUITE = 'decode'
+
+
+def claim_dataframe(claim: Any) -> pd.DataFrame:
+    """The pre-fast-path request decoding: a one-row DataFrame shaped like the training CSV."""
+    data = claim.dict(by_alias=True)
+    data['policy_number'] = 'DUMMY'
+    data['_c39'] = 0
+    return pd.DataFrame([data]).rename(columns={'capital_gains': 'capital-gains', 'capital_loss': 'capital-loss'})
+
+
+def run(data_path: str = 'insurance_claims.csv', quick: bool = False, requests: int = 3000) -> List[Dict[str, Any]]:
+    from app.main import ClaimRequest, registry
+
+    fraud_model = registry.active
+    pipeline = fraud_model.pipeline
+    claims = [ClaimRequest(**row) for row in load_claims(data_path).head(1000).to_dict('records')]
+    row = np.empty((1, pipeline.n_features), dtype=np.float32)
+    requests = 500 if quick else requests
+
+    def dataframe_decode(claim: Any) -> np.ndarray:
+        return pipeline.transform(claim_dataframe(claim), scale=True)
+
+    def fast_decode(claim: Any) -> np.ndarray:
+        return pipeline.transform_one(claim.dict(by_alias=True), scale=True, out=row[0])
+
+    cases = {
+        'decode_dataframe': dataframe_decode,
+        'decode_fast_path': fast_decode,
+        'decode_score_dataframe': lambda claim: fraud_model.predict_proba_scaled(dataframe_decode(claim)),
+        'decode_score_fast_path': lambda claim: fraud_model.predict_proba_scaled(fast_decode(claim)[None]),
+    }
+    assert np.allclose(dataframe_decode(claims[0]), fast_decode(claims[0]))
+
+    results = []
+    for name, fn in cases.items():
+        timings = latency_samples(lambda i: fn(claims[i % len(claims)]), requests)
+        results.extend(latency_results(SUITE, name, timings))
+    return results
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--data', default='insurance_claims.csv')
+    parser.add_argument('--requests', type=int, default=3000)
+    args = parser.parse_args(argv)
+
+    print(f"{'path':<26} {'p50 us':>10} {'p95 us':>10} {'p99 us':>10}")
+    by_name: Dict[str, Dict[str, float]] = {}
+    for record in run(args.data, requests=args.requests):
+        by_name.setdefault(record['name'], {})[record['metric']] = record['value'] * 1000
+    for name, stats in by_name.items():
+        print(f"{name:<26} {stats['p50_ms']:>10.1f} {stats['p95_ms']:>10.1f} {stats['p99_ms']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
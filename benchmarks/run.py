@@ -0,0 +1,85 @@
+"""Run the benchmark suites, write machine-readable results and compare with a baseline.
+
+    python -m benchmarks.run                                   # all suites on insurance_claims.csv
+    python -m benchmarks.run --suites micro --data benchmarks/data/claims_1000000.csv
+    python -m benchmarks.run --save-baseline                   # record the reference numbers
+
+Exits with status 1 when any metric is worse than the baseline by more than
+``--tolerance``, or misses its absolute budget.
+"""
+import argparse
+import logging
+import os
+import shutil
+import sys
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks import backends, load, micro, request_decoding, startup
+from benchmarks.common import BASELINE_PATH, compare, load_results, over_budget, write_results
+
+logger = logging.getLogger(__name__)
+
+SUITES: Dict[str, Callable[..., List[Dict[str, Any]]]] = {
+    'micro': micro.run,
+    'decode': request_decoding.run,
+    'load': load.run,
+    'startup': startup.run,
+    'backends': backends.run,
+}
+# 'backends' trains every model backend, so it only runs when asked for
+DEFAULT_SUITES = ('micro', 'decode', 'load', 'startup')
+
+
+def _format_params(params: Dict[str, Any]) -> str:
+    return ','.join(f"{key}={value}" for key, value in sorted(params.items()))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the benchmark suite.")
+    parser.add_argument('--suites', default=','.join(DEFAULT_SUITES), help=f"Comma-separated subset of {list(SUITES)}")
+    parser.add_argument('--data', default='insurance_claims.csv')
+    parser.add_argument('--quick', action='store_true', help="Fewer repetitions, for smoke runs")
+    parser.add_argument('--output', help="Results file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--tolerance', type=float, default=0.10, help="Allowed relative slowdown (default 10%%)")
+    parser.add_argument('--save-baseline', action='store_true', help="Store these results as the new baseline")
+    args = parser.parse_args(argv)
+
+    results: List[Dict[str, Any]] = []
+    for name in args.suites.split(','):
+        if name not in SUITES:
+            parser.error(f"Unknown suite '{name}'")
+        logger.info(f"Running {name} benchmarks")
+        results.extend(SUITES[name](args.data, quick=args.quick))
+
+    path = write_results(results, args.output)
+    print(f"{'suite':<7} {'benchmark':<28} {'params':<22} {'metric':<12} {'value':>14}")
+    for record in results:
+        print(f"{record['suite']:<7} {record['name']:<28} {_format_params(record['params']):<22} "
+              f"{record['metric']:<12} {record['value']:>14.3f} {record['unit']}")
+    print(f"Results written to {path}")
+
+    status = 0
+    for record in filter(over_budget, results):
+        print(f"  OVER BUDGET {record['suite']}/{record['name']} {record['metric']}: "
+              f"{record['value']:.3f} {record['unit']} (budget {record['budget']:g})")
+        status = 1
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline) or '.', exist_ok=True)
+        shutil.copyfile(path, args.baseline)
+        print(f"Baseline saved to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        rows = compare(results, load_results(args.baseline), args.tolerance)
+        regressions = [row for row in rows if row['regression']]
+        print(f"\nCompared {len(rows)} metrics with {args.baseline}: {len(regressions)} regressions")
+        for row in regressions:
+            suite, name, metric, params = row['key']
+            print(f"  REGRESSION {suite}/{name} {params} {metric}: "
+                  f"{row['baseline']:.3f} -> {row['current']:.3f} {row['unit']} ({row['change']:+.1%})")
+        status = 1 if regressions else status
+    return status
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""Cold-start cost of the API: import time, time to first prediction and peak memory.
+
+Each run is a fresh interpreter importing ``app.main`` (which loads and warms
+up the serving model) and scoring one claim. The results carry absolute
+budgets, so ``benchmarks.run`` fails when startup slows down past them or
+TensorFlow sneaks back into the serving import path.
+
+    python -m benchmarks.startup --runs 5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Any, Dict, List
+
+from benchmarks.common import result
+
+SUITE = 'startup'
+
+# Override with STARTUP_BUDGET_<METRIC>, e.g. STARTUP_BUDGET_IMPORT_S=1.5
+BUDGETS = {
+    'import_s': 3.0,
+    'first_prediction_s': 3.5,
+    'peak_rss_mb': 400.0,
+    'tensorflow_imported': 0,
+}
+UNITS = {'import_s': 's', 'first_prediction_s': 's', 'peak_rss_mb': 'MB', 'tensorflow_imported': 'bool'}
+
+PROBE = """
+import json, resource, sys, time
+started = time.perf_counter()
+import app.main as main
+imported = time.perf_counter()
+main.score_claims([{'total_claim_amount': 15000.0}])
+scored = time.perf_counter()
+print(json.dumps({
+    'import_s': imported - started,
+    'first_prediction_s': scored - started,
+    'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'tensorflow_imported': int('tensorflow' in sys.modules),
+}))
+"""
+
+
+def budget(metric: str) -> float:
+    return float(os.getenv(f'STARTUP_BUDGET_{metric.upper()}', BUDGETS[metric]))
+
+
+def probe() -> Dict[str, float]:
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [os.getcwd(), os.getenv('PYTHONPATH')])))
+    completed = subprocess.run([sys.executable, '-c', PROBE], capture_output=True, text=True, env=env)
+    if completed.returncode != 0:
+        raise RuntimeError(f"Startup probe failed:\n{completed.stderr[-2000:]}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def run(data_path: str = 'insurance_claims.csv', quick: bool = False, runs: int = 5) -> List[Dict[str, Any]]:
+    samples = [probe() for _ in range(1 if quick else runs)]
+    results = []
+    for metric in BUDGETS:
+        # Best run for timings (noise only ever adds time), worst run for memory and imports
+        values = [sample[metric] for sample in samples]
+        value = min(values) if metric.endswith('_s') else max(values)
+        results.append(result(SUITE, 'app.main', metric, value, UNITS[metric], budget=budget(metric)))
+    return results
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    failed = False
+    for record in run(runs=args.runs):
+        status = 'OK' if record['value'] <= record['budget'] else 'OVER BUDGET'
+        failed |= status != 'OK'
+        print(f"{record['metric']:<20} {record['value']:>10.3f} {record['unit']:<5} "
+              f"budget {record['budget']:g} -> {status}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
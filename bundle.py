@@ -0,0 +1,192 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_FORMAT_VERSION = 1
+BUNDLE_ROOT = 'models/bundles'
+MANIFEST_FILE = 'manifest.json'
+CURRENT_FILE = 'CURRENT'
+# Serving prefers the TensorFlow-free NumPy export when the bundle has one
+MODEL_FILES = ('fraud_model.npz', 'fraud_model.keras', 'fraud_model_hgb.pkl')
+
+
+class BundleError(Exception):
+    """Raised when a model bundle is missing, incomplete or fails verification."""
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _write_atomic(path: str, text: str) -> None:
+    directory = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    with os.fdopen(fd, 'w') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def feature_schema(pipeline: Any) -> Dict[str, Any]:
+    return {
+        'columns': list(pipeline.columns),
+        'categorical': {col: len(vocab) for col, vocab in pipeline.vocabularies.items()},
+    }
+
+
+def save_bundle(fraud_model: Any, root: str = BUNDLE_ROOT, version: Optional[str] = None,
+                make_current: bool = True) -> str:
+    """Write ``fraud_model`` as a new versioned bundle and return its version.
+
+    Artifacts are written into a hidden staging directory, checksummed into
+    the manifest, and published with a single directory rename, so readers
+    never observe a partially written bundle. ``CURRENT`` is then repointed
+    atomically.
+    """
+    version = version or datetime.now().strftime('%Y%m%d-%H%M%S')
+    final_dir = os.path.join(root, version)
+    if os.path.exists(final_dir):
+        raise BundleError(f"Bundle version already exists: {version}")
+    os.makedirs(root, exist_ok=True)
+    staging_dir = tempfile.mkdtemp(dir=root, prefix=f'.staging-{version}-')
+    os.chmod(staging_dir, 0o755)
+    try:
+        fraud_model.save_model(staging_dir)
+        files = {
+            name: _sha256(os.path.join(staging_dir, name))
+            for name in sorted(os.listdir(staging_dir))
+        }
+        manifest = {
+            'format_version': BUNDLE_FORMAT_VERSION,
+            'version': version,
+            'created_at': datetime.now().isoformat(),
+            'model_file': next(name for name in MODEL_FILES if name in files),
+            'backend': fraud_model.backend.name,
+            'feature_schema': feature_schema(fraud_model.pipeline),
+            'thresholds': fraud_model.thresholds,
+            'files': files,
+        }
+        _write_atomic(os.path.join(staging_dir, MANIFEST_FILE), json.dumps(manifest, indent=2))
+        os.replace(staging_dir, final_dir)
+    except Exception as e:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        logger.error(f"Error saving bundle {version}: {e}")
+        raise
+
+    fraud_model.version = version
+    if make_current:
+        set_current(version, root)
+    logger.info(f"Model bundle {version} written to {final_dir}")
+    return version
+
+
+def set_current(version: str, root: str = BUNDLE_ROOT) -> None:
+    if not os.path.isdir(os.path.join(root, version)):
+        raise BundleError(f"Unknown bundle version: {version}")
+    _write_atomic(os.path.join(root, CURRENT_FILE), version + '\n')
+
+
+def current_version(root: str = BUNDLE_ROOT) -> Optional[str]:
+    try:
+        with open(os.path.join(root, CURRENT_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def list_versions(root: str = BUNDLE_ROOT) -> List[str]:
+    if not os.path.isdir(root):
+        return []
+    return sorted(
+        name for name in os.listdir(root)
+        if not name.startswith('.') and os.path.exists(os.path.join(root, name, MANIFEST_FILE))
+    )
+
+
+def read_manifest(bundle_dir: str) -> Dict[str, Any]:
+    try:
+        with open(os.path.join(bundle_dir, MANIFEST_FILE)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        raise BundleError(f"No manifest in {bundle_dir}")
+
+
+def verify_bundle(bundle_dir: str) -> Dict[str, Any]:
+    """Check every file listed in the manifest against its recorded SHA-256."""
+    manifest = read_manifest(bundle_dir)
+    if manifest.get('format_version') != BUNDLE_FORMAT_VERSION:
+        raise BundleError(f"Unsupported bundle format {manifest.get('format_version')} in {bundle_dir}")
+    for name, checksum in manifest['files'].items():
+        path = os.path.join(bundle_dir, name)
+        if not os.path.exists(path):
+            raise BundleError(f"Bundle {manifest['version']} is missing {name}")
+        if _sha256(path) != checksum:
+            raise BundleError(f"Checksum mismatch for {name} in bundle {manifest['version']}")
+    return manifest
+
+
+def load_bundle(version: Optional[str] = None, root: str = BUNDLE_ROOT) -> Any:
+    """Load and verify a bundle (``CURRENT`` by default) into an ``InsuranceFraudModel``."""
+    from model import InsuranceFraudModel
+
+    version = version or current_version(root)
+    if version is None:
+        raise BundleError(f"No current bundle under {root}")
+    bundle_dir = os.path.join(root, version)
+    manifest = verify_bundle(bundle_dir)
+
+    fraud_model = InsuranceFraudModel(os.path.join(bundle_dir, manifest['model_file']))
+    if fraud_model.pipeline.columns != manifest['feature_schema']['columns']:
+        raise BundleError(f"Feature schema mismatch in bundle {version}")
+    fraud_model.version = version
+    return fraud_model
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Manage versioned model bundles.")
+    parser.add_argument('--root', default=BUNDLE_ROOT)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    create_parser = subparsers.add_parser('create', help="Package an existing model directory as a bundle")
+    create_parser.add_argument('--model', default='models/fraud_model.keras')
+    create_parser.add_argument('--version')
+    create_parser.add_argument('--no-activate', action='store_true')
+    subparsers.add_parser('list', help="List bundle versions")
+    verify_parser = subparsers.add_parser('verify', help="Verify bundle checksums")
+    verify_parser.add_argument('version', nargs='?')
+    activate_parser = subparsers.add_parser('activate', help="Point CURRENT at a bundle version")
+    activate_parser.add_argument('version')
+
+    args = parser.parse_args(argv)
+    if args.command == 'create':
+        from model import InsuranceFraudModel
+
+        save_bundle(InsuranceFraudModel(args.model), args.root, args.version, not args.no_activate)
+    elif args.command == 'list':
+        current = current_version(args.root)
+        for version in list_versions(args.root):
+            print(f"{'*' if version == current else ' '} {version}")
+    elif args.command == 'verify':
+        version = args.version or current_version(args.root)
+        verify_bundle(os.path.join(args.root, version))
+        print(f"Bundle {version} OK")
+    else:
+        set_current(args.version, args.root)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
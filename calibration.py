@@ -0,0 +1,85 @@
+import json
+import logging
+import os
+from typing import Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CALIBRATION_METHODS = ('identity', 'isotonic', 'platt')
+
+DEFAULT_THRESHOLDS: Dict[str, float] = {
+    'fraud': 0.5,
+    'high_risk': 0.7,
+}
+
+_EPS = 1e-6
+
+
+def _logit(p: np.ndarray) -> np.ndarray:
+    p = np.clip(p, _EPS, 1 - _EPS)
+    return np.log(p / (1 - p))
+
+
+class ScoreCalibrator:
+    """Monotone mapping from raw sigmoid scores to calibrated fraud probabilities.
+
+    Fitting uses scikit-learn, but the fitted state is reduced to plain arrays
+    (isotonic breakpoints or Platt coefficients), so ``transform`` is a single
+    vectorized ``np.interp``/sigmoid over a whole batch.
+    """
+
+    def __init__(self, method: str = 'isotonic'):
+        if method not in CALIBRATION_METHODS:
+            raise ValueError(f"method must be one of {CALIBRATION_METHODS}")
+        self.method = method
+        self.x_thresholds: Optional[np.ndarray] = None
+        self.y_thresholds: Optional[np.ndarray] = None
+        self.coef = 1.0
+        self.intercept = 0.0
+
+    def fit(self, scores: np.ndarray, y: np.ndarray) -> 'ScoreCalibrator':
+        scores = np.asarray(scores, dtype=np.float64).ravel()
+        y = np.asarray(y).ravel()
+        try:
+            if self.method == 'isotonic':
+                from sklearn.isotonic import IsotonicRegression
+
+                iso = IsotonicRegression(y_min=0.0, y_max=1.0, out_of_bounds='clip').fit(scores, y)
+                self.x_thresholds = np.asarray(iso.X_thresholds_, dtype=np.float64)
+                self.y_thresholds = np.asarray(iso.y_thresholds_, dtype=np.float64)
+            elif self.method == 'platt':
+                from sklearn.linear_model import LogisticRegression
+
+                lr = LogisticRegression(C=1e6).fit(_logit(scores).reshape(-1, 1), y)
+                self.coef = float(lr.coef_[0, 0])
+                self.intercept = float(lr.intercept_[0])
+            logger.info(f"Fitted {self.method} calibration on {len(scores)} validation scores")
+            return self
+        except Exception as e:
+            logger.error(f"Error fitting calibration: {e}")
+            raise
+
+    def transform(self, scores: np.ndarray) -> np.ndarray:
+        scores = np.asarray(scores, dtype=np.float64).ravel()
+        if self.method == 'isotonic' and self.x_thresholds is not None:
+            return np.interp(scores, self.x_thresholds, self.y_thresholds)
+        if self.method == 'platt':
+            return 1.0 / (1.0 + np.exp(-(self.coef * _logit(scores) + self.intercept)))
+        return scores
+
+
+def load_thresholds(path: str) -> Dict[str, float]:
+    """Read per-deployment decision thresholds, falling back to the defaults."""
+    thresholds = dict(DEFAULT_THRESHOLDS)
+    if os.path.exists(path):
+        with open(path) as f:
+            thresholds.update({key: float(value) for key, value in json.load(f).items()})
+    return thresholds
+
+
+def save_thresholds(thresholds: Dict[str, float], path: str) -> None:
+    with open(path, 'w') as f:
+        json.dump(thresholds, f, indent=2, sort_keys=True)
+        f.write('\n')
@@ -0,0 +1,129 @@
+import argparse
+import logging
+import os
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd
+
+from preprocessing import DATE_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+COLUMNAR_SUFFIX = '.arrow'
+
+# pandas' default NA markers, so the columnar copy parses exactly like pd.read_csv
+NULL_VALUES = [
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+]
+
+
+def columnar_path(csv_path: str) -> str:
+    return os.path.splitext(csv_path)[0] + COLUMNAR_SUFFIX
+
+
+def resolve_dataset_path(path: str) -> str:
+    """Prefer an up-to-date columnar copy of a CSV dataset when one exists."""
+    if path.endswith(COLUMNAR_SUFFIX):
+        return path
+    candidate = columnar_path(path)
+    if os.path.exists(candidate) and (
+        not os.path.exists(path) or os.path.getmtime(candidate) >= os.path.getmtime(path)
+    ):
+        return candidate
+    return path
+
+
+def convert_csv(csv_path: str, output_path: Optional[str] = None) -> str:
+    """Convert a claims CSV into a typed, dictionary-encoded Arrow IPC (Feather v2) file.
+
+    Dates become ``date32`` columns and strings are dictionary encoded. The
+    file is written uncompressed so it can be memory-mapped without copies.
+    """
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+    from pyarrow import feather
+
+    output_path = output_path or columnar_path(csv_path)
+    try:
+        convert_options = pa_csv.ConvertOptions(
+            column_types={col: pa.date32() for col in DATE_COLUMNS},
+            null_values=NULL_VALUES,
+            strings_can_be_null=True,
+            auto_dict_encode=True,
+            auto_dict_max_cardinality=2 ** 31 - 1,
+        )
+        table = pa_csv.read_csv(csv_path, convert_options=convert_options)
+
+        # All-null columns (e.g. the trailing _c39) would otherwise get Arrow's null type
+        for i, field in enumerate(table.schema):
+            if pa.types.is_null(field.type):
+                table = table.set_column(i, field.name, table.column(i).cast(pa.float64()))
+
+        tmp_path = output_path + '.tmp'
+        feather.write_feather(table, tmp_path, compression='uncompressed')
+        os.replace(tmp_path, output_path)
+        logger.info(f"Converted {table.num_rows} rows from {csv_path} to {output_path}")
+        return output_path
+    except Exception as e:
+        logger.error(f"Error converting {csv_path}: {e}")
+        raise
+
+
+def load_claims(path: str, columns: Optional[List[str]] = None,
+                dtype: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+    """Load the claims dataset, reading only ``columns``.
+
+    Uses the memory-mapped columnar copy when it is present and current, and
+    falls back to ``pd.read_csv`` (with ``dtype``) otherwise.
+    """
+    resolved = resolve_dataset_path(path)
+    if resolved.endswith(COLUMNAR_SUFFIX):
+        try:
+            import pyarrow as pa
+
+            with pa.memory_map(resolved, 'r') as source:
+                table = pa.ipc.open_file(source).read_all()
+                if columns is not None:
+                    table = table.select(columns)
+                data = table.to_pandas(date_as_object=False)
+            logger.info(f"Loaded {len(data)} claims from {resolved}")
+            return data
+        except ImportError:
+            logger.warning(f"pyarrow is not installed; reading {path} as CSV instead")
+    return pd.read_csv(path, usecols=columns, dtype=dtype)
+
+
+def iter_claims(path: str, chunk_size: int, columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    """Yield the claims dataset in ``chunk_size``-row DataFrames without loading it whole."""
+    resolved = resolve_dataset_path(path)
+    if resolved.endswith(COLUMNAR_SUFFIX):
+        try:
+            import pyarrow as pa
+
+            with pa.memory_map(resolved, 'r') as source:
+                table = pa.ipc.open_file(source).read_all()
+                if columns is not None:
+                    table = table.select(columns)
+                # Slices of a memory-mapped table are zero-copy; only the chunk is materialised
+                for offset in range(0, table.num_rows, chunk_size):
+                    yield table.slice(offset, chunk_size).to_pandas(date_as_object=False)
+            return
+        except ImportError:
+            logger.warning(f"pyarrow is not installed; reading {path} as CSV instead")
+    with pd.read_csv(path, usecols=columns, chunksize=chunk_size) as reader:
+        for chunk in reader:
+            yield chunk
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Convert the claims CSV into a memory-mappable columnar file.")
+    parser.add_argument('csv', nargs='?', default='insurance_claims.csv')
+    parser.add_argument('--output', help=f"Output path (default: CSV path with {COLUMNAR_SUFFIX})")
+    args = parser.parse_args(argv)
+    convert_csv(args.csv, args.output)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,311 @@
+import argparse
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+REFERENCE_FILE = 'drift_reference.json'
+REFERENCE_FORMAT_VERSION = 1
+NUMERIC_BINS = 10
+SCORE_BINS = 20
+TOP_K = 20
+# Conventional PSI bands: < 0.1 stable, 0.1-0.25 moderate shift, > 0.25 significant shift
+PSI_WARN = 0.1
+PSI_ALERT = 0.25
+_EPS = 1e-4
+
+
+def psi(expected: np.ndarray, actual: np.ndarray) -> float:
+    """Population stability index between two binned distributions."""
+    e = np.maximum(np.asarray(expected, dtype=np.float64), _EPS)
+    a = np.maximum(np.asarray(actual, dtype=np.float64), _EPS)
+    e, a = e / e.sum(), a / a.sum()
+    return float(np.sum((a - e) * np.log(a / e)))
+
+
+def binned_ks(expected: np.ndarray, actual: np.ndarray) -> float:
+    """Kolmogorov-Smirnov distance evaluated at the bin edges of two histograms."""
+    return float(np.max(np.abs(np.cumsum(expected) - np.cumsum(actual)), initial=0.0))
+
+
+def _status(value: float) -> str:
+    return 'alert' if value > PSI_ALERT else 'warn' if value > PSI_WARN else 'ok'
+
+
+def _interior_edges(values: np.ndarray, bins: int) -> np.ndarray:
+    """Distinct interior quantile edges; bin i holds edges[i-1] < x <= edges[i]."""
+    return np.unique(np.quantile(values, np.linspace(0, 1, bins + 1)[1:-1]))
+
+
+def build_reference(pipeline: Any, X: np.ndarray, scores: Optional[np.ndarray] = None,
+                    bins: int = NUMERIC_BINS) -> Dict[str, Any]:
+    """Summarize training rows (encoded, unscaled) and holdout scores as a drift reference.
+
+    Numeric columns get quantile bins and their reference proportions;
+    categorical columns get the share of every vocabulary code.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    numeric, categorical = {}, {}
+    for j, col in enumerate(pipeline.columns):
+        column = X[:, j]
+        if col in pipeline.vocabularies:
+            counts = np.bincount(column.astype(np.int64), minlength=len(pipeline.vocabularies[col]))
+            categorical[col] = {'proportions': (counts / len(column)).tolist()}
+        else:
+            edges = _interior_edges(column, bins)
+            counts = np.bincount(np.searchsorted(edges, column, side='left'), minlength=len(edges) + 1)
+            numeric[col] = {
+                'edges': edges.tolist(),
+                'proportions': (counts / len(column)).tolist(),
+                'min': float(column.min()),
+                'max': float(column.max()),
+            }
+    reference = {
+        'format_version': REFERENCE_FORMAT_VERSION,
+        'rows': int(len(X)),
+        'numeric': numeric,
+        'categorical': categorical,
+        'scores': None,
+    }
+    if scores is not None:
+        counts, _ = np.histogram(np.clip(scores, 0.0, 1.0), bins=SCORE_BINS, range=(0.0, 1.0))
+        reference['scores'] = {'bins': SCORE_BINS, 'proportions': (counts / max(len(scores), 1)).tolist()}
+    return reference
+
+
+def merge_reference(reference: Dict[str, Any], pipeline: Any, X: np.ndarray,
+                    scores: Optional[np.ndarray] = None) -> Dict[str, Any]:
+    """Fold new training rows (encoded, unscaled) into an existing reference.
+
+    Numeric columns keep their bins; the new rows are counted into them and
+    the proportions re-weighted by row count. Categorical proportions are
+    merged the same way, with codes added since the reference counting as
+    zero before. ``scores`` describe the new model, so they replace the
+    reference's score histogram.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    if not len(X):
+        return reference
+    merged = build_reference(pipeline, X, scores)
+    if scores is None:
+        merged['scores'] = reference.get('scores')
+    old_rows = reference['rows']
+    total = old_rows + len(X)
+    for j, col in enumerate(pipeline.columns):
+        column = X[:, j]
+        if col in reference['numeric'] and col in merged['numeric']:
+            old = reference['numeric'][col]
+            edges = np.asarray(old['edges'])
+            counts = np.bincount(np.searchsorted(edges, column, side='left'), minlength=len(edges) + 1)
+            merged['numeric'][col] = {
+                'edges': old['edges'],
+                'proportions': ((np.asarray(old['proportions']) * old_rows + counts) / total).tolist(),
+                'min': min(old['min'], float(column.min())),
+                'max': max(old['max'], float(column.max())),
+            }
+        elif col in reference['categorical'] and col in merged['categorical']:
+            old = np.asarray(reference['categorical'][col]['proportions'])
+            # Sized like DriftMonitor's counters: every code the vocabulary now has
+            size = max(len(pipeline.vocabularies[col]), len(old))
+            counts = np.bincount(column.astype(np.int64), minlength=size).astype(np.float64)
+            counts[:len(old)] += old * old_rows
+            merged['categorical'][col] = {'proportions': (counts / total).tolist()}
+    merged['rows'] = int(total)
+    return merged
+
+
+def save_reference(reference: Dict[str, Any], path: str) -> None:
+    with open(path, 'w') as f:
+        json.dump(reference, f)
+
+
+def load_reference(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        reference = json.load(f)
+    if reference.get('format_version') != REFERENCE_FORMAT_VERSION:
+        raise ValueError(f"Unsupported drift reference format {reference.get('format_version')} in {path}")
+    return reference
+
+
+class TopK:
+    """Space-Saving heavy hitters: approximate top-``k`` values in O(k) memory."""
+
+    def __init__(self, k: int = TOP_K):
+        self.k = k
+        self.counts: Dict[str, int] = {}
+
+    def add(self, value: str, count: int = 1) -> None:
+        counts = self.counts
+        if value in counts:
+            counts[value] += count
+        elif len(counts) < self.k:
+            counts[value] = count
+        else:
+            # Evict the minimum; its count is an upper bound on the newcomer's earlier occurrences
+            victim = min(counts, key=counts.get)
+            counts[value] = counts.pop(victim) + count
+
+    def top(self, n: int = 5) -> List[Dict[str, Any]]:
+        ranked = sorted(self.counts.items(), key=lambda item: item[1], reverse=True)[:n]
+        return [{'value': value, 'count': count} for value, count in ranked]
+
+
+class DriftMonitor:
+    """Constant-memory streaming summaries of scored traffic, compared to a reference.
+
+    Every scored batch adds its encoded rows to fixed per-column histograms
+    (the reference's quantile bins for numerics, one counter per vocabulary
+    code for categoricals) and its scores to a fixed score histogram. Memory
+    never grows with traffic. Raw categorical values outside the vocabulary,
+    which the encoder silently maps to the fill code, are counted per column
+    with a top-k sketch of the offending values.
+    """
+
+    def __init__(self, pipeline: Any, reference: Dict[str, Any]):
+        self.reference = reference
+        self.columns = list(pipeline.columns)
+        self._lock = threading.Lock()
+        self._numeric = [
+            (j, col, np.asarray(reference['numeric'][col]['edges']))
+            for j, col in enumerate(self.columns) if col in reference['numeric']
+        ]
+        self._categorical = [
+            (j, col, pipeline.vocabularies[col])
+            for j, col in enumerate(self.columns) if col in reference['categorical']
+        ]
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.observed = 0
+            self.scored = 0
+            self._numeric_counts = {col: np.zeros(len(edges) + 1, dtype=np.int64) for _, col, edges in self._numeric}
+            self._out_of_range = {col: 0 for _, col, _ in self._numeric}
+            self._category_counts = {col: np.zeros(len(vocab), dtype=np.int64) for _, col, vocab in self._categorical}
+            self._unseen = {col: 0 for _, col, _ in self._categorical}
+            self._unseen_values = {col: TopK() for _, col, _ in self._categorical}
+            self._score_counts = np.zeros(SCORE_BINS, dtype=np.int64)
+
+    def observe(self, X: np.ndarray, scores: Optional[np.ndarray] = None,
+                records: Optional[Sequence[Dict[str, Any]]] = None) -> None:
+        """Add a batch of encoded, unscaled rows (and their scores and raw records)."""
+        numeric_updates = []
+        for j, col, edges in self._numeric:
+            column = X[:, j]
+            bounds = self.reference['numeric'][col]
+            numeric_updates.append((
+                col,
+                np.bincount(np.searchsorted(edges, column, side='left'), minlength=len(edges) + 1),
+                int(np.count_nonzero((column < bounds['min']) | (column > bounds['max']))),
+            ))
+        category_updates = [
+            (col, np.bincount(X[:, j].astype(np.int64), minlength=len(vocab))[:len(vocab)])
+            for j, col, vocab in self._categorical
+        ]
+        unseen: Dict[str, List[str]] = {}
+        if records is not None:
+            for _, col, vocab in self._categorical:
+                values = [record.get(col) for record in records]
+                missing = [str(v) for v in values
+                           if v is not None and (v if isinstance(v, str) else str(v)) not in vocab]
+                if missing:
+                    unseen[col] = missing
+        score_counts = None
+        if scores is not None:
+            score_counts, _ = np.histogram(np.clip(scores, 0.0, 1.0), bins=SCORE_BINS, range=(0.0, 1.0))
+
+        with self._lock:
+            self.observed += len(X)
+            for col, counts, out_of_range in numeric_updates:
+                self._numeric_counts[col] += counts
+                self._out_of_range[col] += out_of_range
+            for col, counts in category_updates:
+                self._category_counts[col] += counts
+            for col, values in unseen.items():
+                self._unseen[col] += len(values)
+                for value in values:
+                    self._unseen_values[col].add(value)
+            if score_counts is not None:
+                self.scored += len(scores)
+                self._score_counts += score_counts
+
+    def report(self) -> Dict[str, Any]:
+        """PSI and KS per feature and for the score distribution, worst first."""
+        with self._lock:
+            observed = self.observed
+            numeric = {col: counts.copy() for col, counts in self._numeric_counts.items()}
+            categorical = {col: counts.copy() for col, counts in self._category_counts.items()}
+            out_of_range = dict(self._out_of_range)
+            unseen = dict(self._unseen)
+            unseen_values = {col: sketch.top() for col, sketch in self._unseen_values.items()}
+            scored, score_counts = self.scored, self._score_counts.copy()
+
+        features = []
+        if observed:
+            for col, counts in numeric.items():
+                expected = np.asarray(self.reference['numeric'][col]['proportions'])
+                actual = counts / observed
+                features.append({
+                    'feature': col, 'kind': 'numeric',
+                    'psi': psi(expected, actual), 'ks': binned_ks(expected, actual),
+                    'out_of_range_rate': out_of_range[col] / observed,
+                })
+            for col, counts in categorical.items():
+                expected = np.asarray(self.reference['categorical'][col]['proportions'])
+                actual = counts / observed
+                features.append({
+                    'feature': col, 'kind': 'categorical',
+                    'psi': psi(expected, actual),
+                    'max_share_change': float(np.max(np.abs(actual - expected), initial=0.0)),
+                    'unseen_rate': unseen[col] / observed,
+                    'top_unseen': unseen_values[col],
+                })
+            for feature in features:
+                feature['status'] = _status(feature['psi'])
+            features.sort(key=lambda feature: feature['psi'], reverse=True)
+
+        score_drift = None
+        if scored and self.reference.get('scores'):
+            expected = np.asarray(self.reference['scores']['proportions'])
+            actual = score_counts / scored
+            score_psi = psi(expected, actual)
+            score_drift = {
+                'psi': score_psi, 'ks': binned_ks(expected, actual), 'status': _status(score_psi),
+                'histogram': actual.tolist(), 'reference_histogram': expected.tolist(),
+            }
+        return {
+            'observed': observed,
+            'reference_rows': self.reference['rows'],
+            'scores': score_drift,
+            'alerts': [feature['feature'] for feature in features if feature['status'] == 'alert'],
+            'features': features,
+        }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Build a drift reference for an existing model directory.")
+    parser.add_argument('--model', default='models/fraud_model.npz')
+    parser.add_argument('--data', default='insurance_claims.csv')
+    parser.add_argument('--output', help=f"Default: {REFERENCE_FILE} next to the model")
+    args = parser.parse_args(argv)
+
+    from dataset import load_claims
+    from model import InsuranceFraudModel
+
+    fraud_model = InsuranceFraudModel(args.model)
+    data = load_claims(args.data)
+    X = fraud_model.pipeline.transform(data)
+    scores = fraud_model.predict_proba_scaled(fraud_model.pipeline.apply_scaling(X.copy()))
+    output = args.output or os.path.join(os.path.dirname(args.model) or '.', REFERENCE_FILE)
+    save_reference(build_reference(fraud_model.pipeline, X, scores), output)
+    print(f"Wrote drift reference over {len(X)} rows to {output}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
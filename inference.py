@@ -0,0 +1,242 @@
+import argparse
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+WEIGHT_DTYPES = ('float32', 'float16', 'int8')
+
+ACTIVATIONS = {
+    'linear': lambda x: x,
+    'relu': lambda x: np.maximum(x, 0, out=x),
+    'sigmoid': lambda x: np.reciprocal(1.0 + np.exp(-x, out=x), out=x),
+    'tanh': lambda x: np.tanh(x, out=x),
+}
+
+
+def fold_layers(keras_model: Any) -> List[Tuple[np.ndarray, np.ndarray, str]]:
+    """Flatten a Sequential Dense/BatchNormalization/Dropout stack into (W, b, activation) layers.
+
+    BatchNormalization follows the Dense activation in ``build_model``, so its
+    inference-time affine transform is folded into the *next* Dense layer.
+    Dropout is the identity at inference and is dropped.
+    """
+    layers: List[Tuple[np.ndarray, np.ndarray, str]] = []
+    pending_scale: Optional[np.ndarray] = None
+    pending_shift: Optional[np.ndarray] = None
+
+    for layer in keras_model.layers:
+        kind = type(layer).__name__
+        if kind == 'Dropout':
+            continue
+        if kind == 'BatchNormalization':
+            gamma, beta, moving_mean, moving_var = [np.asarray(w, dtype=np.float64) for w in layer.get_weights()]
+            scale = gamma / np.sqrt(moving_var + layer.epsilon)
+            shift = beta - moving_mean * scale
+            if pending_scale is not None:
+                shift = pending_shift * scale + shift
+                scale = pending_scale * scale
+            pending_scale, pending_shift = scale, shift
+            continue
+        if kind != 'Dense':
+            raise ValueError(f"Unsupported layer for NumPy export: {layer.name} ({kind})")
+
+        kernel, bias = [np.asarray(w, dtype=np.float64) for w in layer.get_weights()]
+        if pending_scale is not None:
+            # Dense(BN(x)) = (x * s + t) @ W + b = x @ (diag(s) W) + (t @ W + b)
+            bias = pending_shift @ kernel + bias
+            kernel = pending_scale[:, None] * kernel
+            pending_scale = pending_shift = None
+        activation = layer.get_config().get('activation', 'linear')
+        if activation not in ACTIVATIONS:
+            raise ValueError(f"Unsupported activation for NumPy export: {activation}")
+        layers.append((kernel, bias, activation))
+
+    if pending_scale is not None:
+        raise ValueError("BatchNormalization must be followed by a Dense layer for NumPy export")
+    return layers
+
+
+def export_numpy(keras_model: Any, path: str, dtype: str = 'float32') -> None:
+    """Write the folded network to a compact ``.npz`` weight file."""
+    if dtype not in WEIGHT_DTYPES:
+        raise ValueError(f"dtype must be one of {WEIGHT_DTYPES}")
+    try:
+        layers = fold_layers(keras_model)
+        arrays: Dict[str, np.ndarray] = {
+            'activations': np.array([activation for _, _, activation in layers]),
+            'weight_dtype': np.array(dtype),
+        }
+        for i, (kernel, bias, _) in enumerate(layers):
+            if dtype == 'int8':
+                # Symmetric per-output-unit quantization
+                scale = np.abs(kernel).max(axis=0) / 127.0
+                scale[scale == 0] = 1.0
+                arrays[f'W{i}'] = np.rint(kernel / scale).astype(np.int8)
+                arrays[f'W{i}_scale'] = scale.astype(np.float32)
+            else:
+                arrays[f'W{i}'] = kernel.astype(dtype)
+            arrays[f'b{i}'] = bias.astype(np.float32)
+        np.savez_compressed(path, **arrays)
+        logger.info(f"Exported {len(layers)}-layer NumPy model ({dtype} weights) to {path}")
+    except Exception as e:
+        logger.error(f"Error exporting NumPy model: {e}")
+        raise
+
+
+class NumpyMLP:
+    """Pure-NumPy runtime for networks exported by ``export_numpy``.
+
+    Weights are dequantized to float32 once at load time; inference is a
+    chain of float32 GEMMs with in-place activations. Exposes ``predict`` and
+    ``predict_on_batch`` so it can stand in for the Keras model.
+    """
+
+    def __init__(self, layers: List[Tuple[np.ndarray, np.ndarray, str]], weight_dtype: str = 'float32'):
+        self.layers = [
+            (np.ascontiguousarray(kernel, dtype=np.float32), np.asarray(bias, dtype=np.float32), activation)
+            for kernel, bias, activation in layers
+        ]
+        self.weight_dtype = weight_dtype
+
+    @classmethod
+    def load(cls, path: str) -> 'NumpyMLP':
+        try:
+            with np.load(path) as archive:
+                activations = [str(a) for a in archive['activations']]
+                weight_dtype = str(archive['weight_dtype'])
+                layers = []
+                for i, activation in enumerate(activations):
+                    kernel = archive[f'W{i}'].astype(np.float32)
+                    if weight_dtype == 'int8':
+                        kernel *= archive[f'W{i}_scale']
+                    layers.append((kernel, archive[f'b{i}'], activation))
+            logger.info(f"NumPy model loaded from {path}")
+            return cls(layers, weight_dtype)
+        except Exception as e:
+            logger.error(f"Error loading NumPy model: {e}")
+            raise
+
+    def save(self, path: str) -> None:
+        arrays: Dict[str, np.ndarray] = {
+            'activations': np.array([activation for _, _, activation in self.layers]),
+            'weight_dtype': np.array('float32'),
+        }
+        for i, (kernel, bias, _) in enumerate(self.layers):
+            arrays[f'W{i}'] = kernel
+            arrays[f'b{i}'] = bias
+        np.savez_compressed(path, **arrays)
+
+    @property
+    def input_dim(self) -> int:
+        return self.layers[0][0].shape[0]
+
+    def predict_on_batch(self, X: np.ndarray) -> np.ndarray:
+        h = np.asarray(X, dtype=np.float32)
+        for kernel, bias, activation in self.layers:
+            h = h @ kernel
+            h += bias
+            h = ACTIVATIONS[activation](h)
+        return h
+
+    def logit_gradients(self, X: np.ndarray) -> np.ndarray:
+        """Gradient of the output layer's pre-activation (the logit) with respect to each input row.
+
+        One forward pass keeps each hidden layer's activation derivative, and
+        one backward pass of transposed GEMMs returns all rows' gradients.
+        """
+        h = np.asarray(X, dtype=np.float32)
+        derivatives: List[Optional[np.ndarray]] = []
+        for kernel, bias, activation in self.layers[:-1]:
+            z = h @ kernel
+            z += bias
+            if activation == 'relu':
+                derivatives.append(z > 0)
+                h = np.maximum(z, 0, out=z)
+            elif activation == 'linear':
+                derivatives.append(None)
+                h = z
+            else:
+                h = ACTIVATIONS[activation](z)
+                derivatives.append(h * (1 - h) if activation == 'sigmoid' else 1 - h * h)
+
+        grad = np.tile(self.layers[-1][0][:, 0], (len(h), 1))
+        for (kernel, _, _), derivative in zip(reversed(self.layers[:-1]), reversed(derivatives)):
+            if derivative is not None:
+                grad = grad * derivative
+            grad = grad @ kernel.T
+        return grad
+
+    def predict(self, X: np.ndarray, batch_size: int = 4096, verbose: int = 0) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32)
+        if len(X) <= batch_size:
+            return self.predict_on_batch(X)
+        return np.concatenate([self.predict_on_batch(X[i:i + batch_size]) for i in range(0, len(X), batch_size)])
+
+
+def _time_per_call(fn: Any, X: np.ndarray, repeats: int) -> float:
+    fn(X)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn(X)
+    return (time.perf_counter() - start) / repeats
+
+
+def compare(keras_path: str, npz_path: str, data_path: str, tolerance: float) -> bool:
+    """Check NumPy/Keras parity on the training data and print a latency/throughput table."""
+    import pandas as pd
+    from model import InsuranceFraudModel
+
+    fraud_model = InsuranceFraudModel(keras_path)
+    X = fraud_model.pipeline.transform(pd.read_csv(data_path), scale=True)
+    keras_model = fraud_model.model
+    engine = NumpyMLP.load(npz_path)
+
+    expected = np.asarray(keras_model.predict_on_batch(X)).ravel()
+    actual = engine.predict(X).ravel()
+    max_diff = float(np.abs(expected - actual).max())
+    label_agreement = float(((expected > 0.5) == (actual > 0.5)).mean())
+    passed = max_diff <= tolerance
+    print(f"Parity ({engine.weight_dtype} weights, {len(X)} rows): max |diff| = {max_diff:.2e}, "
+          f"label agreement = {label_agreement:.4f} -> {'OK' if passed else 'FAIL'} (tolerance {tolerance:g})")
+
+    print(f"{'batch':>7} {'keras ms':>10} {'numpy ms':>10} {'keras rows/s':>14} {'numpy rows/s':>14}")
+    for batch_size in (1, 32, 1024):
+        batch = np.resize(X, (batch_size, X.shape[1])).astype(np.float32)
+        repeats = 200 if batch_size < 1024 else 20
+        keras_s = _time_per_call(keras_model.predict_on_batch, batch, repeats)
+        numpy_s = _time_per_call(engine.predict_on_batch, batch, repeats)
+        print(f"{batch_size:>7} {keras_s * 1000:>10.3f} {numpy_s * 1000:>10.3f} "
+              f"{batch_size / keras_s:>14.0f} {batch_size / numpy_s:>14.0f}")
+    return passed
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Export the Keras fraud model to a NumPy runtime and check parity.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = subparsers.add_parser('export', help="Fold and export Keras weights to .npz")
+    export_parser.add_argument('--model', default='models/fraud_model.keras')
+    export_parser.add_argument('--output', default='models/fraud_model.npz')
+    export_parser.add_argument('--dtype', choices=WEIGHT_DTYPES, default='float32')
+
+    compare_parser = subparsers.add_parser('compare', help="Parity and latency comparison against Keras")
+    compare_parser.add_argument('--model', default='models/fraud_model.keras')
+    compare_parser.add_argument('--npz', default='models/fraud_model.npz')
+    compare_parser.add_argument('--data', default='insurance_claims.csv')
+    compare_parser.add_argument('--tolerance', type=float, default=1e-4)
+
+    args = parser.parse_args(argv)
+    if args.command == 'export':
+        from tensorflow.keras.models import load_model
+        export_numpy(load_model(args.model), args.output, args.dtype)
+    elif not compare(args.model, args.npz, args.data, args.tolerance):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
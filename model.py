@@ -1,18 +1,20 @@
 import numpy as np
 import pandas as pd
-import tensorflow as tf
-from tensorflow.keras.models import Sequential, load_model
-from tensorflow.keras.layers import Dense, Dropout, BatchNormalization
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.metrics import classification_report, confusion_matrix
-import matplotlib.pyplot as plt
-import seaborn as sns
 import joblib
+import hashlib
+import json
 import logging
 import os
+from abc import ABC, abstractmethod
 from typing import Dict, List, Tuple, Optional, Any
 from pathlib import Path
+from preprocessing import FeaturePipeline, TARGET_COLUMN
+from inference import NumpyMLP, export_numpy
+from dataset import load_claims
+from streaming import fit_pipeline_streaming, make_tf_dataset
+from calibration import ScoreCalibrator, load_thresholds, save_thresholds
+from drift import REFERENCE_FILE, build_reference, load_reference, merge_reference, save_reference
+from bundle import save_bundle
 
 # Configure logging
 logging.basicConfig(
@@ -22,36 +24,281 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+def _new_scaler() -> Any:
+    from sklearn.preprocessing import StandardScaler
+
+    return StandardScaler()
+
+
+def _new_label_encoder() -> Any:
+    from sklearn.preprocessing import LabelEncoder
+
+    return LabelEncoder()
+
+
+class _TrainingArtifact:
+    """A scikit-learn artifact that is unpickled from the model directory on first access.
+
+    Serving encodes through ``FeaturePipeline`` and never touches these, so
+    loading a bundle does not import scikit-learn.
+    """
+
+    def __init__(self, filename: str, factory: Any):
+        self.filename = filename
+        self.factory = factory
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.attr = f'_{name}'
+
+    def __get__(self, obj: Any, objtype: Optional[type] = None) -> Any:
+        if obj is None:
+            return self
+        if self.attr not in obj.__dict__:
+            path = os.path.join(obj.model_dir, self.filename) if obj.model_dir else None
+            obj.__dict__[self.attr] = joblib.load(path) if path and os.path.exists(path) else self.factory()
+        return obj.__dict__[self.attr]
+
+    def __set__(self, obj: Any, value: Any) -> None:
+        obj.__dict__[self.attr] = value
+
+
+# Files next to the model that change its scores; hashed into the version of unbundled models
+SCORING_ARTIFACTS = ('preprocessing.pkl', 'calibration.pkl', 'scaler.pkl', 'label_encoders.pkl', 'target_encoder.pkl')
+
+
+def artifact_checksum(model_path: str) -> str:
+    """Short digest of a model file and the scoring artifacts beside it."""
+    model_dir = os.path.dirname(model_path) or '.'
+    digest = hashlib.sha256()
+    for path in [model_path] + [os.path.join(model_dir, name) for name in SCORING_ARTIFACTS]:
+        if not os.path.exists(path):
+            continue
+        digest.update(os.path.basename(path).encode() + b'\0')
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()[:12]
+
+
+class TreeEnsemble:
+    """Gradient-boosted trees behind the MLP's ``predict_on_batch(X_scaled)`` contract.
+
+    Serving rows arrive encoded and standardized by the shared pipeline.
+    Standardizing is monotone, so numeric columns go to the trees as they are,
+    while categorical columns are mapped back to their integer codes for
+    native categorical splits.
+    """
+
+    def __init__(self, estimator: Any, categorical: np.ndarray, mean: np.ndarray, scale: np.ndarray):
+        self.estimator = estimator
+        self.categorical = categorical
+        self.mean = mean[categorical]
+        self.scale = scale[categorical]
+
+    def codes(self, X_scaled: np.ndarray) -> np.ndarray:
+        X = np.array(X_scaled, dtype=np.float64)
+        X[:, self.categorical] = np.rint(X[:, self.categorical] * self.scale + self.mean)
+        return X
+
+    def predict_on_batch(self, X_scaled: np.ndarray) -> np.ndarray:
+        return self.estimator.predict_proba(self.codes(X_scaled))[:, 1]
+
+    def predict(self, X_scaled: np.ndarray, batch_size: Optional[int] = None, verbose: int = 0) -> np.ndarray:
+        return self.predict_on_batch(X_scaled)
+
+
+class ModelBackend(ABC):
+    """How ``InsuranceFraudModel`` fits, saves and loads the scorer in ``self.model``.
+
+    The scorer only has to provide ``predict_on_batch(X_scaled)`` returning raw
+    fraud scores. The feature pipeline, calibration, thresholds and bundle
+    layout are shared by every backend.
+    """
+
+    name = ''
+    # Serving file first; load_model picks the backend by these suffixes
+    model_files: Tuple[str, ...] = ()
+
+    @abstractmethod
+    def fit(self, fraud_model: 'InsuranceFraudModel', X_train: np.ndarray, y_train: np.ndarray,
+            X_val: np.ndarray, y_val: np.ndarray, class_weights: Dict[int, float],
+            epochs: int, batch_size: int, patience: int, params: Dict[str, Any]) -> Any:
+        """Fit ``fraud_model.model`` on scaled rows and return the training history."""
+
+    @abstractmethod
+    def save(self, scorer: Any, model_dir: str) -> None:
+        ...
+
+    @abstractmethod
+    def load(self, path: str) -> Any:
+        ...
+
+
+class KerasBackend(ModelBackend):
+    """The dense network from ``build_model``, served through its NumPy export."""
+
+    name = 'keras'
+    model_files = ('fraud_model.npz', 'fraud_model.keras', '.npz', '.keras', '.h5')
+
+    def fit(self, fraud_model, X_train, y_train, X_val, y_val, class_weights, epochs, batch_size, patience, params):
+        fraud_model.model = fraud_model.build_model(X_train.shape[1], **params)
+        return fraud_model.model.fit(
+            X_train, y_train,
+            epochs=epochs,
+            batch_size=batch_size,
+            validation_data=(X_val, y_val),
+            class_weight=class_weights,
+            callbacks=fraud_model._training_callbacks(patience),
+            verbose=1
+        )
+
+    def save(self, scorer: Any, model_dir: str) -> None:
+        if isinstance(scorer, NumpyMLP):
+            scorer.save(os.path.join(model_dir, 'fraud_model.npz'))
+        else:
+            scorer.save(os.path.join(model_dir, 'fraud_model.keras'))
+            export_numpy(scorer, os.path.join(model_dir, 'fraud_model.npz'))
+
+    def load(self, path: str) -> Any:
+        if path.endswith('.npz'):
+            return NumpyMLP.load(path)
+        # TensorFlow is only imported for Keras models; .npz serving never loads it
+        from tensorflow.keras.models import load_model as load_keras_model
+
+        return load_keras_model(path)
+
+
+class HistGradientBoostingBackend(ModelBackend):
+    """scikit-learn histogram gradient boosting with native categorical splits.
+
+    Columns with at most ``max_bins`` categories are split natively; larger
+    vocabularies such as ``incident_location`` are treated as ordinal codes.
+    Training and ``predict_proba`` run multi-threaded (OpenMP) native code.
+    """
+
+    name = 'hist_gbt'
+    model_files = ('fraud_model_hgb.pkl',)
+    DEFAULT_PARAMS = {
+        'learning_rate': 0.05,
+        'max_iter': 500,
+        'max_leaf_nodes': 15,
+        'min_samples_leaf': 20,
+        'l2_regularization': 1.0,
+        'max_bins': 255,
+    }
+
+    def fit(self, fraud_model, X_train, y_train, X_val, y_val, class_weights, epochs, batch_size, patience, params):
+        from sklearn.ensemble import HistGradientBoostingClassifier
+
+        pipeline = fraud_model.pipeline
+        unsupported = sorted(set(params) - set(self.DEFAULT_PARAMS))
+        if unsupported:
+            raise ValueError(f"Unsupported {self.name} parameters: {', '.join(unsupported)} "
+                             f"(expected a subset of {', '.join(self.DEFAULT_PARAMS)})")
+        params = {**self.DEFAULT_PARAMS, **params}
+        categorical = np.array([
+            i for i, col in enumerate(pipeline.columns)
+            if col in pipeline.vocabularies and len(pipeline.vocabularies[col]) <= params['max_bins']
+        ], dtype=np.intp)
+        mask = np.zeros(len(pipeline.columns), dtype=bool)
+        mask[categorical] = True
+        estimator = HistGradientBoostingClassifier(
+            categorical_features=mask,
+            class_weight=class_weights,
+            early_stopping=True,
+            validation_fraction=0.15,
+            n_iter_no_change=max(patience, 1) * 4,
+            random_state=42,
+            **params,
+        )
+        scorer = TreeEnsemble(estimator, categorical, pipeline.mean, pipeline.scale)
+        estimator.fit(scorer.codes(X_train), y_train)
+        fraud_model.model = scorer
+        logger.info(f"Fitted {estimator.n_iter_} boosting iterations "
+                    f"({len(categorical)} native categorical columns)")
+        return {'n_iter': int(estimator.n_iter_), 'validation_score': list(estimator.validation_score_)}
+
+    def save(self, scorer: Any, model_dir: str) -> None:
+        joblib.dump(scorer, os.path.join(model_dir, self.model_files[0]))
+
+    def load(self, path: str) -> Any:
+        return joblib.load(path)
+
+
+MODEL_BACKENDS: Dict[str, ModelBackend] = {
+    backend.name: backend for backend in (KerasBackend(), HistGradientBoostingBackend())
+}
+
+
+def backend_for_file(path: str) -> ModelBackend:
+    for backend in MODEL_BACKENDS.values():
+        if any(path.endswith(suffix) for suffix in backend.model_files):
+            return backend
+    raise ValueError(f"No model backend for {path}")
+
+
 class InsuranceFraudModel:
-    """Insurance fraud detection model using neural networks."""
-    
-    def __init__(self, model_path: Optional[str] = None):
-        self.model: Optional[Sequential] = None
-        self.label_encoders: Dict[str, LabelEncoder] = {}
-        self.scaler = StandardScaler()
-        self.target_encoder = LabelEncoder()
+    """Insurance fraud detection model; the scorer itself comes from a ``ModelBackend``."""
+
+    scaler = _TrainingArtifact('scaler.pkl', _new_scaler)
+    label_encoders = _TrainingArtifact('label_encoders.pkl', dict)
+    target_encoder = _TrainingArtifact('target_encoder.pkl', _new_label_encoder)
+
+    def __init__(self, model_path: Optional[str] = None, backend: str = 'keras'):
+        if backend not in MODEL_BACKENDS:
+            raise ValueError(f"backend must be one of {list(MODEL_BACKENDS)}")
+        self.backend = MODEL_BACKENDS[backend]
+        self.model: Optional[Any] = None
+        self.model_dir: Optional[str] = None
+        self.pipeline = FeaturePipeline()
+        self.calibrator = ScoreCalibrator('identity')
+        self.drift_reference: Optional[Dict[str, Any]] = None
+        self.thresholds = load_thresholds('models/thresholds.json')
+        self.version = 'unversioned'
         Path('models').mkdir(exist_ok=True)
         if model_path:
             self.load_model(model_path)
 
     def load_model(self, model_path: str) -> None:
+        # Preprocessing artifacts live next to the network file
+        model_dir = os.path.dirname(model_path) or '.'
         try:
-            self.model = load_model(model_path)
-            self.scaler = joblib.load('models/scaler.pkl')
-            self.label_encoders = joblib.load('models/label_encoders.pkl')
-            self.target_encoder = joblib.load('models/target_encoder.pkl')
+            self.backend = backend_for_file(model_path)
+            self.model = self.backend.load(model_path)
+            # scaler/label_encoders/target_encoder are read from here on first use
+            self.model_dir = model_dir
+            for name in ('scaler', 'label_encoders', 'target_encoder'):
+                self.__dict__.pop(f'_{name}', None)
+            if os.path.exists(os.path.join(model_dir, 'preprocessing.pkl')):
+                self.pipeline = joblib.load(os.path.join(model_dir, 'preprocessing.pkl'))
+            else:
+                self.pipeline = FeaturePipeline.from_encoders(self.label_encoders, self.scaler)
+            if os.path.exists(os.path.join(model_dir, 'calibration.pkl')):
+                self.calibrator = joblib.load(os.path.join(model_dir, 'calibration.pkl'))
+            if os.path.exists(os.path.join(model_dir, REFERENCE_FILE)):
+                self.drift_reference = load_reference(os.path.join(model_dir, REFERENCE_FILE))
+            self.thresholds = load_thresholds(os.path.join(model_dir, 'thresholds.json'))
+            # Bundles replace this with their own version; anything else is identified by content
+            self.version = f'unversioned-{artifact_checksum(model_path)}'
             logger.info(f"Model loaded from {model_path}")
         except Exception as e:
             logger.error(f"Error loading model: {e}")
             raise
 
-    def save_model(self) -> None:
+    def save_model(self, model_dir: str = 'models') -> None:
         try:
-            self.model.save('models/fraud_model.keras')
-            joblib.dump(self.scaler, 'models/scaler.pkl')
-            joblib.dump(self.label_encoders, 'models/label_encoders.pkl')
-            joblib.dump(self.target_encoder, 'models/target_encoder.pkl')
-            logger.info("Model saved successfully")
+            os.makedirs(model_dir, exist_ok=True)
+            self.backend.save(self.model, model_dir)
+            joblib.dump(self.scaler, os.path.join(model_dir, 'scaler.pkl'))
+            joblib.dump(self.label_encoders, os.path.join(model_dir, 'label_encoders.pkl'))
+            joblib.dump(self.target_encoder, os.path.join(model_dir, 'target_encoder.pkl'))
+            joblib.dump(self.pipeline, os.path.join(model_dir, 'preprocessing.pkl'))
+            joblib.dump(self.calibrator, os.path.join(model_dir, 'calibration.pkl'))
+            if self.drift_reference is not None:
+                save_reference(self.drift_reference, os.path.join(model_dir, REFERENCE_FILE))
+            save_thresholds(self.thresholds, os.path.join(model_dir, 'thresholds.json'))
+            logger.info(f"Model saved to {model_dir}")
         except Exception as e:
             logger.error(f"Error saving model: {e}")
             raise
@@ -86,7 +333,7 @@ class InsuranceFraudModel:
             # Encode categories
             for col in categorical_cols:
                 if col != 'fraud_reported':
-                    le = LabelEncoder()
+                    le = _new_label_encoder()
                     processed_data[col] = le.fit_transform(processed_data[col])
                     self.label_encoders[col] = le
 
@@ -95,24 +342,26 @@ class InsuranceFraudModel:
             logger.error(f"Error in preprocessing: {e}")
             raise
 
-    def build_model(self, input_dim: int) -> Sequential:
+    def build_model(self, input_dim: int, hidden_units: Tuple[int, ...] = (256, 128, 64),
+                    head_units: int = 32, dropout: float = 0.3, learning_rate: float = 0.001) -> Any:
+        import tensorflow as tf
+        from tensorflow.keras.models import Sequential
+        from tensorflow.keras.layers import Dense, Dropout, BatchNormalization
+
         try:
-            model = Sequential([
-                Dense(256, activation='relu', input_dim=input_dim),
-                BatchNormalization(),
-                Dropout(0.3),
-                Dense(128, activation='relu'),
-                BatchNormalization(),
-                Dropout(0.3),
-                Dense(64, activation='relu'),
-                BatchNormalization(),
-                Dropout(0.3),
-                Dense(32, activation='relu'),
+            layers = []
+            for i, units in enumerate(hidden_units):
+                layers.append(Dense(units, activation='relu', input_dim=input_dim) if i == 0
+                              else Dense(units, activation='relu'))
+                layers.extend([BatchNormalization(), Dropout(dropout)])
+            layers.extend([
+                Dense(head_units, activation='relu'),
                 Dense(1, activation='sigmoid')
             ])
+            model = Sequential(layers)
 
             model.compile(
-                optimizer=tf.keras.optimizers.Adam(0.001),
+                optimizer=tf.keras.optimizers.Adam(learning_rate),
                 loss='binary_crossentropy',
                 metrics=['accuracy', tf.keras.metrics.AUC()]
             )
@@ -121,81 +370,332 @@ class InsuranceFraudModel:
             logger.error(f"Error building model: {e}")
             raise
 
-    def train(self, data_path: str, epochs: int = 50, batch_size: int = 32) -> Any:
+    def train(self, data_path: str, epochs: int = 50, batch_size: int = 32,
+              calibration: str = 'isotonic', patience: int = 5,
+              model_params: Optional[Dict[str, Any]] = None) -> Any:
         try:
-            # Load and process data
-            data = pd.read_csv(data_path)
-            processed_data = self.preprocess_data(data)
+            fitted = self.fit(load_claims(data_path), epochs, batch_size, calibration, patience, model_params)
+            self.save_model()
+            save_bundle(self)
+            return fitted['history']
 
-            # Split data
-            X = processed_data.drop('fraud_reported', axis=1)
-            y = processed_data['fraud_reported'].values
+        except Exception as e:
+            logger.error(f"Error in training: {e}")
+            raise
 
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=0.2, random_state=42, stratify=y
-            )
+    def fit(self, data: pd.DataFrame, epochs: int = 50, batch_size: int = 32,
+            calibration: str = 'isotonic', patience: int = 5,
+            model_params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Fit pipeline, scorer and calibration in memory; nothing is written.
 
-            # Scale features
-            X_train_scaled = self.scaler.fit_transform(X_train)
-            X_test_scaled = self.scaler.transform(X_test)
+        Returns the backend's training history and the scaled holdout split.
+        """
+        from sklearn.model_selection import train_test_split
 
-            # Build and train
-            self.model = self.build_model(X_train.shape[1])
-            
-            class_weights = {
-                0: len(y) / (2 * np.sum(y == 0)),
-                1: len(y) / (2 * np.sum(y == 1))
-            }
+        # Fit the frozen preprocessing pipeline once
+        self.pipeline.fit(data)
+        X = self.pipeline.transform(data)
+        y = self.target_encoder.fit_transform(data[TARGET_COLUMN])
+        self.label_encoders = self.pipeline.to_label_encoders()
 
-            callbacks = [
-                tf.keras.callbacks.EarlyStopping(
-                    monitor='val_loss',
-                    patience=5,
-                    restore_best_weights=True
-                ),
-                tf.keras.callbacks.ModelCheckpoint(
-                    filepath='models/best_model.keras',
-                    monitor='val_loss',
-                    save_best_only=True
-                )
-            ]
+        # Split data
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=0.2, random_state=42, stratify=y
+        )
+
+        # Scale features
+        self.scaler.fit(pd.DataFrame(X_train, columns=self.pipeline.columns))
+        self.pipeline.attach_scaler(self.scaler)
+        X_train_scaled = self.pipeline.apply_scaling(X_train.copy())
+        X_test_scaled = self.pipeline.apply_scaling(X_test.copy())
+
+        class_weights = {
+            0: len(y) / (2 * np.sum(y == 0)),
+            1: len(y) / (2 * np.sum(y == 1))
+        }
+        history = self.backend.fit(self, X_train_scaled, y_train, X_test_scaled, y_test, class_weights,
+                                   epochs, batch_size, patience, model_params or {})
+
+        # Calibrate raw scores on the validation split
+        val_scores = np.asarray(self.model.predict(X_test_scaled, verbose=0)).ravel()
+        self.calibrator = ScoreCalibrator(calibration).fit(val_scores, y_test)
+
+        # What live traffic is compared against: training rows and calibrated holdout scores
+        self.drift_reference = build_reference(self.pipeline, X_train, self.calibrator.transform(val_scores))
+        return {'history': history, 'X_val': X_test_scaled, 'y_val': y_test}
+
+    def train_streaming(self, data_path: str, epochs: int = 50, batch_size: int = 32,
+                        chunk_size: int = 50000, test_size: float = 0.2, shuffle_buffer: int = 10000,
+                        calibration: str = 'isotonic', patience: int = 5,
+                        model_params: Optional[Dict[str, Any]] = None) -> Any:
+        """Out-of-core training: memory is bounded by ``chunk_size``, not the dataset size.
 
+        One streaming pass fits the vocabularies, fill values and scaling
+        statistics; each epoch then re-reads the data through a chunked
+        ``tf.data`` pipeline with a deterministic stratified holdout.
+        Only the Keras backend trains from a stream.
+        """
+        if self.backend.name != 'keras':
+            raise ValueError(f"Streaming training is not supported by the {self.backend.name} backend")
+        try:
+            fitted = fit_pipeline_streaming(data_path, chunk_size, test_size)
+            self.pipeline = fitted['pipeline']
+            self.scaler = self.pipeline.to_scaler()
+            self.label_encoders = self.pipeline.to_label_encoders()
+            self.target_encoder.fit(sorted(fitted['class_counts']))
+
+            counts = {int(self.target_encoder.transform([label])[0]): n for label, n in fitted['class_counts'].items()}
+            total = sum(counts.values())
+            class_weights = {label: total / (2 * n) for label, n in counts.items()}
+
+            dataset_args = dict(chunk_size=chunk_size, batch_size=batch_size, test_size=test_size)
+            train_ds = make_tf_dataset(data_path, self.pipeline, self.target_encoder, 'train',
+                                       shuffle_buffer=shuffle_buffer, **dataset_args)
+            val_ds = make_tf_dataset(data_path, self.pipeline, self.target_encoder, 'holdout', **dataset_args)
+
+            self.model = self.build_model(self.pipeline.n_features, **(model_params or {}))
             history = self.model.fit(
-                X_train_scaled, y_train,
+                train_ds,
                 epochs=epochs,
-                batch_size=batch_size,
-                validation_data=(X_test_scaled, y_test),
+                validation_data=val_ds,
                 class_weight=class_weights,
-                callbacks=callbacks,
+                callbacks=self._training_callbacks(patience),
                 verbose=1
             )
 
+            # Calibrate on the streamed holdout; only scores and labels are kept in memory
+            scores, labels = [], []
+            for X_batch, y_batch in val_ds:
+                scores.append(np.asarray(self.model.predict_on_batch(X_batch)).ravel())
+                labels.append(y_batch.numpy())
+            self.calibrator = ScoreCalibrator(calibration).fit(np.concatenate(scores), np.concatenate(labels))
+
             self.save_model()
+            save_bundle(self)
             return history
 
         except Exception as e:
-            logger.error(f"Error in training: {e}")
+            logger.error(f"Error in streaming training: {e}")
+            raise
+
+    def update(self, data_path: str, history_path: Optional[str] = 'insurance_claims.csv',
+               epochs: int = 5, batch_size: int = 32, learning_rate: float = 1e-4,
+               replay_size: int = 5000, test_size: float = 0.2, max_auc_drop: float = 0.0,
+               calibration: str = 'isotonic', publish: bool = True) -> Dict[str, Any]:
+        """Fine-tune the current network on newly labeled claims instead of retraining.
+
+        Vocabularies are extended without renumbering existing codes, the
+        scaler's running moments absorb the new training rows, and the network
+        continues from its current weights for a few epochs on the new claims
+        plus a replay sample of ``history_path``. The candidate is promoted
+        (saved and published as a bundle) only if its AUC on the held-out new
+        and replayed claims is at most ``max_auc_drop`` below the current
+        model's; otherwise the current model is left untouched.
+        """
+        import copy
+        import tensorflow as tf
+        from sklearn.metrics import roc_auc_score
+        from sklearn.model_selection import train_test_split
+
+        if self.backend.name != 'keras':
+            raise ValueError(f"Incremental updates are not supported by the {self.backend.name} backend")
+        if self.model is None:
+            raise ValueError("Model not trained")
+        try:
+            new_data = load_claims(data_path)
+            parts = [new_data]
+            if history_path and replay_size > 0:
+                history = load_claims(history_path)
+                parts.append(history.sample(n=min(replay_size, len(history)), random_state=42))
+            data = pd.concat(parts, ignore_index=True)
+            y = self.target_encoder.transform(data[TARGET_COLUMN])
+            stratify = y if min(np.bincount(y, minlength=2)) >= 2 else None
+            train_data, val_data, y_train, y_val = train_test_split(
+                data, y, test_size=test_size, random_state=42, stratify=stratify
+            )
+            if len(np.unique(y_val)) < 2:
+                raise ValueError("The validation split needs both fraud and non-fraud claims")
+
+            # The current model is scored before anything is modified
+            baseline_auc = float(roc_auc_score(
+                y_val, self.model.predict_on_batch(self.pipeline.transform(val_data, scale=True)).ravel()
+            ))
+
+            pipeline = copy.deepcopy(self.pipeline)
+            added = pipeline.extend_vocabularies(new_data)
+            X_train = pipeline.transform(train_data)
+            scaler = copy.deepcopy(self.scaler)
+            # Only new rows update the moments; replayed rows are already in them
+            new_rows = train_data.index < len(new_data)
+            scaler.partial_fit(pd.DataFrame(X_train[new_rows], columns=pipeline.columns))
+            pipeline.attach_scaler(scaler)
+            X_train_scaled = pipeline.apply_scaling(X_train.copy())
+            X_val_scaled = pipeline.transform(val_data, scale=True)
+
+            current = self._keras_model()
+            candidate = tf.keras.models.clone_model(current)
+            candidate.set_weights(current.get_weights())
+            candidate.compile(
+                optimizer=tf.keras.optimizers.Adam(learning_rate),
+                loss='binary_crossentropy',
+                metrics=['accuracy', tf.keras.metrics.AUC()]
+            )
+            class_weights = {
+                label: len(y_train) / (2 * max(int(np.sum(y_train == label)), 1)) for label in (0, 1)
+            }
+            history = candidate.fit(
+                X_train_scaled, y_train,
+                epochs=epochs,
+                batch_size=batch_size,
+                validation_data=(X_val_scaled, y_val),
+                class_weight=class_weights,
+                verbose=1
+            )
+
+            val_scores = np.asarray(candidate.predict_on_batch(X_val_scaled)).ravel()
+            candidate_auc = float(roc_auc_score(y_val, val_scores))
+            promoted = candidate_auc >= baseline_auc - max_auc_drop
+            report = {
+                'new_claims': len(new_data),
+                'replayed_claims': len(data) - len(new_data),
+                'new_categories': added,
+                'baseline_auc': baseline_auc,
+                'candidate_auc': candidate_auc,
+                'promoted': promoted,
+                'history': history,
+            }
+            logger.info(f"Incremental update: AUC {baseline_auc:.4f} -> {candidate_auc:.4f}, "
+                        f"{'promoted' if promoted else 'rejected'}")
+            if not promoted:
+                return report
+
+            self.model = candidate
+            self.pipeline = pipeline
+            self.scaler = scaler
+            self.label_encoders = pipeline.to_label_encoders()
+            self.calibrator = ScoreCalibrator(calibration).fit(val_scores, y_val)
+            calibrated = self.calibrator.transform(val_scores)
+            if self.drift_reference is None:
+                self.drift_reference = build_reference(pipeline, X_train, calibrated)
+            else:
+                # Replayed rows are already in the reference; every new labeled row is merged in
+                self.drift_reference = merge_reference(
+                    self.drift_reference, pipeline, pipeline.transform(new_data), calibrated
+                )
+            if publish:
+                self.save_model()
+                report['version'] = save_bundle(self)
+            return report
+
+        except Exception as e:
+            logger.error(f"Error in incremental update: {e}")
             raise
 
-    def predict(self, X: pd.DataFrame) -> np.ndarray:
+    def _keras_model(self) -> Any:
+        """The trainable Keras network; a NumPy-served model reloads it from its directory."""
+        if not isinstance(self.model, NumpyMLP):
+            return self.model
+        path = os.path.join(self.model_dir or 'models', 'fraud_model.keras')
+        if not os.path.exists(path):
+            raise ValueError(f"Incremental updates need the Keras weights at {path}")
+        return self.backend.load(path)
+
+    def _training_callbacks(self, patience: int = 5) -> List[Any]:
+        import tensorflow as tf
+
+        return [
+            tf.keras.callbacks.EarlyStopping(
+                monitor='val_loss',
+                patience=patience,
+                restore_best_weights=True
+            ),
+            tf.keras.callbacks.ModelCheckpoint(
+                filepath='models/best_model.keras',
+                monitor='val_loss',
+                save_best_only=True
+            )
+        ]
+
+    def warm_up(self, batch_sizes: Tuple[int, ...] = (1,)) -> None:
+        """Score synthetic claims so lazy initialization happens before the first request."""
+        for batch_size in batch_sizes:
+            self.predict_proba([{}] * batch_size)
+
+    def predict(self, X: Any) -> np.ndarray:
+        try:
+            proba = self.predict_proba(X)
+            return (proba >= self.thresholds['fraud']).astype(int).reshape(-1, 1)
+        except Exception as e:
+            logger.error(f"Error in prediction: {e}")
+            raise
+
+    def predict_proba(self, X: Any) -> np.ndarray:
+        """Calibrated fraud probability for each claim in ``X``."""
         try:
             if self.model is None:
                 raise ValueError("Model not trained")
-            
-            processed_X = self.preprocess_data(X)
-            if 'fraud_reported' in processed_X.columns:
-                processed_X = processed_X.drop('fraud_reported', axis=1)
-                
-            X_scaled = self.scaler.transform(processed_X)
-            return (self.model.predict(X_scaled) > 0.5).astype(int)
+
+            X_scaled = self.pipeline.transform(X, scale=True)
+            return self.predict_proba_scaled(X_scaled)
         except Exception as e:
             logger.error(f"Error in prediction: {e}")
             raise
 
+    def predict_scaled(self, X_scaled: np.ndarray) -> np.ndarray:
+        """Fraud labels for rows already encoded and scaled by ``self.pipeline``."""
+        proba = self.predict_proba_scaled(X_scaled)
+        return (proba >= self.thresholds['fraud']).astype(int).reshape(-1, 1)
+
+    def predict_proba_scaled(self, X_scaled: np.ndarray) -> np.ndarray:
+        """Calibrated probabilities for rows already encoded and scaled by ``self.pipeline``."""
+        if self.model is None:
+            raise ValueError("Model not trained")
+        # predict_on_batch skips the per-call tf.data setup that predict() pays
+        scores = np.asarray(self.model.predict_on_batch(X_scaled)).ravel()
+        return self.calibrator.transform(scores)
+
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Train the insurance fraud model.")
+    parser.add_argument('data', nargs='?', default='insurance_claims.csv')
+    parser.add_argument('--streaming', action='store_true', help="Out-of-core training in fixed-size chunks")
+    parser.add_argument('--chunk-size', type=int, default=50000)
+    parser.add_argument('--params', help="JSON hyperparameters, e.g. best.json written by tuning.py")
+    parser.add_argument('--backend', choices=sorted(MODEL_BACKENDS), default='keras')
+    parser.add_argument('--update', metavar='NEW_CLAIMS',
+                        help="Fine-tune the current model on newly labeled claims; DATA is the replay source")
+    parser.add_argument('--epochs', type=int, default=5, help="Fine-tuning epochs for --update")
+    parser.add_argument('--replay-size', type=int, default=5000)
+    parser.add_argument('--max-auc-drop', type=float, default=0.0)
+    args = parser.parse_args()
+
     try:
-        model = InsuranceFraudModel()
-        history = model.train('insurance_claims.csv')
-        logger.info("Training completed successfully")
+        train_args: Dict[str, Any] = {}
+        if args.params:
+            with open(args.params) as f:
+                params = json.load(f)
+            train_args = {key: params.pop(key) for key in ('batch_size', 'patience') if key in params}
+            train_args['model_params'] = params
+        if args.update:
+            from bundle import BundleError, load_bundle
+
+            try:
+                model = load_bundle()
+            except BundleError:
+                model = InsuranceFraudModel('models/fraud_model.keras')
+            report = model.update(args.update, args.data, epochs=args.epochs, replay_size=args.replay_size,
+                                  max_auc_drop=args.max_auc_drop)
+            if not report['promoted']:
+                raise SystemExit(f"Update rejected: AUC {report['candidate_auc']:.4f} "
+                                 f"vs {report['baseline_auc']:.4f}")
+            logger.info(f"Published model {report['version']}")
+        else:
+            model = InsuranceFraudModel(backend=args.backend)
+            if args.streaming:
+                history = model.train_streaming(args.data, chunk_size=args.chunk_size, **train_args)
+            else:
+                history = model.train(args.data, **train_args)
+            logger.info("Training completed successfully")
     except Exception as e:
-        logger.error(f"Training failed: {e}")
\ No newline at end of file
+        logger.error(f"Training failed: {e}")
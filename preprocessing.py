@@ -0,0 +1,422 @@
+import numpy as np
+import pandas as pd
+import logging
+from datetime import date, datetime
+from typing import Dict, List, Optional, Any, Iterable, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+DATE_COLUMNS = ['policy_bind_date', 'incident_date']
+DATE_PARTS = ['year', 'month', 'day']
+DROP_COLUMNS = ['policy_number', '_c39']
+TARGET_COLUMN = 'fraud_reported'
+
+Records = Union[pd.DataFrame, Dict[str, Any], Iterable[Dict[str, Any]]]
+
+
+def split_date(value: Any) -> Optional[Tuple[int, int, int]]:
+    """Split a date-like value into (year, month, day) without pandas."""
+    if isinstance(value, (datetime, date)):
+        return value.year, value.month, value.day
+    if isinstance(value, str):
+        # Fast path for ISO 'YYYY-MM-DD' strings, the format used everywhere in the dataset
+        if len(value) >= 10 and value[4] == '-' and value[7] == '-':
+            try:
+                return int(value[0:4]), int(value[5:7]), int(value[8:10])
+            except ValueError:
+                pass
+        try:
+            parsed = datetime.fromisoformat(value)
+            return parsed.year, parsed.month, parsed.day
+        except ValueError:
+            return None
+    return None
+
+
+def _merge_moments(acc: Dict[str, Any], values: np.ndarray) -> None:
+    """Merge a batch into running (n, mean, M2) moments (Chan et al.)."""
+    n_b = len(values)
+    if n_b == 0:
+        return
+    mean_b = float(values.mean())
+    m2_b = float(((values - mean_b) ** 2).sum())
+    n = acc['n'] + n_b
+    delta = mean_b - acc['mean']
+    acc['mean'] += delta * n_b / n
+    acc['m2'] += m2_b + delta * delta * acc['n'] * n_b / n
+    acc['n'] = n
+
+
+class FeaturePipeline:
+    """Transform-only preprocessing fitted once at training time.
+
+    Holds fixed category-to-code lookup tables, fill values and the feature
+    column order, so inference never refits encoders or recomputes statistics.
+    Categories not seen during fitting map to the column's fill (mode) code.
+    """
+
+    def __init__(self):
+        self.columns: List[str] = []
+        self.vocabularies: Dict[str, Dict[str, int]] = {}
+        self.fill_values: Dict[str, float] = {}
+        self.mean: Optional[np.ndarray] = None
+        self.scale: Optional[np.ndarray] = None
+        self._plan: List[Tuple[int, str, str, Any]] = []
+        self._numeric_plan: List[Tuple[int, str]] = []
+        self._category_plan: List[Tuple[int, str, Dict[str, int]]] = []
+        self._date_plan: List[Tuple[str, List[Tuple[int, int]]]] = []
+        self._category_index: Dict[str, pd.Index] = {}
+        self._fills: np.ndarray = np.empty(0, dtype=np.float32)
+        self._stream: Optional[Dict[str, Any]] = None
+        self._means: Optional[np.ndarray] = None
+        self._variances: Optional[np.ndarray] = None
+        self._n_samples_seen = 0
+
+    @property
+    def is_fitted(self) -> bool:
+        return bool(self.columns)
+
+    @property
+    def n_features(self) -> int:
+        return len(self.columns)
+
+    def fit(self, data: pd.DataFrame) -> 'FeaturePipeline':
+        try:
+            expanded = self._expand_dates(data)
+            expanded = expanded.drop(
+                [c for c in DROP_COLUMNS + [TARGET_COLUMN] if c in expanded.columns], axis=1
+            )
+
+            self.columns = list(expanded.columns)
+            self.vocabularies = {}
+            self.fill_values = {}
+            for col in self.columns:
+                series = expanded[col]
+                if pd.api.types.is_numeric_dtype(series):
+                    mean = series.mean()
+                    self.fill_values[col] = float(mean) if pd.notna(mean) else 0.0
+                else:
+                    # Sorted vocabulary gives the same codes LabelEncoder would assign
+                    values = series.dropna().astype(str)
+                    vocab = sorted(values.unique())
+                    self.vocabularies[col] = {category: code for code, category in enumerate(vocab)}
+                    mode = values.mode()
+                    self.fill_values[col] = float(self.vocabularies[col][mode.iloc[0]]) if len(mode) else 0.0
+
+            self.mean = None
+            self.scale = None
+            self._compile()
+            logger.info(f"Feature pipeline fitted on {len(data)} rows, {self.n_features} features")
+            return self
+        except Exception as e:
+            logger.error(f"Error fitting feature pipeline: {e}")
+            raise
+
+    def partial_fit(self, chunk: pd.DataFrame, train_mask: Optional[np.ndarray] = None) -> 'FeaturePipeline':
+        """Accumulate vocabularies, fill values and feature moments from one chunk.
+
+        Vocabularies and fill values use every row; the moments that become
+        the scaling statistics only use rows selected by ``train_mask``.
+        Call ``finalize`` after the last chunk.
+        """
+        try:
+            expanded = self._expand_dates(chunk)
+            train_mask = np.ones(len(chunk), dtype=bool) if train_mask is None else np.asarray(train_mask, dtype=bool)
+
+            stats = self._stream
+            if stats is None:
+                columns = [c for c in expanded.columns if c not in DROP_COLUMNS + [TARGET_COLUMN]]
+                stats = self._stream = {
+                    'columns': columns,
+                    'numeric': {c: pd.api.types.is_numeric_dtype(expanded[c]) for c in columns},
+                    'moments': {},
+                    'counts': {},
+                    'train_rows': 0,
+                }
+            stats['train_rows'] += int(train_mask.sum())
+
+            for col in stats['columns']:
+                series = expanded[col] if col in expanded.columns else pd.Series(np.nan, index=expanded.index)
+                missing = series.isna().to_numpy()
+                if stats['numeric'][col]:
+                    values = pd.to_numeric(series, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+                    missing = np.isnan(values)
+                    acc = stats['moments'].setdefault(col, {'sum': 0.0, 'count': 0, 'n': 0, 'mean': 0.0, 'm2': 0.0, 'missing': 0})
+                    acc['sum'] += float(values[~missing].sum())
+                    acc['count'] += int((~missing).sum())
+                    acc['missing'] += int((train_mask & missing).sum())
+                    _merge_moments(acc, values[train_mask & ~missing])
+                else:
+                    acc = stats['counts'].setdefault(col, {'all': {}, 'train': {}, 'missing': 0})
+                    strings = series.astype(str)
+                    for key, mask in (('all', ~missing), ('train', train_mask & ~missing)):
+                        for category, count in strings[mask].value_counts().items():
+                            acc[key][category] = acc[key].get(category, 0) + int(count)
+                    acc['missing'] += int((train_mask & missing).sum())
+            return self
+        except Exception as e:
+            logger.error(f"Error in incremental pipeline fit: {e}")
+            raise
+
+    def finalize(self) -> 'FeaturePipeline':
+        """Freeze the statistics gathered by ``partial_fit`` into lookup tables and scaling arrays."""
+        stats = self._stream
+        if stats is None:
+            raise ValueError("partial_fit was never called")
+
+        self.columns = list(stats['columns'])
+        self.vocabularies = {}
+        self.fill_values = {}
+        n = stats['train_rows']
+        means = np.zeros(len(self.columns))
+        variances = np.zeros(len(self.columns))
+        for i, col in enumerate(self.columns):
+            if stats['numeric'][col]:
+                acc = stats['moments'].get(col, {'sum': 0.0, 'count': 0, 'n': 0, 'mean': 0.0, 'm2': 0.0, 'missing': 0})
+                fill = acc['sum'] / acc['count'] if acc['count'] else 0.0
+                self.fill_values[col] = fill
+                # Missing training values are filled, i.e. contribute 'missing' copies of the fill value
+                _merge_moments(acc, np.full(acc['missing'], fill))
+                means[i] = acc['mean']
+                variances[i] = acc['m2'] / n if n else 0.0
+            else:
+                acc = stats['counts'][col]
+                vocab = sorted(acc['all'])
+                self.vocabularies[col] = {category: code for code, category in enumerate(vocab)}
+                # pandas mode() breaks ties by taking the smallest value
+                mode = min(acc['all'], key=lambda c: (-acc['all'][c], c)) if vocab else None
+                fill = float(self.vocabularies[col][mode]) if mode is not None else 0.0
+                self.fill_values[col] = fill
+                codes = np.array([self.vocabularies[col][c] for c in acc['train']] + [fill], dtype=np.float64)
+                weights = np.array(list(acc['train'].values()) + [acc['missing']], dtype=np.float64)
+                if weights.sum():
+                    means[i] = np.average(codes, weights=weights)
+                    variances[i] = np.average((codes - means[i]) ** 2, weights=weights)
+
+        self.mean = means.astype(np.float32)
+        self.scale = np.where(variances > 0, np.sqrt(variances), 1.0).astype(np.float32)
+        self._variances = variances
+        self._n_samples_seen = n
+        self._means = means
+        self._stream = None
+        self._compile()
+        logger.info(f"Feature pipeline finalized: {self.n_features} features, {n} training rows")
+        return self
+
+    def extend_vocabularies(self, data: pd.DataFrame) -> Dict[str, List[str]]:
+        """Append categories first seen in ``data`` to the lookup tables.
+
+        New categories get the next free codes, so every existing code (and
+        the network weights trained on it) keeps its meaning. Returns the
+        added categories per column.
+        """
+        if not self.is_fitted:
+            raise ValueError("Feature pipeline not fitted")
+        added: Dict[str, List[str]] = {}
+        for col, vocab in self.vocabularies.items():
+            if col not in data.columns:
+                continue
+            unseen = sorted(set(data[col].dropna().astype(str).unique()) - set(vocab))
+            for category in unseen:
+                vocab[category] = len(vocab)
+            if unseen:
+                added[col] = unseen
+        if added:
+            self._compile()
+            logger.info(f"Extended vocabularies of {len(added)} columns with "
+                        f"{sum(len(v) for v in added.values())} new categories")
+        return added
+
+    def to_scaler(self) -> Any:
+        """A fitted ``StandardScaler`` equivalent to the statistics from ``finalize``."""
+        if self._variances is None:
+            raise ValueError("Scaling statistics are only available after finalize")
+        from sklearn.preprocessing import StandardScaler
+
+        scaler = StandardScaler()
+        scaler.mean_ = self._means
+        scaler.var_ = self._variances
+        scaler.scale_ = np.where(self._variances > 0, np.sqrt(self._variances), 1.0)
+        scaler.n_samples_seen_ = self._n_samples_seen
+        scaler.n_features_in_ = self.n_features
+        scaler.feature_names_in_ = np.array(self.columns, dtype=object)
+        return scaler
+
+    @classmethod
+    def from_encoders(cls, label_encoders: Dict[str, Any], scaler: Any) -> 'FeaturePipeline':
+        """Rebuild a pipeline from legacy ``label_encoders.pkl``/``scaler.pkl`` artifacts."""
+        pipeline = cls()
+        pipeline.columns = [str(c) for c in scaler.feature_names_in_]
+        for i, col in enumerate(pipeline.columns):
+            if col in label_encoders:
+                classes = [str(c) for c in label_encoders[col].classes_]
+                pipeline.vocabularies[col] = {category: code for code, category in enumerate(classes)}
+                # The scaler mean of an encoded column is the closest stored stand-in for its mode
+                code = int(np.clip(np.rint(scaler.mean_[i]), 0, len(classes) - 1))
+                pipeline.fill_values[col] = float(code)
+            else:
+                pipeline.fill_values[col] = float(scaler.mean_[i])
+        pipeline.attach_scaler(scaler)
+        pipeline._compile()
+        return pipeline
+
+    def attach_scaler(self, scaler: Any) -> None:
+        """Fold a fitted ``StandardScaler`` into the pipeline as fixed arrays."""
+        self.mean = np.asarray(scaler.mean_, dtype=np.float32)
+        self.scale = np.asarray(scaler.scale_, dtype=np.float32)
+
+    def to_label_encoders(self) -> Dict[str, Any]:
+        from sklearn.preprocessing import LabelEncoder
+
+        encoders = {}
+        for col, vocab in self.vocabularies.items():
+            le = LabelEncoder()
+            le.classes_ = np.array(list(vocab), dtype=object)
+            encoders[col] = le
+        return encoders
+
+    def transform(self, data: Records, scale: bool = False) -> np.ndarray:
+        """Encode a DataFrame, a single claim dict, or an iterable of claim dicts."""
+        if not self.is_fitted:
+            raise ValueError("Feature pipeline not fitted")
+        if isinstance(data, pd.DataFrame):
+            X = self._transform_frame(data)
+        elif isinstance(data, dict):
+            X = self._transform_records([data])
+        else:
+            X = self._transform_records(data if isinstance(data, list) else list(data))
+        if scale:
+            X = self.apply_scaling(X)
+        return X
+
+    def transform_one(self, record: Dict[str, Any], scale: bool = False,
+                      out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Encode one claim dict into a float32 row of length ``n_features``.
+
+        Single-claim fast path: no DataFrame is built and, when ``out`` is
+        given, the row is written (and scaled) in place with no allocation.
+        """
+        if not self.is_fitted:
+            raise ValueError("Feature pipeline not fitted")
+        if out is None:
+            out = np.empty(self.n_features, dtype=np.float32)
+        out[:] = self._encode_record(record)
+        if scale:
+            self.apply_scaling(out)
+        return out
+
+    def apply_scaling(self, X: np.ndarray) -> np.ndarray:
+        if self.mean is None or self.scale is None:
+            raise ValueError("No scaler attached to feature pipeline")
+        X -= self.mean
+        X /= self.scale
+        return X
+
+    def _expand_dates(self, data: pd.DataFrame) -> pd.DataFrame:
+        expanded = data.copy()
+        for col in DATE_COLUMNS:
+            if col not in expanded.columns:
+                continue
+            parsed = pd.to_datetime(expanded[col], errors='coerce')
+            expanded[f'{col}_year'] = parsed.dt.year
+            expanded[f'{col}_month'] = parsed.dt.month
+            expanded[f'{col}_day'] = parsed.dt.day
+            expanded.drop(col, axis=1, inplace=True)
+        return expanded
+
+    def _compile(self) -> None:
+        # Resolve each output column to a (position, kind, source key, lookup) step once
+        date_parts = {f'{col}_{part}': (col, i) for col in DATE_COLUMNS for i, part in enumerate(DATE_PARTS)}
+        self._plan = []
+        self._category_index = {col: pd.Index(list(vocab)) for col, vocab in self.vocabularies.items()}
+        self._fills = np.array([self.fill_values[col] for col in self.columns], dtype=np.float32)
+        for i, col in enumerate(self.columns):
+            if col in self.vocabularies:
+                self._plan.append((i, 'category', col, self.vocabularies[col]))
+            elif col in date_parts:
+                self._plan.append((i, 'date', date_parts[col][0], date_parts[col][1]))
+            else:
+                self._plan.append((i, 'numeric', col, None))
+
+        # Per-kind plans for the record path, so the per-claim loop never branches on kind
+        self._numeric_plan = [(i, key) for i, kind, key, _ in self._plan if kind == 'numeric']
+        self._category_plan = [(i, key, lookup) for i, kind, key, lookup in self._plan if kind == 'category']
+        dates: Dict[str, List[Tuple[int, int]]] = {}
+        for i, kind, key, part in self._plan:
+            if kind == 'date':
+                dates.setdefault(key, []).append((i, part))
+        self._date_plan = list(dates.items())
+        self._fill_list = self._fills.tolist()
+
+    def _encode_record(self, record: Dict[str, Any]) -> List[float]:
+        out = self._fill_list.copy()
+        get = record.get
+        for i, key in self._numeric_plan:
+            value = get(key)
+            if value is None:
+                continue
+            try:
+                number = float(value)
+            except (TypeError, ValueError):
+                continue
+            if number == number:
+                out[i] = number
+        for i, key, lookup in self._category_plan:
+            value = get(key)
+            if value is None:
+                continue
+            code = lookup.get(value if isinstance(value, str) else str(value))
+            if code is not None:
+                out[i] = code
+        for key, parts in self._date_plan:
+            value = get(key)
+            if value is None:
+                continue
+            split = split_date(value)
+            if split is not None:
+                for i, part in parts:
+                    out[i] = split[part]
+        return out
+
+    def _transform_records(self, records: List[Dict[str, Any]]) -> np.ndarray:
+        X = np.empty((len(records), self.n_features), dtype=np.float32)
+        for row, record in enumerate(records):
+            X[row] = self._encode_record(record)
+        return X
+
+    def _transform_frame(self, data: pd.DataFrame) -> np.ndarray:
+        n = len(data)
+        X = np.empty((n, self.n_features), dtype=np.float32)
+        parsed_dates: Dict[str, Optional[pd.Series]] = {}
+        for i, kind, key, lookup in self._plan:
+            fill = self._fills[i]
+            if key not in data.columns:
+                X[:, i] = fill
+                continue
+            if kind == 'category':
+                codes = self._category_index[key].get_indexer(data[key].astype(str))
+                X[:, i] = np.where(codes < 0, fill, codes)
+                continue
+            if kind == 'date':
+                if key not in parsed_dates:
+                    parsed_dates[key] = pd.to_datetime(data[key], errors='coerce')
+                dt = parsed_dates[key].dt
+                values = (dt.year, dt.month, dt.day)[lookup].to_numpy(dtype=np.float64, na_value=np.nan)
+            else:
+                values = pd.to_numeric(data[key], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+            X[:, i] = np.where(np.isnan(values), fill, values)
+        return X
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        for name in ('_plan', '_numeric_plan', '_category_plan', '_date_plan', '_fill_list'):
+            state.pop(name, None)
+        state.pop('_category_index', None)
+        state.pop('_fills', None)
+        state.pop('_stream', None)
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._stream = None
+        self._compile()
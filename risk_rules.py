@@ -0,0 +1,200 @@
+import json
+import logging
+import os
+import threading
+from numbers import Number
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+RULES_PATH = 'models/risk_rules.json'
+SCORE_FIELD = 'fraud_probability'
+OPERATORS = ('>', '>=', '<', '<=', '==', '!=', 'in', 'not_in')
+RULE_KEYS = ('factor', 'field', 'op', 'severity', 'description')
+
+Claims = Union[pd.DataFrame, Sequence[Dict[str, Any]]]
+
+# The rules file is the source of truth; this only keeps the model's own verdict
+# when it is missing
+FALLBACK_RULES: List[Dict[str, Any]] = [
+    {"factor": "High Risk Score", "field": SCORE_FIELD, "op": ">", "threshold": "high_risk",
+     "severity": "High", "description": "ML model indicates high fraud probability"},
+]
+
+
+def _to_text(value: Any) -> Optional[str]:
+    # One missing sentinel for both claim shapes: None, NaN and pandas NA all become None
+    if value is None or value is pd.NA or (isinstance(value, float) and value != value):
+        return None
+    return value if isinstance(value, str) else str(value)
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class CompiledRule:
+    """One rule reduced to a field, a vectorized comparison and its output record."""
+
+    def __init__(self, spec: Dict[str, Any]):
+        missing = [key for key in RULE_KEYS if key not in spec]
+        if missing:
+            raise ValueError(f"Rule {spec.get('factor', spec)!r} is missing {missing}")
+        if spec['op'] not in OPERATORS:
+            raise ValueError(f"Rule {spec['factor']!r}: operator must be one of {OPERATORS}")
+        if ('value' in spec) == ('threshold' in spec):
+            raise ValueError(f"Rule {spec['factor']!r} needs exactly one of 'value' or 'threshold'")
+
+        self.field = spec['field']
+        self.op = spec['op']
+        # 'threshold' names an entry of the serving model's thresholds.json
+        self.threshold: Optional[str] = spec.get('threshold')
+        value = spec.get('value')
+        values = value if isinstance(value, list) else [value]
+        if self.op in ('in', 'not_in') and not isinstance(value, list):
+            raise ValueError(f"Rule {spec['factor']!r}: '{self.op}' needs a list value")
+        self.numeric = self.threshold is not None or all(
+            isinstance(v, Number) and not isinstance(v, bool) for v in values
+        )
+        if self.numeric:
+            self.value = np.asarray(values, dtype=np.float64) if isinstance(value, list) else value
+        else:
+            self.value = np.asarray([str(v) for v in values], dtype=object) if isinstance(value, list) else str(value)
+        self.output = {key: spec[key] for key in ('factor', 'severity', 'description')}
+
+    def mask(self, column: np.ndarray, thresholds: Dict[str, float]) -> np.ndarray:
+        """Claims that satisfy the rule; a missing value (NaN or None) never does."""
+        value = thresholds[self.threshold] if self.threshold is not None else self.value
+        if self.numeric:
+            present = ~np.isnan(column)
+        else:
+            present = np.fromiter((v is not None for v in column), dtype=bool, count=len(column))
+        result = np.zeros(len(column), dtype=bool)
+        if present.any():
+            result[present] = self._compare(column[present], value)
+        return result
+
+    def _compare(self, column: np.ndarray, value: Any) -> np.ndarray:
+        op = self.op
+        if op == 'in':
+            return np.isin(column, value)
+        if op == 'not_in':
+            return ~np.isin(column, value)
+        if op == '>':
+            result = column > value
+        elif op == '>=':
+            result = column >= value
+        elif op == '<':
+            result = column < value
+        elif op == '<=':
+            result = column <= value
+        elif op == '==':
+            result = column == value
+        else:
+            result = column != value
+        return np.asarray(result, dtype=bool)
+
+
+def compile_rules(specs: List[Dict[str, Any]]) -> List[CompiledRule]:
+    return [CompiledRule(spec) for spec in specs]
+
+
+def _extract(claims: Claims, field: str, numeric: bool) -> np.ndarray:
+    n = len(claims)
+    if isinstance(claims, pd.DataFrame):
+        if field not in claims.columns:
+            return np.full(n, np.nan) if numeric else np.full(n, None, dtype=object)
+        column = claims[field]
+        if numeric:
+            return pd.to_numeric(column, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+        values = column.to_numpy(dtype=object)
+    else:
+        values = [claim.get(field) for claim in claims]
+        if numeric:
+            return np.fromiter((_to_float(v) for v in values), dtype=np.float64, count=n)
+    column = np.empty(n, dtype=object)
+    column[:] = [_to_text(v) for v in values]
+    return column
+
+
+class RiskRuleEngine:
+    """Declarative risk-factor rules evaluated over a whole batch of claims at once.
+
+    Each rule is compiled once into a field, an operator and a comparison
+    value; evaluation pulls every referenced field out of the batch as one
+    NumPy column and produces one boolean mask per rule. The rules file is
+    re-read when its modification time changes, so edits apply without a
+    restart; a file that fails to parse or validate leaves the previous rules
+    in place.
+    """
+
+    def __init__(self, path: Optional[str] = RULES_PATH, rules: Optional[List[Dict[str, Any]]] = None):
+        self.path = path
+        self._specs = list(rules if rules is not None else FALLBACK_RULES)
+        self._rules = compile_rules(self._specs)
+        self._mtime: Optional[float] = None
+        self._lock = threading.Lock()
+        if path is not None and rules is None:
+            self.refresh_if_stale()
+
+    @property
+    def rules(self) -> List[Dict[str, Any]]:
+        return list(self._specs)
+
+    def refresh_if_stale(self) -> None:
+        if self.path is None:
+            return
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            if self._mtime is None:
+                logger.warning(f"Risk rules file {self.path} not found; using the fallback rules")
+                self._mtime = -1.0
+            return
+        if mtime == self._mtime:
+            return
+        with self._lock:
+            if mtime == self._mtime:
+                return
+            self._mtime = mtime
+            try:
+                with open(self.path) as f:
+                    specs = json.load(f)['rules']
+                # Swap both together so concurrent readers see one consistent table
+                self._specs, self._rules = specs, compile_rules(specs)
+                logger.info(f"Loaded {len(specs)} risk rules from {self.path}")
+            except Exception as e:
+                logger.error(f"Invalid risk rules in {self.path}, keeping previous rules: {e}")
+
+    def evaluate(self, claims: Claims, scores: Optional[Sequence[float]] = None,
+                 thresholds: Optional[Dict[str, float]] = None) -> List[List[Dict[str, Any]]]:
+        """Return the triggered risk factors of each claim, in rule order."""
+        self.refresh_if_stale()
+        rules = self._rules
+        n = len(claims)
+        thresholds = thresholds or {}
+        columns: Dict[Tuple[str, bool], np.ndarray] = {}
+        if scores is not None:
+            columns[(SCORE_FIELD, True)] = np.asarray(scores, dtype=np.float64)
+
+        masks = np.zeros((n, len(rules)), dtype=bool)
+        for j, rule in enumerate(rules):
+            key = (rule.field, rule.numeric)
+            if key not in columns:
+                if rule.field == SCORE_FIELD and scores is None:
+                    continue
+                columns[key] = _extract(claims, rule.field, rule.numeric)
+            if rule.threshold is not None and rule.threshold not in thresholds:
+                continue
+            masks[:, j] = rule.mask(columns[key], thresholds)
+
+        factors: List[List[Dict[str, Any]]] = [[] for _ in range(n)]
+        for i, j in zip(*np.nonzero(masks)):
+            factors[i].append(dict(rules[j].output))
+        return factors
@@ -0,0 +1,175 @@
+"""Multi-process API server that loads the model once and forks workers sharing its memory.
+
+    python serve.py --workers 4 --port 8000
+    python serve.py --workers 2 --threads-per-worker 2 --pin-cpus
+
+The parent imports ``app.main``, which loads and warms up the active model and
+its preprocessing tables. It then freezes the garbage collector, so those
+objects are never written to again, binds the listening socket and forks the
+workers. The weights and vocabularies stay in pages shared copy-on-write by
+every worker, so N workers cost one model load and roughly one copy of the
+model.
+
+Forking after TensorFlow has run is unsafe, so the active model must use the
+NumPy engine (``fraud_model.npz``) or be a gradient-boosted tree ensemble
+(``fraud_model_hgb.pkl``). scikit-learn's OpenMP runtime cannot be forked once
+it has started a thread pool either, so the parent always runs with
+``OMP_NUM_THREADS=1``, set before anything is imported: its load-time warm-up
+never starts a pool. Each worker raises its OpenMP and BLAS pools to
+``--threads-per-worker`` after the fork (through threadpoolctl, when
+installed) and then runs its own warm-up. A model loaded later through
+``/api/models/reload`` lives in the worker that loaded it; restart the
+launcher to share a new version again.
+"""
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+THREAD_ENV_VARS = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS', 'TF_NUM_INTRAOP_THREADS')
+
+
+def limit_threads(threads: int) -> None:
+    """Size the intra-op pools of this process and its children; run before NumPy/TF load.
+
+    OpenMP stays single-threaded here: a pool started in the parent would
+    hang the forked workers, which resize it in ``_init_worker`` instead.
+    """
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(threads)
+    os.environ['OMP_NUM_THREADS'] = '1'
+    os.environ['TF_NUM_INTEROP_THREADS'] = '1'
+
+
+def cpu_sets(workers: int, threads: int) -> List[Optional[List[int]]]:
+    """Disjoint CPU sets of ``threads`` cores per worker, or no pinning if there are too few."""
+    cpus = sorted(os.sched_getaffinity(0))
+    if workers * threads > len(cpus):
+        logger.warning(f"{workers} workers x {threads} threads exceeds the {len(cpus)} available CPUs; "
+                       "not pinning")
+        return [None] * workers
+    return [cpus[i * threads:(i + 1) * threads] for i in range(workers)]
+
+
+def _init_worker(threads: int, cpus: Optional[List[int]]) -> None:
+    if cpus is not None:
+        os.sched_setaffinity(0, cpus)
+    try:
+        from threadpoolctl import threadpool_limits
+
+        # BLAS and OpenMP were loaded in the parent, so their pools have to be resized at runtime
+        threadpool_limits(threads)
+    except ImportError:
+        pass
+    tf = sys.modules.get('tensorflow')
+    if tf is not None:
+        try:
+            tf.config.threading.set_intra_op_parallelism_threads(threads)
+            tf.config.threading.set_inter_op_parallelism_threads(1)
+        except RuntimeError:
+            # Runtime already initialized; the TF_NUM_*_THREADS variables apply instead
+            pass
+
+
+def _run_worker(app, sock: socket.socket, args: argparse.Namespace, cpus: Optional[List[int]]) -> None:
+    import uvicorn
+
+    _init_worker(args.threads_per_worker, cpus)
+    config = uvicorn.Config(app, log_level=args.log_level, timeout_keep_alive=args.keep_alive)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--threads-per-worker', type=int, default=1,
+                        help="BLAS/OpenMP and TensorFlow intra-op threads per worker")
+    parser.add_argument('--pin-cpus', action='store_true', help="Give each worker its own CPU set")
+    parser.add_argument('--keep-alive', type=int, default=5, help="HTTP keep-alive timeout in seconds")
+    parser.add_argument('--log-level', default='info')
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=args.log_level.upper())
+
+    limit_threads(args.threads_per_worker)
+    from app.main import app, registry
+    from inference import NumpyMLP
+    from model import TreeEnsemble
+
+    if not isinstance(registry.active.model, (NumpyMLP, TreeEnsemble)):
+        parser.error(f"Model {registry.active.version} is served by TensorFlow, and forking workers after "
+                     "TensorFlow has run is unsafe. Export Keras models with 'python inference.py export' "
+                     "or serve a hist_gbt model.")
+
+    sock = socket.socket(socket.AF_INET6 if ':' in args.host else socket.AF_INET)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    # Move everything loaded so far out of the collector's reach; otherwise the
+    # first collection in each worker touches every object and un-shares its page
+    gc.collect()
+    gc.freeze()
+
+    pinning = cpu_sets(args.workers, args.threads_per_worker) if args.pin_cpus else [None] * args.workers
+    children: Dict[int, int] = {}
+    stopping = False
+
+    def spawn(index: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            code = 0
+            try:
+                _run_worker(app, sock, args, pinning[index])
+            except BaseException:
+                logger.exception(f"Worker {index} crashed")
+                code = 1
+            finally:
+                os._exit(code)
+        children[pid] = index
+        logger.info(f"Started worker {index} (pid {pid}, cpus {pinning[index] or 'any'})")
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for index in range(args.workers):
+        spawn(index)
+    logger.info(f"Serving model {registry.active.version} on {args.host}:{args.port} "
+                f"with {args.workers} workers")
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        index = children.pop(pid, None)
+        if index is None or stopping:
+            continue
+        logger.warning(f"Worker {index} (pid {pid}) exited with status {os.waitstatus_to_exitcode(status)}; "
+                       "restarting")
+        time.sleep(1)
+        spawn(index)
+    sock.close()
+
+
+if __name__ == "__main__":
+    main()
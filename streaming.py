@@ -0,0 +1,103 @@
+import logging
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from dataset import iter_claims
+from preprocessing import FeaturePipeline, TARGET_COLUMN
+
+logger = logging.getLogger(__name__)
+
+
+class StratifiedStreamSplitter:
+    """Deterministic stratified holdout assignment for rows arriving in chunks.
+
+    Each class is sampled systematically with a seeded random phase: the k-th
+    row of a class goes to the holdout whenever ``floor(k * test_size + phase)``
+    steps up. Every class therefore contributes ``test_size`` of its rows
+    (to within one row), and replaying the same stream yields the same split,
+    so every epoch and pass sees identical train/holdout membership.
+    """
+
+    def __init__(self, test_size: float = 0.2, seed: int = 42):
+        if not 0.0 < test_size < 1.0:
+            raise ValueError("test_size must be between 0 and 1")
+        self.test_size = test_size
+        self._rng = np.random.default_rng(seed)
+        self._positions: Dict[Any, int] = {}
+        self._phases: Dict[Any, float] = {}
+
+    def assign(self, labels: np.ndarray) -> np.ndarray:
+        """Return a boolean mask marking which rows of this chunk belong to the holdout."""
+        labels = np.asarray(labels)
+        holdout = np.zeros(len(labels), dtype=bool)
+        for label in np.unique(labels):
+            rows = np.flatnonzero(labels == label)
+            key = label.item() if hasattr(label, 'item') else label
+            if key not in self._phases:
+                self._phases[key] = float(self._rng.random())
+                self._positions[key] = 0
+            k = self._positions[key] + np.arange(len(rows))
+            phase = self._phases[key]
+            holdout[rows] = np.floor((k + 1) * self.test_size + phase) > np.floor(k * self.test_size + phase)
+            self._positions[key] += len(rows)
+        return holdout
+
+
+def fit_pipeline_streaming(data_path: str, chunk_size: int, test_size: float = 0.2,
+                           seed: int = 42) -> Dict[str, Any]:
+    """First pass: fit the feature pipeline and scaling statistics on training rows only."""
+    pipeline = FeaturePipeline()
+    splitter = StratifiedStreamSplitter(test_size, seed)
+    class_counts: Dict[str, int] = {}
+    rows = 0
+    for chunk in iter_claims(data_path, chunk_size):
+        labels = chunk[TARGET_COLUMN].astype(str).to_numpy()
+        holdout = splitter.assign(labels)
+        pipeline.partial_fit(chunk, train_mask=~holdout)
+        for label, count in zip(*np.unique(labels, return_counts=True)):
+            class_counts[str(label)] = class_counts.get(str(label), 0) + int(count)
+        rows += len(chunk)
+    pipeline.finalize()
+    logger.info(f"Streaming pass over {rows} rows complete; class counts {class_counts}")
+    return {'pipeline': pipeline, 'class_counts': class_counts, 'rows': rows}
+
+
+def make_tf_dataset(data_path: str, pipeline: FeaturePipeline, target_encoder: Any, subset: str,
+                    chunk_size: int, batch_size: int, test_size: float = 0.2, seed: int = 42,
+                    shuffle_buffer: Optional[int] = None) -> Any:
+    """Chunked ``tf.data`` input pipeline over the train or holdout rows of ``data_path``.
+
+    A generator reads and encodes one chunk at a time; scaling runs as a
+    parallel ``map`` and batches are prefetched, so peak memory is bounded by
+    ``chunk_size`` plus the shuffle buffer rather than the dataset size.
+    """
+    import tensorflow as tf
+
+    if subset not in ('train', 'holdout'):
+        raise ValueError("subset must be 'train' or 'holdout'")
+
+    def generator():
+        splitter = StratifiedStreamSplitter(test_size, seed)
+        for chunk in iter_claims(data_path, chunk_size):
+            labels = chunk[TARGET_COLUMN].astype(str).to_numpy()
+            holdout = splitter.assign(labels)
+            keep = holdout if subset == 'holdout' else ~holdout
+            if keep.any():
+                y = target_encoder.transform(labels[keep]).astype(np.float32)
+                yield pipeline.transform(chunk[keep]), y
+
+    mean = tf.constant(pipeline.mean)
+    scale = tf.constant(pipeline.scale)
+    dataset = tf.data.Dataset.from_generator(
+        generator,
+        output_signature=(
+            tf.TensorSpec(shape=(None, pipeline.n_features), dtype=tf.float32),
+            tf.TensorSpec(shape=(None,), dtype=tf.float32),
+        ),
+    )
+    dataset = dataset.map(lambda X, y: ((X - mean) / scale, y), num_parallel_calls=tf.data.AUTOTUNE)
+    dataset = dataset.unbatch()
+    if subset == 'train' and shuffle_buffer:
+        dataset = dataset.shuffle(shuffle_buffer, seed=seed, reshuffle_each_iteration=True)
+    return dataset.batch(batch_size).prefetch(tf.data.AUTOTUNE)
@@ -0,0 +1,64 @@
+import os
+
+import numpy as np
+import pytest
+
+from inference import WEIGHT_DTYPES, NumpyMLP, export_numpy
+
+tf = pytest.importorskip('tensorflow')
+
+# Max |score difference| allowed per exported weight dtype
+TOLERANCES = {'float32': 1e-5, 'float16': 5e-3, 'int8': 5e-2}
+KERAS_MODEL = os.path.join('models', 'fraud_model.keras')
+
+
+def _small_model(n_features: int = 12) -> 'tf.keras.Model':
+    layers = tf.keras.layers
+    model = tf.keras.Sequential([
+        tf.keras.Input(shape=(n_features,)),
+        layers.Dense(16, activation='relu'),
+        layers.BatchNormalization(),
+        layers.Dropout(0.3),
+        layers.Dense(8, activation='relu'),
+        layers.BatchNormalization(),
+        layers.Dropout(0.2),
+        layers.Dense(1, activation='sigmoid'),
+    ])
+    rng = np.random.default_rng(0)
+    # Non-trivial BatchNorm statistics, so folding is actually exercised
+    for layer in model.layers:
+        if isinstance(layer, layers.BatchNormalization):
+            gamma, beta, mean, var = layer.get_weights()
+            layer.set_weights([
+                rng.uniform(0.5, 1.5, gamma.shape), rng.normal(0, 0.5, beta.shape),
+                rng.normal(0, 0.5, mean.shape), rng.uniform(0.5, 2.0, var.shape),
+            ])
+    return model
+
+
+def _max_diff(keras_model, engine: NumpyMLP, X: np.ndarray) -> float:
+    expected = np.asarray(keras_model.predict_on_batch(X)).ravel()
+    return float(np.abs(expected - engine.predict(X).ravel()).max())
+
+
+@pytest.mark.parametrize('dtype', WEIGHT_DTYPES)
+def test_folded_export_matches_keras(tmp_path, dtype):
+    model = _small_model()
+    X = np.random.default_rng(1).normal(size=(256, 12)).astype(np.float32)
+    path = str(tmp_path / f'model-{dtype}.npz')
+
+    export_numpy(model, path, dtype)
+
+    assert _max_diff(model, NumpyMLP.load(path), X) <= TOLERANCES[dtype]
+
+
+@pytest.mark.skipif(not os.path.exists(KERAS_MODEL), reason=f"{KERAS_MODEL} not present")
+@pytest.mark.parametrize('dtype', WEIGHT_DTYPES)
+def test_shipped_model_export_matches_keras(tmp_path, dtype):
+    model = tf.keras.models.load_model(KERAS_MODEL)
+    X = np.random.default_rng(2).normal(size=(512, model.input_shape[-1])).astype(np.float32)
+    path = str(tmp_path / f'fraud_model-{dtype}.npz')
+
+    export_numpy(model, path, dtype)
+
+    assert _max_diff(model, NumpyMLP.load(path), X) <= TOLERANCES[dtype]
@@ -0,0 +1,51 @@
+import time
+
+import numpy as np
+
+from app.services.score_cache import InProcessKVStore, ScoreCache, SharedCacheBackend
+
+
+def _worker_cache(store: InProcessKVStore, ttl_seconds: float = 300.0) -> ScoreCache:
+    return ScoreCache(max_entries=100, ttl_seconds=ttl_seconds, shared=SharedCacheBackend(store))
+
+
+def test_shared_hit_from_another_worker():
+    store = InProcessKVStore()
+    first, second = _worker_cache(store), _worker_cache(store)
+    keys = ScoreCache.keys_for(np.array([[1.0, 2.0], [3.0, 4.0]]), 'v1')
+
+    first.store(keys, [0.25, 0.75])
+    scores = second.lookup(keys)
+
+    np.testing.assert_allclose(scores, [0.25, 0.75])
+    assert second.shared_hits == 2
+    assert second.misses == 0
+
+
+def test_shared_entries_expire_after_ttl():
+    store = InProcessKVStore()
+    first, second = _worker_cache(store, ttl_seconds=0.05), _worker_cache(store, ttl_seconds=0.05)
+    keys = ScoreCache.keys_for(np.array([[1.0, 2.0]]), 'v1')
+
+    first.store(keys, [0.5])
+    time.sleep(0.1)
+
+    assert np.isnan(second.lookup(keys)).all()
+    assert second.misses == 1
+    assert store.mget([second.shared.prefix + keys[0]]) == [None]
+
+
+def test_shared_entries_are_scoped_by_model_version():
+    store = InProcessKVStore()
+    first, second = _worker_cache(store), _worker_cache(store)
+    X = np.array([[1.0, 2.0]])
+
+    first.store(ScoreCache.keys_for(X, 'unversioned-aaaaaaaaaaaa'), [0.9])
+
+    assert np.isnan(second.lookup(ScoreCache.keys_for(X, 'unversioned-bbbbbbbbbbbb'))).all()
+    np.testing.assert_allclose(second.lookup(ScoreCache.keys_for(X, 'unversioned-aaaaaaaaaaaa')), [0.9])
+
+
+def test_keys_ignore_signed_zero_and_dtype():
+    assert ScoreCache.keys_for(np.array([[-0.0, 1.0]]), 'v1') == ScoreCache.keys_for(
+        np.array([[0.0, 1.0]], dtype=np.float32), 'v1')
@@ -0,0 +1,381 @@
+import argparse
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# TensorFlow and the model module are imported lazily so trial workers can
+# pin their thread pools before the runtime initialises.
+
+logger = logging.getLogger(__name__)
+
+TUNING_ROOT = 'models/tuning'
+RESULTS_DB = 'trials.db'
+DATASET_ARRAYS = ('X_train', 'y_train', 'X_val', 'y_val')
+MODEL_PARAMS = ('hidden_units', 'head_units', 'dropout', 'learning_rate')
+
+SEARCH_SPACE: Dict[str, Dict[str, Any]] = {
+    'hidden_units': {'choice': [[512, 256, 128], [256, 128, 64], [128, 64, 32], [128, 64], [64, 32]]},
+    'head_units': {'choice': [16, 32, 64]},
+    'dropout': {'uniform': [0.0, 0.5]},
+    'learning_rate': {'loguniform': [1e-4, 1e-2]},
+    'batch_size': {'choice': [32, 64, 128, 256]},
+    'patience': {'choice': [3, 5, 8]},
+}
+
+# Per-process state of a trial worker
+_DATASET: Dict[str, np.ndarray] = {}
+
+
+def sample_config(rng: np.random.Generator, space: Dict[str, Dict[str, Any]] = SEARCH_SPACE) -> Dict[str, Any]:
+    config = {}
+    for name, spec in space.items():
+        (kind, values), = spec.items()
+        if kind == 'choice':
+            config[name] = values[int(rng.integers(len(values)))]
+        elif kind == 'uniform':
+            config[name] = float(rng.uniform(*values))
+        elif kind == 'loguniform':
+            config[name] = float(np.exp(rng.uniform(np.log(values[0]), np.log(values[1]))))
+        else:
+            raise ValueError(f"Unknown search space distribution '{kind}' for {name}")
+    return config
+
+
+def prepare_dataset(data_path: str, root: str = TUNING_ROOT, test_size: float = 0.2,
+                    seed: int = 42) -> str:
+    """Preprocess, split and scale ``data_path`` once and cache it as ``.npy`` arrays.
+
+    The cache is keyed on the resolved source file, its size and mtime and the
+    split parameters, so repeated searches over unchanged data skip
+    preprocessing entirely. Trial workers memory-map the arrays read-only.
+    """
+    import pandas as pd
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+    from dataset import load_claims, resolve_dataset_path
+    from preprocessing import FeaturePipeline, TARGET_COLUMN
+
+    source = resolve_dataset_path(data_path)
+    stat = os.stat(source)
+    key = hashlib.sha256(
+        f"{os.path.abspath(source)}:{stat.st_size}:{stat.st_mtime_ns}:{test_size}:{seed}".encode()
+    ).hexdigest()[:16]
+    cache_dir = os.path.join(root, f'dataset-{key}')
+    if os.path.isdir(cache_dir):
+        logger.info(f"Reusing preprocessed dataset {cache_dir}")
+        return cache_dir
+
+    data = load_claims(data_path)
+    pipeline = FeaturePipeline().fit(data)
+    X = pipeline.transform(data)
+    y = LabelEncoder().fit_transform(data[TARGET_COLUMN]).astype(np.float32)
+    # Same split as InsuranceFraudModel.train so tuned scores carry over
+    X_train, X_val, y_train, y_val = train_test_split(
+        X, y, test_size=test_size, random_state=seed, stratify=y
+    )
+    pipeline.attach_scaler(StandardScaler().fit(pd.DataFrame(X_train, columns=pipeline.columns)))
+    arrays = {
+        'X_train': pipeline.apply_scaling(X_train.copy()),
+        'y_train': y_train,
+        'X_val': pipeline.apply_scaling(X_val.copy()),
+        'y_val': y_val,
+    }
+
+    os.makedirs(root, exist_ok=True)
+    staging_dir = tempfile.mkdtemp(dir=root, prefix='.staging-dataset-')
+    try:
+        for name, array in arrays.items():
+            np.save(os.path.join(staging_dir, f'{name}.npy'), np.ascontiguousarray(array))
+        os.replace(staging_dir, cache_dir)
+    except Exception:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise
+    logger.info(f"Cached preprocessed dataset ({len(X_train)} train / {len(X_val)} validation rows) in {cache_dir}")
+    return cache_dir
+
+
+class TrialStore:
+    """Local SQLite log of every trial result, one row per completed rung."""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with sqlite3.connect(self.path) as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS trials (
+                    study TEXT NOT NULL,
+                    trial_id INTEGER NOT NULL,
+                    rung INTEGER NOT NULL,
+                    epochs INTEGER NOT NULL,
+                    config TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    val_auc REAL,
+                    val_loss REAL,
+                    seconds REAL,
+                    error TEXT,
+                    recorded_at TEXT NOT NULL
+                )"""
+            )
+
+    def record(self, study: str, trial_id: int, rung: int, epochs: int, config: Dict[str, Any],
+               status: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None) -> None:
+        result = result or {}
+        with sqlite3.connect(self.path) as conn:
+            conn.execute(
+                "INSERT INTO trials VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (study, trial_id, rung, epochs, json.dumps(config), status, result.get('val_auc'),
+                 result.get('val_loss'), result.get('seconds'), error, datetime.now().isoformat()),
+            )
+
+    def results(self, study: str) -> List[Dict[str, Any]]:
+        with sqlite3.connect(self.path) as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute(
+                "SELECT * FROM trials WHERE study = ? ORDER BY trial_id, rung", (study,)
+            ).fetchall()
+        return [{**dict(row), 'config': json.loads(row['config'])} for row in rows]
+
+    def best(self, study: str) -> Optional[Dict[str, Any]]:
+        scored = [row for row in self.results(study) if row['val_auc'] is not None]
+        return max(scored, key=lambda row: row['val_auc']) if scored else None
+
+    def studies(self) -> List[str]:
+        with sqlite3.connect(self.path) as conn:
+            return [row[0] for row in conn.execute("SELECT DISTINCT study FROM trials ORDER BY study")]
+
+
+class ASHAScheduler:
+    """Asynchronous successive halving over epoch budgets.
+
+    Rung ``k`` trains to ``min_epochs * reduction_factor**k`` epochs (capped
+    at ``max_epochs``). Whenever a worker frees up, the best not-yet-promoted
+    trial in the top ``1 / reduction_factor`` of any rung is continued to the
+    next rung; otherwise a fresh trial starts at rung 0. Promotions never wait
+    for a rung to fill, so workers stay busy.
+    """
+
+    def __init__(self, min_epochs: int = 2, max_epochs: int = 50, reduction_factor: int = 3):
+        if reduction_factor < 2:
+            raise ValueError("reduction_factor must be at least 2")
+        self.reduction_factor = reduction_factor
+        self.rungs: List[int] = []
+        epochs = min_epochs
+        while epochs < max_epochs:
+            self.rungs.append(epochs)
+            epochs *= reduction_factor
+        self.rungs.append(max_epochs)
+        self._scores: List[Dict[int, float]] = [{} for _ in self.rungs]
+        self._promoted: List[set] = [set() for _ in self.rungs]
+        self._converged: set = set()
+
+    def report(self, trial_id: int, rung: int, score: float, converged: bool = False) -> None:
+        self._scores[rung][trial_id] = score
+        if converged:
+            self._converged.add(trial_id)
+
+    def next_promotion(self) -> Optional[Tuple[int, int]]:
+        """Return ``(trial_id, next_rung)`` for the most advanced promotable trial, if any."""
+        for rung in reversed(range(len(self.rungs) - 1)):
+            scores = self._scores[rung]
+            top = sorted(scores, key=scores.get, reverse=True)[:len(scores) // self.reduction_factor]
+            for trial_id in top:
+                if trial_id not in self._promoted[rung] and trial_id not in self._converged:
+                    self._promoted[rung].add(trial_id)
+                    return trial_id, rung + 1
+        return None
+
+
+def _init_worker(cache_dir: str, threads: int) -> None:
+    # Must run before TensorFlow is imported in this process
+    for var in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS', 'TF_NUM_INTRAOP_THREADS'):
+        os.environ[var] = str(threads)
+    os.environ['TF_NUM_INTEROP_THREADS'] = '1'
+    os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+    try:
+        from threadpoolctl import threadpool_limits
+
+        # NumPy's BLAS is already loaded, so its pool has to be resized at runtime
+        threadpool_limits(threads)
+    except ImportError:
+        pass
+
+    import tensorflow as tf
+
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+    for name in DATASET_ARRAYS:
+        _DATASET[name] = np.load(os.path.join(cache_dir, f'{name}.npy'), mmap_mode='r')
+
+
+def _run_trial(trial_id: int, config: Dict[str, Any], start_epoch: int, end_epoch: int,
+               checkpoint_path: str) -> Dict[str, Any]:
+    """Train one trial from ``start_epoch`` to ``end_epoch`` inside a worker process."""
+    import tensorflow as tf
+    from sklearn.metrics import roc_auc_score
+
+    from model import InsuranceFraudModel
+
+    started = time.perf_counter()
+    X_train, y_train, X_val, y_val = (np.asarray(_DATASET[name]) for name in DATASET_ARRAYS)
+    if start_epoch > 0:
+        keras_model = tf.keras.models.load_model(checkpoint_path)
+    else:
+        tf.keras.utils.set_random_seed(trial_id)
+        keras_model = InsuranceFraudModel().build_model(
+            X_train.shape[1], **{name: config[name] for name in MODEL_PARAMS}
+        )
+
+    class_weights = {
+        0: len(y_train) / (2 * np.sum(y_train == 0)),
+        1: len(y_train) / (2 * np.sum(y_train == 1))
+    }
+    early_stopping = tf.keras.callbacks.EarlyStopping(
+        monitor='val_loss', patience=config['patience'], restore_best_weights=True
+    )
+    history = keras_model.fit(
+        X_train, y_train,
+        initial_epoch=start_epoch,
+        epochs=end_epoch,
+        batch_size=config['batch_size'],
+        validation_data=(X_val, y_val),
+        class_weight=class_weights,
+        callbacks=[early_stopping],
+        verbose=0
+    )
+    keras_model.save(checkpoint_path)
+
+    scores = np.asarray(keras_model.predict_on_batch(X_val)).ravel()
+    return {
+        'val_auc': float(roc_auc_score(y_val, scores)),
+        'val_loss': float(min(history.history['val_loss'])),
+        'converged': early_stopping.stopped_epoch > 0,
+        'seconds': time.perf_counter() - started,
+    }
+
+
+def run_search(data_path: str, n_trials: int = 20, workers: Optional[int] = None, min_epochs: int = 2,
+               max_epochs: int = 50, reduction_factor: int = 3, seed: int = 42, study: Optional[str] = None,
+               root: str = TUNING_ROOT, space: Dict[str, Dict[str, Any]] = SEARCH_SPACE) -> Optional[Dict[str, Any]]:
+    """Run an ASHA search over ``space`` with one trial per worker process.
+
+    Each worker is limited to ``cpu_count // workers`` threads so concurrent
+    trials don't oversubscribe the machine. Every rung result is logged to
+    ``<root>/trials.db``; the best configuration is written to
+    ``<root>/<study>/best.json`` in the form ``model.py --params`` accepts.
+    """
+    cpus = os.cpu_count() or 1
+    workers = workers or cpus
+    threads = max(1, cpus // workers)
+    cache_dir = prepare_dataset(data_path, root, seed=seed)
+    study = study or datetime.now().strftime('%Y%m%d-%H%M%S')
+    study_dir = os.path.join(root, study)
+    os.makedirs(study_dir, exist_ok=True)
+
+    store = TrialStore(os.path.join(root, RESULTS_DB))
+    scheduler = ASHAScheduler(min_epochs, max_epochs, reduction_factor)
+    rng = np.random.default_rng(seed)
+    configs: Dict[int, Dict[str, Any]] = {}
+    pending: Dict[Any, Tuple[int, int]] = {}
+    logger.info(f"Study {study}: {n_trials} trials on {workers} workers x {threads} threads, "
+                f"rungs {scheduler.rungs} epochs")
+
+    # Spawned (not forked) workers: TensorFlow is not fork-safe
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=_init_worker, initargs=(cache_dir, threads)) as pool:
+        def submit(trial_id: int, rung: int) -> None:
+            start_epoch = scheduler.rungs[rung - 1] if rung else 0
+            checkpoint_path = os.path.join(study_dir, f'trial-{trial_id:04d}.keras')
+            future = pool.submit(_run_trial, trial_id, configs[trial_id], start_epoch,
+                                 scheduler.rungs[rung], checkpoint_path)
+            pending[future] = (trial_id, rung)
+
+        def fill() -> None:
+            while len(pending) < workers:
+                promotion = scheduler.next_promotion()
+                if promotion is not None:
+                    submit(*promotion)
+                elif len(configs) < n_trials:
+                    trial_id = len(configs)
+                    configs[trial_id] = sample_config(rng, space)
+                    submit(trial_id, 0)
+                else:
+                    break
+
+        fill()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                trial_id, rung = pending.pop(future)
+                epochs = scheduler.rungs[rung]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"Trial {trial_id} failed at rung {rung}: {e}")
+                    store.record(study, trial_id, rung, epochs, configs[trial_id], 'failed', error=str(e))
+                    continue
+                scheduler.report(trial_id, rung, result['val_auc'], result['converged'])
+                status = 'converged' if result['converged'] else 'completed'
+                store.record(study, trial_id, rung, epochs, configs[trial_id], status, result)
+                logger.info(f"Trial {trial_id} rung {rung} ({epochs} epochs): val_auc={result['val_auc']:.4f} "
+                            f"val_loss={result['val_loss']:.4f} in {result['seconds']:.1f}s")
+            fill()
+
+    best = store.best(study)
+    if best is not None:
+        with open(os.path.join(study_dir, 'best.json'), 'w') as f:
+            json.dump(best['config'], f, indent=2)
+        logger.info(f"Best trial {best['trial_id']}: val_auc={best['val_auc']:.4f} {best['config']}")
+    return best
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Parallel hyperparameter search for the fraud model.")
+    parser.add_argument('--root', default=TUNING_ROOT)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    search_parser = subparsers.add_parser('search', help="Run a successive-halving search")
+    search_parser.add_argument('data', nargs='?', default='insurance_claims.csv')
+    search_parser.add_argument('--trials', type=int, default=20)
+    search_parser.add_argument('--workers', type=int, help="Parallel trials (default: one per CPU)")
+    search_parser.add_argument('--min-epochs', type=int, default=2)
+    search_parser.add_argument('--max-epochs', type=int, default=50)
+    search_parser.add_argument('--reduction-factor', type=int, default=3)
+    search_parser.add_argument('--seed', type=int, default=42)
+    search_parser.add_argument('--study')
+    show_parser = subparsers.add_parser('show', help="Print logged trials for a study")
+    show_parser.add_argument('study', nargs='?', help="Study name (default: most recent)")
+
+    args = parser.parse_args(argv)
+    if args.command == 'search':
+        run_search(args.data, args.trials, args.workers, args.min_epochs, args.max_epochs,
+                   args.reduction_factor, args.seed, args.study, args.root)
+    else:
+        store = TrialStore(os.path.join(args.root, RESULTS_DB))
+        studies = store.studies()
+        study = args.study or (studies[-1] if studies else None)
+        if study is None:
+            print("No studies recorded")
+            return
+        print(f"{'trial':>5} {'rung':>4} {'epochs':>6} {'status':>9} {'val_auc':>8} {'seconds':>8}  config")
+        for row in store.results(study):
+            auc = f"{row['val_auc']:.4f}" if row['val_auc'] is not None else '-'
+            seconds = f"{row['seconds']:.1f}" if row['seconds'] is not None else '-'
+            print(f"{row['trial_id']:>5} {row['rung']:>4} {row['epochs']:>6} {row['status']:>9} "
+                  f"{auc:>8} {seconds:>8}  {json.dumps(row['config'])}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()